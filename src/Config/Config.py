@@ -12,6 +12,7 @@ class Config:
 
     TAG_CONFIG_DIR = "FLY_CUBE_MIGRATION_CONFIG_DIR"
     TAG_DB_MIGRATIONS_DIR = "FLY_CUBE_MIGRATION_DB_MIGRATIONS_DIR"
+    TAG_JOBS = "FLY_CUBE_MIGRATION_JOBS"
 
     @staticmethod
     def instance():
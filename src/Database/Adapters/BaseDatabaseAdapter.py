@@ -7,9 +7,13 @@ class BaseDatabaseAdapter:
     __settings = {}
     __connection = None
     __cursor = None
+    __existing_tables = set()
+    __schema = ""
 
     def __init__(self, settings: dict):
         self.__settings = settings
+        self.__existing_tables = set()
+        self.__schema = ""
 
     def __del__(self):
         self.disconnect()
@@ -73,6 +77,72 @@ class BaseDatabaseAdapter:
         :rtype: list
         """
 
+    def _table_exists(self, name: str) -> bool:
+        """Метод проверки наличия таблицы в базе данных (запрос к базе данных)
+
+        :param name: имя таблицы
+        :type name: str
+        :rtype: bool
+
+        NOTE: override this method for a targeted check (without select of all tables).
+        """
+
+        return name in self.tables()
+
+    def _apply_schema(self, name: str):
+        """Сделать схему текущей для соединения (запрос к базе данных)
+
+        :param name: имя схемы
+        :type name: str
+        :raise: Exception
+
+        NOTE: override this method if the database supports schemas.
+        """
+
+        raise Exception(f"[{self.name()}Adapter][set_schema] Database schemas are not supported!")
+
+    def schema(self) -> str:
+        """Текущая схема соединения, заданная методом 'set_schema' (пустая строка, если не задана)
+
+        :rtype: str
+        """
+
+        return self.__schema
+
+    def set_schema(self, name: str):
+        """Задать текущую схему соединения
+
+        :param name: имя схемы
+        :type name: str
+        :raise: Exception
+
+        NOTE: The schema is applied only if it differs from the current one;
+              the cache of existing tables is cleared on change.
+        """
+
+        if name == self.__schema:
+            return
+        self._apply_schema(name)
+        self.__schema = name
+        self.__existing_tables = set()
+
+    def table_exists(self, name: str) -> bool:
+        """Существует ли таблица в базе данных
+
+        :param name: имя таблицы
+        :type name: str
+        :rtype: bool
+
+        NOTE: A positive result is cached until the adapter disconnects.
+        """
+
+        if name in self.__existing_tables:
+            return True
+        if not self._table_exists(name):
+            return False
+        self.__existing_tables.add(name)
+        return True
+
     def prepare_result_data(self, columns: list, result):
         """Преобразовать данные в словать
 
@@ -109,6 +179,8 @@ class BaseDatabaseAdapter:
         if self.__connection:
             self.__connection.close()
             self.__connection = None
+        self.__existing_tables = set()
+        self.__schema = ""
         return True
 
     def is_connected(self) -> bool:
@@ -121,13 +193,17 @@ class BaseDatabaseAdapter:
             return True
         return False
 
-    def query(self, sql: str) -> list:
+    def query(self, sql: str, raw: bool = False) -> list:
         """Выполнить запрос к базе данных
 
         :param sql: SQL запрос
         :type sql: str
+        :param raw: вернуть строки результата без преобразования (кортежи значений в порядке колонок)
+        :type raw: bool
         :return: Результат запроса
         :rtype: list
+
+        NOTE: By default the rows are converted by 'prepare_result_data' (rows with access by the column name).
         """
 
         if not self.is_connected():
@@ -145,7 +221,8 @@ class BaseDatabaseAdapter:
         if cursor_description:
             columns = list(cursor_description)
             result = self.__cursor.fetchall()
-            result = self.prepare_result_data(columns, result)
+            if not raw:
+                result = self.prepare_result_data(columns, result)
 
         if not in_transaction:
             self.__cursor.close()
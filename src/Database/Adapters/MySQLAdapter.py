@@ -1,6 +1,7 @@
 import mysql.connector
 import re
 from src.Database.Adapters.BaseDatabaseAdapter import BaseDatabaseAdapter
+from src.Database.Adapters.ResultRow import ResultRow
 
 
 class MySQLAdapter(BaseDatabaseAdapter):
@@ -82,21 +83,14 @@ class MySQLAdapter(BaseDatabaseAdapter):
         return f"`{name}`"
 
     def prepare_result_data(self, columns: list, result):
-        """Преобразовать данные в словать
+        """Преобразовать данные в список строк с доступом по названию колонки (см. ResultRow)
 
         :param columns: названия колонок таблицы
         :param result: результат запроса
-        :return: преобразованный словарь
+        :return: список строк результата
         """
 
-        results = []
-        for row in result:
-            row_dict = {}
-            for i, col in enumerate(columns):
-                row_dict[col[0]] = row[i]
-            results.append(row_dict)
-
-        return results
+        return ResultRow.make_rows([col[0] for col in columns], result)
 
     def server_version(self) -> str:
         """Метод запроса версии сервера базы данных
@@ -133,7 +127,7 @@ class MySQLAdapter(BaseDatabaseAdapter):
         :rtype: list
         """
 
-        db_name = self.database()
+        db_name = self.database().replace("'", "''")
         res = self.query(f"SELECT table_name FROM information_schema.tables WHERE table_schema = '{db_name}';")
         if len(res) != 0:
             tmp_list = []
@@ -141,3 +135,16 @@ class MySQLAdapter(BaseDatabaseAdapter):
                 tmp_list.append(k['table_name'])
             return tmp_list
         return []
+
+    def _table_exists(self, name: str) -> bool:
+        """Метод проверки наличия таблицы в базе данных (запрос к базе данных)
+
+        :param name: имя таблицы
+        :type name: str
+        :rtype: bool
+        """
+
+        db_name = self.database().replace("'", "''")
+        tmp_name = name.replace("'", "''")
+        res = self.query(f"SELECT 1 AS found FROM information_schema.tables WHERE table_schema = '{db_name}' AND table_name = '{tmp_name}' LIMIT 1;")
+        return len(res) != 0
@@ -4,6 +4,7 @@ import psycopg2
 import psycopg2.extras
 import psycopg2.extensions
 from src.Database.Adapters.BaseDatabaseAdapter import BaseDatabaseAdapter
+from src.Database.Adapters.ResultRow import ResultRow
 
 
 class PostgreSQLAdapter(BaseDatabaseAdapter):
@@ -80,21 +81,14 @@ class PostgreSQLAdapter(BaseDatabaseAdapter):
         return tmp_name
 
     def prepare_result_data(self, columns: list, result):
-        """Преобразовать данные в словать
+        """Преобразовать данные в список строк с доступом по названию колонки (см. ResultRow)
 
         :param columns: названия колонок таблицы
         :param result: результат запроса
-        :return: преобразованный словарь
+        :return: список строк результата
         """
 
-        results = []
-        for row in result:
-            row_dict = {}
-            for i, col in enumerate(columns):
-                row_dict[col.name] = row[i]
-            results.append(row_dict)
-
-        return results
+        return ResultRow.make_rows([col.name for col in columns], result)
 
     def server_version(self) -> str:
         """Метод запроса версии сервера базы данных
@@ -143,3 +137,33 @@ class PostgreSQLAdapter(BaseDatabaseAdapter):
                 tmp_list.append(f"{k['table_schema']}.{k['table_name']}")
             return tmp_list
         return []
+
+    def _table_exists(self, name: str) -> bool:
+        """Метод проверки наличия таблицы в базе данных (запрос к базе данных)
+
+        :param name: имя таблицы (допускается указание схемы: 'schema.table')
+        :type name: str
+        :rtype: bool
+
+        NOTE: If the schema is set by 'set_schema', the table without schema name is searched in it only.
+        """
+
+        if self.schema() != "" and not '.' in name:
+            name = f"{self.schema()}.{name}"
+        tmp_name = self.quote_table_name(name).replace("'", "''")
+        res = self.query(f"SELECT to_regclass('{tmp_name}') IS NOT NULL AS found;")
+        if len(res) != 0:
+            return bool(res[0]['found'])
+        return False
+
+    def _apply_schema(self, name: str):
+        """Сделать схему текущей для соединения (запрос к базе данных)
+
+        :param name: имя схемы
+        :type name: str
+
+        NOTE: The schema is set first in 'search_path' (new tables are created in it);
+              'public' is kept for shared extensions and functions.
+        """
+
+        self.query(f"SET search_path TO {self.quote_table_name(name)}, public;")
@@ -0,0 +1,84 @@
+class ResultRow:
+    """Строка результата запроса (значения строки и общий для всех строк результата словарь колонок)
+
+    The row keeps the values tuple returned by the database driver and the column index map shared
+    by all rows of one result, so no dict is built per row. Dict-style read access is kept
+    for compatibility: row['name'], row.get('name'), 'name' in row, len(row), keys(), values(), items()
+    and dict(row).
+    """
+
+    __slots__ = ('__columns', '__values')
+
+    def __init__(self, columns: dict, values):
+        self.__columns = columns
+        self.__values = values
+
+    @staticmethod
+    def make_rows(names: list, result) -> list:
+        """Сформировать список строк результата запроса
+
+        :param names: названия колонок результата
+        :param result: строки результата запроса (кортежи значений)
+        :rtype: list
+
+        NOTE: If the column names are repeated, the last column is used (as in the dict rows).
+        """
+
+        columns = {}
+        for i, name in enumerate(names):
+            columns[name] = i
+        return [ResultRow(columns, row) for row in result]
+
+    def get(self, key, default=None):
+        """Получить значение колонки
+
+        :param key: название колонки
+        :param default: значение по умолчанию (если колонка не найдена)
+        """
+
+        i = self.__columns.get(key, None)
+        if i is None:
+            return default
+        return self.__values[i]
+
+    def keys(self):
+        """Названия колонок"""
+
+        return self.__columns.keys()
+
+    def values(self) -> list:
+        """Значения колонок"""
+
+        return [self.__values[i] for i in self.__columns.values()]
+
+    def items(self) -> list:
+        """Пары (название колонки, значение)"""
+
+        return [(name, self.__values[i]) for name, i in self.__columns.items()]
+
+    def to_tuple(self) -> tuple:
+        """Значения строки в порядке колонок результата запроса"""
+
+        return tuple(self.__values)
+
+    def __getitem__(self, key):
+        return self.__values[self.__columns[key]]
+
+    def __contains__(self, key) -> bool:
+        return key in self.__columns
+
+    def __iter__(self):
+        return iter(self.__columns)
+
+    def __len__(self) -> int:
+        return len(self.__columns)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ResultRow, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
@@ -1,18 +1,68 @@
+import re
 import sqlite3
 from src.Database.Adapters.BaseDatabaseAdapter import BaseDatabaseAdapter
+from src.Database.Adapters.ResultRow import ResultRow
 
 
 class SQLiteAdapter(BaseDatabaseAdapter):
+    __server_version = ""
+    __pragma_values = {
+        'journal_mode': ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'),
+        'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA', '0', '1', '2', '3')
+    }
+    __isolation_levels = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+    __isolation_level = 'DEFERRED'
+
     def __init__(self, settings: dict):
         super().__init__(settings)
+        self.__server_version = ""
+        self.__isolation_level = 'DEFERRED'
 
     def _make_connection(self):
         """Создать и вернуть объект по работе с базой данных
 
         :return:
+
+        Supported settings (optional):
+          - [string]  journal_mode    - режим журнала (DELETE / TRUNCATE / PERSIST / MEMORY / WAL / OFF)
+          - [integer] busy_timeout    - время ожидания блокировки базы данных (мс; default: 5000)
+          - [string]  synchronous     - режим синхронизации (OFF / NORMAL / FULL / EXTRA)
+          - [integer] cache_size      - размер кэша страниц (PRAGMA cache_size)
+          - [integer] mmap_size       - размер отображаемой в память части файла (PRAGMA mmap_size)
+          - [string]  isolation_level - режим начала транзакции (DEFERRED / IMMEDIATE / EXCLUSIVE; default: DEFERRED)
         """
 
-        connection = sqlite3.connect(self.database())
+        try:
+            busy_timeout = int(self.settings_value('busy_timeout', 5000))
+        except (TypeError, ValueError):
+            raise Exception("[SQLiteAdapter] Invalid database settings! Invalid value of 'busy_timeout'!")
+        isolation_level = str(self.settings_value('isolation_level', 'DEFERRED')).strip().upper()
+        if not isolation_level in self.__isolation_levels:
+            raise Exception("[SQLiteAdapter] Invalid database settings! Invalid value of 'isolation_level'!")
+        pragmas = []
+        for key in ('journal_mode', 'synchronous', 'cache_size', 'mmap_size'):
+            if not self.contains_settings_value(key):
+                continue
+            value = str(self.settings_value(key)).strip().upper()
+            if key in self.__pragma_values:
+                if not value in self.__pragma_values[key]:
+                    raise Exception(f"[SQLiteAdapter] Invalid database settings! Invalid value of '{key}'!")
+            elif not re.match(r'^-?[0-9]+$', value):
+                raise Exception(f"[SQLiteAdapter] Invalid database settings! Invalid value of '{key}'!")
+            pragmas.append(f"PRAGMA {key} = {value};")
+
+        self.__isolation_level = isolation_level
+        # NOTE: the connection may be passed between threads (see DatabaseFactory connection pool),
+        #       but it is used by one thread at a time.
+        # NOTE: the connection is in the autocommit mode: the module 'sqlite3' opens implicit transactions
+        #       before DML statements only, so DDL statements would be committed at once;
+        #       the transaction is opened explicitly by 'begin_transaction'.
+        connection = sqlite3.connect(self.database(),
+                                     timeout=max(busy_timeout, 0) / 1000.0,
+                                     isolation_level=None,
+                                     check_same_thread=False)
+        for sql in pragmas:
+            connection.execute(sql).fetchall()
         return connection
 
     def name(self) -> str:
@@ -39,12 +89,16 @@ class SQLiteAdapter(BaseDatabaseAdapter):
 
         :return: версия сервера базы данных
         :rtype: str
+
+        NOTE: The version of the SQLite library is selected once and cached.
         """
 
+        if self.__server_version != "":
+            return self.__server_version
         res = self.query("select sqlite_version() as version;")
         if len(res) != 0:
-            return res[0]['version']
-        return ""
+            self.__server_version = str(res[0]['version'])
+        return self.__server_version
 
     def extensions(self) -> list:
         """Метод запроса списка расширений базы данных
@@ -64,28 +118,46 @@ class SQLiteAdapter(BaseDatabaseAdapter):
         :rtype: list
         """
 
-        res = self.query("SELECT tbl_name FROM sqlite_master WHERE type = 'table';")
-        if len(res) != 0:
-            tmp_list = []
-            for k in res:
-                if 'tbl_name' in k:
-                    tmp_list.append(k['tbl_name'])
-            return tmp_list
-        return []
+        res = self.query("SELECT tbl_name FROM sqlite_master WHERE type = 'table';", True)
+        return [row[0] for row in res]
+
+    def _table_exists(self, name: str) -> bool:
+        """Метод проверки наличия таблицы в базе данных (запрос к базе данных)
+
+        :param name: имя таблицы
+        :type name: str
+        :rtype: bool
+        """
+
+        tmp_name = name.replace("'", "''")
+        res = self.query(f"SELECT 1 AS found FROM sqlite_master WHERE type = 'table' AND name = '{tmp_name}' LIMIT 1;")
+        return len(res) != 0
+
+    def begin_transaction(self) -> bool:
+        """Открыть транзакцию ('BEGIN DEFERRED / IMMEDIATE / EXCLUSIVE'; см. 'isolation_level')
+
+        :rtype: bool
+
+        NOTE: All statements of the transaction (DDL included) are committed or rolled back together.
+        """
+
+        if self.in_transaction():
+            return True
+        if not super().begin_transaction():
+            return False
+        try:
+            self.query(f"BEGIN {self.__isolation_level};")
+        except Exception:
+            super().rollback_transaction()
+            raise
+        return True
 
     def prepare_result_data(self, columns: list, result):
-        """Преобразовать данные в словать
+        """Преобразовать данные в список строк с доступом по названию колонки (см. ResultRow)
 
         :param columns: названия колонок таблицы
         :param result: результат запроса
-        :return: преобразованный словарь
+        :return: список строк результата
         """
 
-        results = []
-        for row in result:
-            row_dict = {}
-            for i, col in enumerate(columns):
-                row_dict[col[0]] = row[i]
-            results.append(row_dict)
-
-        return results
+        return ResultRow.make_rows([col[0] for col in columns], result)
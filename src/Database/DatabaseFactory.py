@@ -1,28 +1,45 @@
 import os
+import threading
 import yaml
 from src.Config.Config import Config
 from src.Logger.ConsoleLogger import ConsoleLogger
 from src.Helper.Helper import Helper
 from src.Database.Adapters.BaseDatabaseAdapter import BaseDatabaseAdapter
-from src.Database.Adapters.SQLiteAdapter import SQLiteAdapter
-from src.Database.Adapters.PostgreSQLAdapter import PostgreSQLAdapter
-from src.Database.Adapters.MySQLAdapter import MySQLAdapter
 
 
 class DatabaseFactory:
     __instance = None
     __settings = {}
     __secondarySettings = {}
+    __fleetSettings = {}
+    __fleetTenants = {}
     __adapters = {}
     __databaseConfig = "database.yml"
+    __fleetSchemasPoolKey = "*_fleet"
+    __pool = {}
+    __pool_idle = {}
+    __pool_statistics = {}
+    __pool_lock = None
+    __pool_reserved = 0
+    __max_connections = 0
 
     def __init__(self):
-        # --- append default adapters - --
-        self.__register_database_adapter('sqlite', 'SQLiteAdapter')
-        self.__register_database_adapter('sqlite3', 'SQLiteAdapter')
-        self.__register_database_adapter('postgresql', 'PostgreSQLAdapter')
-        self.__register_database_adapter('mysql', 'MySQLAdapter')
-        self.__register_database_adapter('mariadb', 'MySQLAdapter')
+        # --- fleet (tenant databases) ---
+        self.__fleetSettings = {}
+        self.__fleetTenants = {}
+        # --- connection pool ---
+        self.__pool = {}
+        self.__pool_idle = {}
+        self.__pool_statistics = {'created': 0, 'reused': 0, 'closed': 0}
+        self.__pool_lock = threading.Condition(threading.RLock())
+        self.__pool_reserved = 0
+        self.__max_connections = 0
+        # --- append default adapters (imported on first use) ---
+        self.__register_database_adapter('sqlite', 'src.Database.Adapters.SQLiteAdapter.SQLiteAdapter')
+        self.__register_database_adapter('sqlite3', 'src.Database.Adapters.SQLiteAdapter.SQLiteAdapter')
+        self.__register_database_adapter('postgresql', 'src.Database.Adapters.PostgreSQLAdapter.PostgreSQLAdapter')
+        self.__register_database_adapter('mysql', 'src.Database.Adapters.MySQLAdapter.MySQLAdapter')
+        self.__register_database_adapter('mariadb', 'src.Database.Adapters.MySQLAdapter.MySQLAdapter')
 
     @staticmethod
     def instance():
@@ -36,11 +53,32 @@ class DatabaseFactory:
             DatabaseFactory.__instance = DatabaseFactory()
         return DatabaseFactory.__instance
 
-    def load_config(self, path: str):
+    @staticmethod
+    def create_environment_factory(path: str, env: str):
+        """Создать отдельный экземпляр фабрики с настройками требуемого окружения
+
+        :param path: путь до каталога с конфигурационным файлом
+        :type path: str
+        :param env: окружение (production/development)
+        :type env: str
+        :return: экземпляр фабрики
+        :rtype: DatabaseFactory
+
+        NOTE: The factory is independent of the 'instance()' (has own settings and connection pool),
+              so the settings of several environments can be used at the same time.
+        """
+
+        factory = DatabaseFactory()
+        factory.load_config(path, env)
+        return factory
+
+    def load_config(self, path: str, env: str = None):
         """Загрузить настройки для работы с базой данных
 
         :param path: путь до каталога с конфигурационным файлом
         :type path: str
+        :param env: окружение (production/development; если None - текущее окружение из Config)
+        :type env: str|None
         """
 
         if len(self.__settings) != 0:
@@ -59,8 +97,10 @@ class DatabaseFactory:
 
         # Load mode type
         db_mode = 'development'
-        if Config.instance().is_production():
+        if env is None and Config.instance().is_production():
             db_mode = 'production'
+        elif not env is None:
+            db_mode = env
 
         # Load primary settings
         self.__settings = self.__load_database_settings(db_mode, config_data, config_file_path)
@@ -71,14 +111,27 @@ class DatabaseFactory:
         # Check supported adapters
         for key, value in self.__secondarySettings.items():
             self.__check_supported_adapters(value, config_file_path)
+        # Load fleet settings (optional)
+        self.__fleetSettings = config_data.get(f"{db_mode}_fleet", None)
+        if not self.__fleetSettings:
+            self.__fleetSettings = {}
+        if len(self.__fleetSettings) > 0:
+            self.__check_supported_adapters(self.__fleetSettings, config_file_path)
+            self.set_max_connections(int(self.__fleetSettings.get('max_connections', 0)))
 
     def reset_config(self):
         """Сбросить настройки конфигурации"""
 
+        # Close pooled connections (created with old settings)
+        self.close_database_adapters()
         # Reset primary settings
         self.__settings = {}
         # Reset secondary settings
         self.__secondarySettings = {}
+        # Reset fleet settings
+        self.__fleetSettings = {}
+        self.__fleetTenants = {}
+        self.__max_connections = 0
 
     def __load_database_settings(self, key: str, yaml_data: dict, path: str) -> dict:
         """Загрузить настройки по работе с БД
@@ -110,7 +163,7 @@ class DatabaseFactory:
 
         ==== Args
          - [bool] auto-connect - connect automatically on creation (default: True)
-         - [string] database   - database key name in '*_secondary' config (default: '')
+         - [string] database   - database key name in '*_secondary' config or fleet tenant name (default: '')
 
         NOTE: If database name is empty - used primary database.
         """
@@ -124,8 +177,182 @@ class DatabaseFactory:
             return self.__create_adapter(self.__settings, args)
         if database in self.__secondarySettings:
             return self.__create_adapter(self.__secondarySettings[database], args)
+        if database in self.__fleetTenants:
+            return self.__create_adapter(self.__fleetTenants[database], args)
         return None
 
+    def acquire_database_adapter(self, database: str = ''):
+        """Получить подключенный адаптер по работе с базой данных из пула соединений
+
+        :param database: название базы данных (ключ в '*_secondary'; если пустое - основная база данных)
+        :type database: str
+        :returns: Драйвер по работе с базой данных
+        :rtype: BaseDatabaseAdapter|None
+
+        NOTE: Adapters are pooled by the database name for the whole application run.
+              Return the adapter to the pool by 'release_database_adapter' after use.
+              If the connections limit is set (see 'set_max_connections') and reached,
+              an idle connection of other database is closed or the call waits for a released one.
+        """
+
+        if not isinstance(database, str):
+            return None
+        with self.__pool_lock:
+            adapter = self.__acquire_pool_adapter(database)
+        if adapter is None:
+            adapter = self.__connect_pool_adapter(database)
+        if not adapter:
+            return None
+        # set tenant schema (the connections are shared by all schemas of the fleet)
+        schema = self.database_settings(database).get('schema', '') if self.is_fleet_tenant(database) else ''
+        if schema != '':
+            try:
+                adapter.set_schema(schema)
+            except Exception as e:
+                print(ConsoleLogger.instance().make_color_string(f"[DatabaseFactory][acquire_database_adapter] Set database schema failed! Schema: {schema}; Error: {e}", 'error'))
+                self.release_database_adapter(adapter)
+                return None
+        return adapter
+
+    def __acquire_pool_adapter(self, database: str):
+        """Получить адаптер из пула соединений или зарезервировать место для нового (вызывается под блокировкой пула)
+
+        :param database: название базы данных
+        :type database: str
+        :returns: Драйвер по работе с базой данных (None - место для нового соединения зарезервировано)
+        :rtype: BaseDatabaseAdapter|None
+
+        NOTE: The new connection is opened outside of the pool lock (see '__connect_pool_adapter'),
+              so a slow connect does not block the other threads of the pool.
+        """
+
+        pool_key = self.__pool_key(database)
+        while True:
+            idle = self.__pool_idle.get(pool_key, [])
+            while len(idle) > 0:
+                adapter = idle.pop()
+                if adapter.is_connected():
+                    self.__pool_statistics['reused'] += 1
+                    return adapter
+                self.__pool[pool_key].remove(adapter)
+            if self.__max_connections <= 0 or self.__pool_size() < self.__max_connections:
+                break
+            if not self.__close_idle_adapter():
+                self.__pool_lock.wait()
+        self.__pool_reserved += 1
+        return None
+
+    def __connect_pool_adapter(self, database: str):
+        """Создать адаптер для зарезервированного места пула соединений и добавить его в пул
+
+        :param database: название базы данных
+        :type database: str
+        :returns: Драйвер по работе с базой данных
+        :rtype: BaseDatabaseAdapter|None
+
+        NOTE: If the connect failed, the reserved place is released and the waiting threads are notified.
+        """
+
+        adapter = None
+        try:
+            adapter = self.create_database_adapter({'database': database})
+        finally:
+            with self.__pool_lock:
+                self.__pool_reserved -= 1
+                if adapter:
+                    pool_key = self.__pool_key(database)
+                    if not pool_key in self.__pool:
+                        self.__pool[pool_key] = []
+                        self.__pool_idle[pool_key] = []
+                    self.__pool[pool_key].append(adapter)
+                    self.__pool_statistics['created'] += 1
+                else:
+                    self.__pool_lock.notify_all()
+        return adapter
+
+    def release_database_adapter(self, adapter):
+        """Вернуть адаптер по работе с базой данных в пул соединений
+
+        :param adapter: адаптер, полученный методом 'acquire_database_adapter'
+        :type adapter: BaseDatabaseAdapter
+        """
+
+        if not adapter:
+            return
+        with self.__pool_lock:
+            for database, adapters in self.__pool.items():
+                if not adapter in adapters:
+                    continue
+                if adapter.is_connected() and adapter.in_transaction():
+                    adapter.rollback_transaction()
+                if not adapter in self.__pool_idle[database]:
+                    self.__pool_idle[database].append(adapter)
+                self.__pool_lock.notify_all()
+                return
+
+    def close_database_adapters(self, database: str = None):
+        """Закрыть соединения пула
+
+        :param database: название базы данных (если None - закрыть все соединения)
+        :type database: str|None
+
+        NOTE: The connections shared by the tenant schemas are closed only if database is None.
+        """
+
+        with self.__pool_lock:
+            for key in list(self.__pool.keys()):
+                if not database is None and key != database:
+                    continue
+                for adapter in self.__pool[key]:
+                    adapter.disconnect()
+                    self.__pool_statistics['closed'] += 1
+                del self.__pool[key]
+                del self.__pool_idle[key]
+            self.__pool_lock.notify_all()
+
+    def detach_database_adapters(self):
+        """Забыть соединения пула без их закрытия (в дочернем процессе после fork)
+
+        NOTE: The connections inherited from the parent process belong to it: closing them
+              in the child process would break them for the parent, so they are only removed
+              from the pool of the child process.
+        """
+
+        self.__pool = {}
+        self.__pool_idle = {}
+        self.__pool_statistics = {'created': 0, 'reused': 0, 'closed': 0}
+        self.__pool_lock = threading.Condition(threading.RLock())
+        self.__pool_reserved = 0
+
+    def set_max_connections(self, value: int):
+        """Задать максимальное число одновременно открытых соединений пула
+
+        :param value: число соединений (0 - без ограничений)
+        :type value: int
+        """
+
+        with self.__pool_lock:
+            self.__max_connections = max(0, int(value))
+            self.__pool_lock.notify_all()
+
+    def max_connections(self) -> int:
+        """Максимальное число одновременно открытых соединений пула (0 - без ограничений)
+
+        :rtype: int
+        """
+
+        return self.__max_connections
+
+    def pool_statistics(self) -> dict:
+        """Статистика использования пула соединений
+
+        :returns: Массив значений (created - открыто соединений; reused - повторных использований; closed - закрыто соединений)
+        :rtype: dict
+        """
+
+        with self.__pool_lock:
+            return dict(self.__pool_statistics)
+
     def primary_adapter_name(self) -> str:
         """Имя основного (первичного) адаптера по работе с базой данных
 
@@ -177,8 +404,104 @@ class DatabaseFactory:
             return self.__settings
         if database in self.__secondarySettings:
             return self.__secondarySettings[database]
+        if database in self.__fleetTenants:
+            return self.__fleetTenants[database]
         return {}
 
+    def has_fleet(self) -> bool:
+        """Задан ли шаблон баз данных арендаторов (раздел конфигурации '*_fleet')?
+
+        :rtype: bool
+        """
+
+        return len(self.__fleetSettings) > 0
+
+    def fleet_settings(self) -> dict:
+        """Шаблон настроек для подключения к базам данных арендаторов из раздела конфигурации '*_fleet'
+
+        :returns: Массив настроек (значения могут содержать подстановку '{tenant}')
+        :rtype: dict
+        """
+
+        return self.__fleetSettings
+
+    def fleet_adapter_name(self) -> str:
+        """Имя адаптера по работе с базами данных арендаторов
+
+        :returns: Имя адаптера
+        :rtype: str
+        """
+
+        return self.__adapter_name(self.__fleetSettings)
+
+    def set_fleet_tenants(self, tenants: list):
+        """Задать список арендаторов (баз данных, созданных по шаблону '*_fleet')
+
+        :param tenants: список имен арендаторов
+        :type tenants: list
+        :raise: Exception
+        """
+
+        if not self.has_fleet():
+            raise Exception("[DatabaseFactory][set_fleet_tenants] Not found database fleet settings!")
+        fleet_tenants = {}
+        for tenant in tenants:
+            tenant = str(tenant).strip()
+            if tenant == "" or tenant in fleet_tenants:
+                continue
+            if tenant in self.__secondarySettings:
+                raise Exception(f"[DatabaseFactory][set_fleet_tenants] Tenant name is used by secondary database! Name: {tenant}")
+            settings = {}
+            for key, value in self.__fleetSettings.items():
+                if key == 'max_connections':
+                    continue
+                if isinstance(value, str):
+                    value = value.replace('{tenant}', tenant)
+                settings[key] = value
+            fleet_tenants[tenant] = settings
+        self.__fleetTenants = fleet_tenants
+
+    def is_fleet_schemas(self) -> bool:
+        """Являются ли арендаторы схемами одной базы данных (ключ 'schema' в разделе '*_fleet')?
+
+        :rtype: bool
+        """
+
+        return 'schema' in self.__fleetSettings
+
+    def create_fleet_adapter(self):
+        """Создать адаптер по работе с базой данных схем арендаторов
+
+        :returns: Драйвер по работе с базой данных или None
+        :rtype: BaseDatabaseAdapter|None
+        """
+
+        if not self.is_fleet_schemas():
+            return None
+        settings = {}
+        for key, value in self.__fleetSettings.items():
+            if key in ('schema', 'max_connections'):
+                continue
+            settings[key] = value
+        return self.__create_adapter(settings)
+
+    def fleet_tenants(self) -> list:
+        """Список имен арендаторов
+
+        :rtype: list
+        """
+
+        return list(self.__fleetTenants.keys())
+
+    def is_fleet_tenant(self, database: str) -> bool:
+        """Является ли база данных базой данных арендатора?
+
+        :param database: Название базы данных
+        :rtype: bool
+        """
+
+        return database in self.__fleetTenants
+
     def __register_database_adapter(self, name: str, class_name: str):
         """Зарегистрировать адаптер по работе с базой данных
 
@@ -214,7 +537,11 @@ class DatabaseFactory:
         adapter_class_name = self.__select_adapter_class_name(settings['adapter'])
         if adapter_class_name == "":
             return None
-        adapter_ = Helper.lookup(adapter_class_name, globals())
+        try:
+            adapter_ = Helper.import_class(adapter_class_name)
+        except Exception as e:
+            print(ConsoleLogger.instance().make_color_string(f"[DatabaseFactory][__create_adapter] Load database adapter failed! Class: {adapter_class_name}; Error: {e}", 'error'))
+            return None
         adapter = adapter_(settings)
         auto_connect = args.get('auto-connect', True)
         if auto_connect:
@@ -225,6 +552,46 @@ class DatabaseFactory:
                 return None
         return adapter
 
+    def __pool_key(self, database: str) -> str:
+        """Ключ пула соединений для базы данных
+
+        :param database: название базы данных
+        :type database: str
+        :rtype: str
+        """
+
+        if self.is_fleet_schemas() and self.is_fleet_tenant(database):
+            return self.__fleetSchemasPoolKey
+        return database
+
+    def __pool_size(self) -> int:
+        """Число открытых соединений пула (с учетом зарезервированных мест для новых соединений)
+
+        :rtype: int
+        """
+
+        size = self.__pool_reserved
+        for adapters in self.__pool.values():
+            size += len(adapters)
+        return size
+
+    def __close_idle_adapter(self) -> bool:
+        """Закрыть одно неиспользуемое соединение пула
+
+        :returns: было ли закрыто соединение
+        :rtype: bool
+        """
+
+        for database, idle in self.__pool_idle.items():
+            if len(idle) == 0:
+                continue
+            adapter = idle.pop(0)
+            self.__pool[database].remove(adapter)
+            adapter.disconnect()
+            self.__pool_statistics['closed'] += 1
+            return True
+        return False
+
     def __check_supported_adapters(self, settings: dict, path: str):
         """Метод проверки поддерживаемых адаптеров по работе с БД
 
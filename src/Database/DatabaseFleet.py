@@ -0,0 +1,170 @@
+import os
+import re
+import glob
+from src.Logger.ConsoleLogger import ConsoleLogger
+from src.Database.DatabaseFactory import DatabaseFactory
+
+
+class DatabaseFleet:
+    """Загрузка списка арендаторов (баз данных с одинаковой схемой)
+
+    Tenant databases are described by the '*_fleet' section in 'database.yml';
+    the '{tenant}' substitution is replaced by the tenant name:
+
+      production_fleet:
+        adapter: postgresql
+        host: 127.0.0.1
+        database: app_tenant_{tenant}
+        max_connections: 16
+
+    For the schema-per-tenant mode (PostgreSQL) the 'schema' key is used instead;
+    all tenants are schemas of one database and share the pool connections:
+
+      production_fleet:
+        adapter: postgresql
+        host: 127.0.0.1
+        database: app
+        schema: tenant_{tenant}
+        max_connections: 4
+    """
+
+    @staticmethod
+    def tenants_from_file(path: str) -> list:
+        """Загрузить список арендаторов из файла (одно имя на строку; '#' - комментарий)
+
+        :param path: путь до файла
+        :type path: str
+        :return: список имен арендаторов
+        :rtype: list
+        :raise: Exception
+        """
+
+        if not os.path.isfile(path):
+            raise Exception(f"[DatabaseFleet][tenants_from_file] Not found tenants file! Path: {path}")
+        tenants = []
+        with open(path, "r") as stream:
+            for line in stream:
+                line = line.split('#', 1)[0].strip()
+                if line == "" or line in tenants:
+                    continue
+                tenants.append(line)
+        return tenants
+
+    @staticmethod
+    def tenants_from_query(sql: str, database: str = '') -> list:
+        """Загрузить список арендаторов SQL запросом (первая колонка результата)
+
+        :param sql: SQL запрос
+        :type sql: str
+        :param database: база данных, в которой выполняется запрос (если пустое - основная база данных)
+        :type database: str
+        :return: список имен арендаторов
+        :rtype: list
+        :raise: Exception
+        """
+
+        db_adapter = DatabaseFactory.instance().acquire_database_adapter(database)
+        if not db_adapter:
+            raise Exception("[DatabaseFleet][tenants_from_query] Connect to database failed!")
+        ConsoleLogger.instance().push_show_out(False)
+        try:
+            res = db_adapter.query(sql, True)
+        finally:
+            ConsoleLogger.instance().pop_show_out()
+            DatabaseFactory.instance().release_database_adapter(db_adapter)
+        tenants = []
+        for row in res:
+            if len(row) == 0:
+                continue
+            tenant = str(row[0]).strip()
+            if tenant == "" or tenant in tenants:
+                continue
+            tenants.append(tenant)
+        return tenants
+
+    @staticmethod
+    def tenants_from_template() -> list:
+        """Найти существующие базы данных арендаторов по шаблону имени базы данных из '*_fleet'
+
+        :return: список имен арендаторов
+        :rtype: list
+        :raise: Exception
+
+        NOTE: For SQLite the database files are searched by the template path;
+              for PostgreSQL and MySQL the database names are selected on the primary database server;
+              in the schema-per-tenant mode the schema names are selected in the fleet database.
+        """
+
+        settings = DatabaseFactory.instance().fleet_settings()
+        key = 'database'
+        if DatabaseFactory.instance().is_fleet_schemas():
+            key = 'schema'
+        template = str(settings.get(key, ''))
+        if template.count('{tenant}') != 1:
+            raise Exception(f"[DatabaseFleet][tenants_from_template] Fleet {key} name must contain one '{{tenant}}' substitution!")
+        prefix, suffix = template.split('{tenant}')
+        adapter_name = DatabaseFactory.instance().fleet_adapter_name()
+        if key == 'schema':
+            names = DatabaseFleet.__select_schema_names(f"SELECT nspname AS name FROM pg_namespace WHERE nspname LIKE '{DatabaseFleet.__like(prefix, suffix)}';")
+        elif adapter_name in ('sqlite', 'sqlite3'):
+            names = glob.glob(f"{glob.escape(prefix)}*{glob.escape(suffix)}")
+        elif adapter_name == 'postgresql':
+            names = DatabaseFleet.__select_names(f"SELECT datname AS name FROM pg_database WHERE datname LIKE '{DatabaseFleet.__like(prefix, suffix)}';")
+        elif adapter_name in ('mysql', 'mariadb'):
+            names = DatabaseFleet.__select_names(f"SELECT schema_name AS name FROM information_schema.schemata WHERE schema_name LIKE '{DatabaseFleet.__like(prefix, suffix)}';")
+        else:
+            raise Exception(f"[DatabaseFleet][tenants_from_template] Unsupported database adapter! Name: {adapter_name}")
+        tenants = []
+        rx = re.compile(f"^{re.escape(prefix)}(.+){re.escape(suffix)}$")
+        for name in sorted(names):
+            result = rx.search(name)
+            if result and not result.group(1) in tenants:
+                tenants.append(result.group(1))
+        return tenants
+
+    @staticmethod
+    def __like(prefix: str, suffix: str) -> str:
+        """Сформировать шаблон LIKE для имени базы данных
+
+        :param prefix: начало имени (до подстановки '{tenant}')
+        :param suffix: окончание имени (после подстановки '{tenant}')
+        :rtype: str
+        """
+
+        def escape(value: str) -> str:
+            return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_').replace("'", "''")
+
+        return f"{escape(prefix)}%{escape(suffix)}"
+
+    @staticmethod
+    def __select_names(sql: str) -> list:
+        """Выбрать список имен баз данных на сервере основной базы данных
+
+        :param sql: SQL запрос (колонка 'name')
+        :rtype: list
+        """
+
+        if DatabaseFactory.instance().primary_adapter_name() != DatabaseFactory.instance().fleet_adapter_name():
+            raise Exception("[DatabaseFleet][tenants_from_template] Fleet and primary database adapters must be the same!")
+        return [str(name) for name in DatabaseFleet.tenants_from_query(sql)]
+
+    @staticmethod
+    def __select_schema_names(sql: str) -> list:
+        """Выбрать список имен схем в базе данных схем арендаторов
+
+        :param sql: SQL запрос (колонка 'name')
+        :rtype: list
+        """
+
+        if DatabaseFactory.instance().fleet_adapter_name() != 'postgresql':
+            raise Exception("[DatabaseFleet][tenants_from_template] Schema-per-tenant mode is supported for PostgreSQL only!")
+        db_adapter = DatabaseFactory.instance().create_fleet_adapter()
+        if not db_adapter:
+            raise Exception("[DatabaseFleet][tenants_from_template] Connect to database failed!")
+        ConsoleLogger.instance().push_show_out(False)
+        try:
+            res = db_adapter.query(sql)
+        finally:
+            ConsoleLogger.instance().pop_show_out()
+            db_adapter.disconnect()
+        return [str(row['name']) for row in res]
@@ -0,0 +1,215 @@
+import os
+import sqlite3
+from src.Helper.Helper import Helper
+
+
+class SQLiteShadowCopy:
+    """Теневая копия базы данных SQLite (миграция копии и атомарная замена исходного файла)
+
+    The shadow copy is enabled by the 'shadow_copy' key of the SQLite database settings:
+
+      production:
+        adapter: sqlite
+        database: db/production.sqlite3
+        journal_mode: WAL
+        shadow_copy: true
+
+    The database is copied by the sqlite3 backup API to '<database>.shadow' (the row counts of all tables
+    are checked against the original), the connection settings are switched to the copy, the migrations
+    and post-scripts are applied to the copy, and the copy is written back into the original by the
+    sqlite3 backup API (the original file is not replaced, so the open connections stay valid).
+    Before the swap the copy is checked ('PRAGMA integrity_check' and the installed migration versions)
+    and the original is locked ('PRAGMA locking_mode = EXCLUSIVE' and 'BEGIN IMMEDIATE'; the lock is kept
+    until the copy is written back); if the original was changed after the copy was made, the swap
+    is cancelled (these changes would be lost).
+
+    NOTE: Writers are not locked out during the migrations; the downtime is the whole write back of the copy
+          (all pages of the database are written, it is not a file rename).
+          In the WAL mode the exclusive lock can not be taken while other connections are open
+          (readers included): the swap waits 'busy_timeout' for them and is cancelled otherwise;
+          the migrated copy is kept in this case (see swap).
+    """
+
+    __database = ""
+    __settings = {}
+    __path = ""
+    __shadow_path = ""
+    __source = None
+    __data_version = 0
+
+    def __init__(self, database: str, settings: dict):
+        self.__database = database
+        self.__settings = settings
+        self.__path = str(settings.get('database', ''))
+        self.__shadow_path = f"{self.__path}.shadow"
+        self.__source = None
+        self.__data_version = 0
+
+    @staticmethod
+    def is_enabled(settings: dict) -> bool:
+        """Включена ли теневая копия для базы данных (ключ 'shadow_copy')
+
+        :param settings: настройки подключения к базе данных
+        :type settings: dict
+        :rtype: bool
+        """
+
+        if not str(settings.get('adapter', '')).strip() in ('sqlite', 'sqlite3'):
+            return False
+        if not Helper.str_to_bool(str(settings.get('shadow_copy', 'false'))):
+            return False
+        path = str(settings.get('database', ''))
+        return path != ':memory:' and os.path.isfile(path)
+
+    def database(self) -> str:
+        """Название базы данных (ключ в '*_secondary'; пустое - основная база данных)
+
+        :rtype: str
+        """
+
+        return self.__database
+
+    def shadow_path(self) -> str:
+        """Путь до теневой копии базы данных
+
+        :rtype: str
+        """
+
+        return self.__shadow_path
+
+    def begin(self):
+        """Создать теневую копию и переключить настройки подключения на нее
+
+        :raise: Exception
+
+        NOTE: The pooled connections of the database must be closed before the call.
+        """
+
+        self.__remove_shadow()
+        busy_timeout = int(self.__settings.get('busy_timeout', 5000)) / 1000.0
+        self.__source = sqlite3.connect(self.__path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        target = sqlite3.connect(self.__shadow_path)
+        try:
+            # the copy and the row counts are taken in one read transaction of the original
+            self.__source.execute("BEGIN")
+            self.__data_version = self.__source.execute("PRAGMA data_version;").fetchone()[0]
+            self.__source.backup(target)
+            for name in self.__table_names(target):
+                count = self.__row_count(self.__source, name)
+                shadow_count = self.__row_count(target, name)
+                if count != shadow_count:
+                    raise Exception(f"[SQLiteShadowCopy][begin] Invalid shadow copy of table '{name}'! Rows: {shadow_count} (expected: {count})")
+            self.__source.execute("COMMIT")
+        except Exception:
+            target.close()
+            self.discard()
+            raise
+        target.close()
+        self.__settings['database'] = self.__shadow_path
+
+    def swap(self, versions: list):
+        """Проверить теневую копию и заменить ей исходную базу данных
+
+        :param versions: список ожидаемых установленных версий миграций
+        :type versions: list
+        :raise: Exception
+
+        NOTE: The pooled connections of the database must be closed before the call.
+              On error the original database is not changed and the copy is removed; if the original
+              database is in use by other connections (the lock is not taken), the migrated copy is kept
+              and its path is reported (the copy is removed by the next 'begin').
+        """
+
+        is_busy = False
+        try:
+            self.__check_shadow(versions)
+            # the exclusive locking mode keeps the write lock after the transaction, so the original
+            # stays locked while the copy is written back (the backup API requires no open transaction)
+            self.__source.execute("PRAGMA locking_mode = EXCLUSIVE;").fetchall()
+            try:
+                self.__source.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError as err:
+                is_busy = True
+                raise Exception(f"[SQLiteShadowCopy][swap] The original database is in use by other connections! The shadow copy is kept: {self.__shadow_path}; Error: {err}")
+            if self.__source.execute("PRAGMA data_version;").fetchone()[0] != self.__data_version:
+                raise Exception("[SQLiteShadowCopy][swap] The original database was changed after the shadow copy was made!")
+            self.__source.execute("COMMIT")
+            shadow = sqlite3.connect(self.__shadow_path)
+            try:
+                shadow.backup(self.__source)
+            finally:
+                shadow.close()
+        except Exception:
+            if not is_busy:
+                self.discard()
+                raise
+            self.__close_source()
+            self.__settings['database'] = self.__path
+            raise
+        self.__close_source()
+        self.__settings['database'] = self.__path
+        self.__remove_shadow()
+
+    def discard(self):
+        """Удалить теневую копию и вернуть настройки подключения к исходной базе данных"""
+
+        self.__close_source()
+        self.__settings['database'] = self.__path
+        self.__remove_shadow()
+
+    def __check_shadow(self, versions: list):
+        """Проверить теневую копию перед заменой
+
+        :param versions: список ожидаемых установленных версий миграций
+        :raise: Exception
+        """
+
+        connection = sqlite3.connect(self.__shadow_path)
+        try:
+            result = [row[0] for row in connection.execute("PRAGMA integrity_check;").fetchall()]
+            if result != ['ok']:
+                raise Exception(f"[SQLiteShadowCopy][swap] Integrity check of the shadow copy failed! Result: {'; '.join(result)}")
+            shadow_versions = sorted(int(row[0]) for row in connection.execute("SELECT version FROM schema_migrations;").fetchall())
+            if shadow_versions != sorted(versions):
+                raise Exception("[SQLiteShadowCopy][swap] Invalid migration versions in the shadow copy!")
+        finally:
+            connection.close()
+
+    def __close_source(self):
+        """Закрыть соединение с исходной базой данных (блокировка исходной базы данных снимается)"""
+
+        if self.__source:
+            if self.__source.in_transaction:
+                self.__source.execute("ROLLBACK")
+            self.__source.close()
+            self.__source = None
+
+    def __remove_shadow(self):
+        """Удалить файлы теневой копии"""
+
+        for suffix in ('', '-journal', '-wal', '-shm'):
+            if os.path.isfile(f"{self.__shadow_path}{suffix}"):
+                os.remove(f"{self.__shadow_path}{suffix}")
+
+    @staticmethod
+    def __table_names(connection) -> list:
+        """Список имен таблиц базы данных
+
+        :param connection: соединение с базой данных
+        :rtype: list
+        """
+
+        res = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name;")
+        return [row[0] for row in res.fetchall()]
+
+    @staticmethod
+    def __row_count(connection, name: str) -> int:
+        """Число строк таблицы
+
+        :param connection: соединение с базой данных
+        :param name: имя таблицы
+        :rtype: int
+        """
+
+        name = name.replace('"', '""')
+        return int(connection.execute(f"SELECT COUNT(*) FROM \"{name}\";").fetchone()[0])
@@ -1,6 +1,8 @@
 import os
 import pwd
 import io
+import re
+import importlib
 
 
 class Helper:
@@ -14,6 +16,23 @@ class Helper:
                 obj = getattr(objects, element)
         return obj
 
+    @staticmethod
+    def import_class(path: str):
+        """Загрузить класс по полному пути (модуль и имя класса)
+
+        :param path: путь до класса (пример: 'src.Database.Adapters.SQLiteAdapter.SQLiteAdapter')
+        :return: класс
+        :raise: Exception
+
+        NOTE: The module is imported on the first call only (see 'sys.modules').
+        """
+
+        module_name, _, class_name = path.strip().rpartition('.')
+        if module_name == "" or class_name == "":
+            raise Exception(f"[Helper][import_class] Invalid class path! Path: {path}")
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)
+
     @staticmethod
     def file_extension(path: str) -> str:
         """Получить расширение файла
@@ -142,6 +161,54 @@ class Helper:
 
         return tmp_new_string
 
+    @staticmethod
+    def sql_terminate(sql: str) -> str:
+        """Завершить SQL символом ';' (если последний запрос не завершен)
+
+        :param sql: SQL данные
+        :rtype: str
+
+        NOTE: Quotes ('', "", ``, $tag$) and comments (--, /* */) are skipped, so a ';' inside
+              of them does not terminate the statement; if the SQL ends with a line comment,
+              the ';' is added on a new line.
+        """
+
+        sql = sql.rstrip()
+        last_char = ''
+        in_line_comment = False
+        i = 0
+        while i < len(sql):
+            char = sql[i]
+            if char == '\n':
+                in_line_comment = False
+            elif in_line_comment or char.isspace():
+                pass
+            elif sql.startswith('--', i):
+                in_line_comment = True
+            elif sql.startswith('/*', i):
+                end = sql.find('*/', i + 2)
+                i = len(sql) if end < 0 else end + 2
+                continue
+            elif char in ('\'', '"', '`'):
+                end = sql.find(char, i + 1)
+                i = len(sql) if end < 0 else end + 1
+                last_char = char
+                continue
+            elif char == '$' and re.match(r'\$([A-Za-z_][A-Za-z_0-9]*)?\$', sql[i:]):
+                tag = re.match(r'\$([A-Za-z_][A-Za-z_0-9]*)?\$', sql[i:]).group(0)
+                end = sql.find(tag, i + len(tag))
+                i = len(sql) if end < 0 else end + len(tag)
+                last_char = '$'
+                continue
+            else:
+                last_char = char
+            i += 1
+        if last_char in ('', ';'):
+            return sql
+        if in_line_comment:
+            return f"{sql}\n;"
+        return f"{sql};"
+
     @staticmethod
     def str_to_bool(string: str) -> bool:
         s_lower = string.lower()
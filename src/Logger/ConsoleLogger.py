@@ -1,6 +1,10 @@
+import threading
+
+
 class ConsoleLogger:
     __instance = None
     __show_out = False
+    __thread_show_out = threading.local()
     __debug = ""
     __info = "\033[94m"
     __info_2 = "\033[1;96m"
@@ -23,11 +27,33 @@ class ConsoleLogger:
         return ConsoleLogger.__instance
 
     def show_out(self) -> bool:
+        stack = getattr(self.__thread_show_out, 'stack', None)
+        if stack:
+            return stack[-1]
         return self.__show_out
 
     def set_show_out(self, show: bool):
         self.__show_out = show
 
+    def push_show_out(self, show: bool):
+        """Временно задать флаг вывода для текущего потока (отменяется методом 'pop_show_out')
+
+        :param show: выводить ли сообщения
+        """
+
+        stack = getattr(self.__thread_show_out, 'stack', None)
+        if stack is None:
+            stack = []
+            self.__thread_show_out.stack = stack
+        stack.append(show)
+
+    def pop_show_out(self):
+        """Отменить флаг вывода, заданный для текущего потока методом 'push_show_out'"""
+
+        stack = getattr(self.__thread_show_out, 'stack', None)
+        if stack:
+            stack.pop()
+
     def debug(self, string: str):
         self.__output(string, 'debug')
 
@@ -63,7 +89,7 @@ class ConsoleLogger:
         return string
 
     def __output(self, string: str, text_type: str):
-        if not self.__show_out:
+        if not self.show_out():
             return
         string = self.make_color_string(string, text_type)
         print(string)
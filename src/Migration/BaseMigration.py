@@ -6,9 +6,7 @@ from src.Logger.ConsoleLogger import ConsoleLogger
 from src.Database.DatabaseFactory import DatabaseFactory
 from src.Helper.Helper import Helper
 from src.Migration.Migrators.BaseMigrator import BaseMigrator
-from src.Migration.Migrators.SQLiteMigrator import SQLiteMigrator
-from src.Migration.Migrators.PostgreSQLMigrator import PostgreSQLMigrator
-from src.Migration.Migrators.MySQLMigrator import MySQLMigrator
+from src.Migration.ExportSink import ExportSink
 
 
 class BaseMigration:
@@ -16,6 +14,7 @@ class BaseMigration:
     __version = None
     __file = None
     __db_name = ''
+    __bulk_ddl = None
     __db_adapter = None
     __migrator = None
 
@@ -87,6 +86,25 @@ class BaseMigration:
 
         self.__db_name = db_name.strip()
 
+    def bulk_ddl(self):
+        """Режим массовых изменений схемы, заданный для миграции
+
+        :return: None (используется настройка 'bulk_ddl' из 'database.yml'), bool или словарь настроек
+        """
+
+        return self.__bulk_ddl
+
+    def set_bulk_ddl(self, value):
+        """Задать режим массовых изменений схемы для миграции (SQLite: cache_size, temp_store, mmap_size, synchronous)
+
+        :param value: True/False или словарь настроек (например: {'synchronous': 'OFF'})
+
+        NOTE: The session settings are changed for the duration of the migration transaction
+              and restored afterwards; overrides the 'bulk_ddl' key of the database settings.
+        """
+
+        self.__bulk_ddl = value
+
     def database_adapter_name(self) -> str:
         """Название адаптера для работы с базой данных
 
@@ -108,78 +126,103 @@ class BaseMigration:
         if migrator_class_name == "":
             return False
         # get adapter
-        self.__db_adapter = DatabaseFactory.instance().create_database_adapter({'database': self.database()})
+        self.__db_adapter = DatabaseFactory.instance().acquire_database_adapter(self.database())
         if not self.__db_adapter:
             return False
         # make migrator
-        migrator_ = Helper.lookup(migrator_class_name, globals())
+        migrator_ = Helper.import_class(migrator_class_name)
         self.__migrator = migrator_(self.__db_adapter)
         if not self.__migrator:
+            DatabaseFactory.instance().release_database_adapter(self.__db_adapter)
             return False
         # migrate
-        self.__db_adapter.begin_transaction()
+        bulk_ddl = self.__bulk_ddl
+        if bulk_ddl is None:
+            bulk_ddl = self.__db_adapter.settings_value('bulk_ddl', False)
         try:
+            if bulk_ddl:
+                self.__migrator.begin_bulk_ddl(bulk_ddl)
+            self.__db_adapter.begin_transaction()
             if version >= self.__version:
                 self.up()
             else:
                 self.down()
+            self.__migrator.apply_pending_changes()
             result = self.__db_adapter.commit_transaction()
         except Exception as err:
             print(ConsoleLogger.instance().make_color_string(f"[BaseMigration] Migrate failed! Error: {err}", 'error'))
             self.__db_adapter.rollback_transaction()
+            self.__migrator.reset_catalog_cache()
             result = False
+        finally:
+            if bulk_ddl:
+                self.__migrator.end_bulk_ddl()
 
         del self.__migrator
-        self.__db_adapter.disconnect()
+        DatabaseFactory.instance().release_database_adapter(self.__db_adapter)
         del self.__db_adapter
         return result
 
-    def export_migrate(self, version: int, migrator_class_name: str, dir_export: str) -> bool:
+    def export_migrate(self, version: int, migrator_class_name: str, dir_export: str, offline_catalog=None) -> bool:
         """Выполнить экспорт миграции в SQL файл
 
         :param version: версия
         :param migrator_class_name: название класса мигратора
-        :param dir_export: каталог для экспорта миграций
+        :param dir_export: каталог для экспорта миграций (пустой - только повторить миграцию в offline_catalog)
+        :param offline_catalog: схема базы данных в памяти (None - используется подключение к базе данных)
+        :type offline_catalog: OfflineCatalog|None
         :rtype: bool
+
+        NOTE: With the offline catalog the database is not connected: the migration operations
+              are replayed to the catalog, and the next migrations are exported against it.
         """
 
         if migrator_class_name == "":
             return False
         # get adapter
-        self.__db_adapter = DatabaseFactory.instance().create_database_adapter({'database': self.database()})
+        if offline_catalog:
+            self.__db_adapter = offline_catalog.database_adapter()
+        else:
+            self.__db_adapter = DatabaseFactory.instance().acquire_database_adapter(self.database())
         if not self.__db_adapter:
             return False
 
-        # make export sql file name
-        export_file = os.path.basename(self.__file).replace(".py", ".sql")
-        export_file = f"{dir_export}/{export_file}"
-
-        # check if exist - remove old file
-        if os.path.exists(export_file):
-            os.remove(export_file)
-
-        # Creates a new export file
-        with open(export_file, 'w') as f:
-            pass
+        # open export file (statements are buffered and the file is renamed into place on success)
+        export_sink = None
+        if dir_export != "":
+            export_file = os.path.basename(self.__file).replace(".py", ".sql")
+            export_sink = ExportSink(f"{dir_export}/{export_file}")
 
         # make migrator
-        migrator_ = Helper.lookup(migrator_class_name, globals())
-        self.__migrator = migrator_(self.__db_adapter, export_file)
+        migrator_ = Helper.import_class(migrator_class_name)
+        self.__migrator = migrator_(self.__db_adapter, export_sink)
         if not self.__migrator:
+            if export_sink:
+                export_sink.discard()
+            if not offline_catalog:
+                DatabaseFactory.instance().release_database_adapter(self.__db_adapter)
             return False
+        if offline_catalog:
+            self.__migrator.set_offline_catalog(offline_catalog)
         # export migrate
         try:
             if version >= self.__version:
                 self.up()
             else:
                 self.down()
+            self.__migrator.apply_pending_changes()
+            if export_sink:
+                export_sink.commit()
             result = True
         except Exception as err:
             print(ConsoleLogger.instance().make_color_string(f"[BaseMigration] Export migration failed! Error: {err}", 'error'))
+            if export_sink:
+                export_sink.discard()
             result = False
 
         del self.__migrator
-        self.__db_adapter.disconnect()
+        if not offline_catalog:
+            DatabaseFactory.instance().release_database_adapter(self.__db_adapter)
         del self.__db_adapter
         return result
 
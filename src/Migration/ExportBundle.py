@@ -0,0 +1,193 @@
+from src.Migration.ExportSink import ExportSink
+from src.Helper.Helper import Helper
+
+
+class ExportBundle:
+    """Пакет SQL миграций базы данных (один SQL файл на базу данных и секцию up/down)
+
+    Every migration is a guarded section: the section checks the version in 'schema_migrations',
+    executes the exported SQL and inserts (up) or deletes (down) the version. The bundle is applied
+    by one call of the database console utility:
+      - PostgreSQL: psql -d [database] -f [bundle] (sections are guarded by '\\if'; one transaction)
+      - MySQL:      mysql [database] < [bundle]   (sections are guarded by temporary procedures;
+                                                    DDL statements are committed implicitly by MySQL)
+      - SQLite:     sqlite3 [database] < [bundle] (one transaction; the sqlite3 utility has no
+                                                    conditions, so an installed (up) or not installed
+                                                    (down) version aborts the bundle and rolls it back)
+    """
+
+    __sqlite_adapters = ('sqlite', 'sqlite3')
+    __postgresql_adapters = ('postgresql',)
+    __mysql_adapters = ('mysql', 'mariadb')
+    __guard_name = "fly_cube_migration_bundle"
+    __adapter_name = ""
+    __command = ""
+    __database = ""
+    __sections = []
+
+    def __init__(self, adapter_name: str, command: str, database: str):
+        if not adapter_name in ExportBundle.__sqlite_adapters + ExportBundle.__postgresql_adapters + ExportBundle.__mysql_adapters:
+            raise Exception(f"[ExportBundle][__init__] Unsupported database adapter (name: {adapter_name})!")
+        if not command in ('up', 'down'):
+            raise Exception(f"[ExportBundle][__init__] Invalid migration section (name: {command})!")
+        self.__adapter_name = adapter_name
+        self.__command = command
+        self.__database = database
+        self.__sections = []
+
+    def append(self, version: int, class_name: str, sql: str):
+        """Добавить секцию миграции
+
+        :param version: версия миграции
+        :param class_name: имя класса миграции
+        :param sql: выгруженный SQL миграции
+
+        NOTE: The last statement of the section is terminated (see Helper.sql_terminate),
+              so the version statement of the section is never glued to it.
+        """
+
+        self.__sections.append({'version': version, 'class_name': class_name, 'sql': Helper.sql_terminate(sql.strip())})
+
+    def size(self) -> int:
+        """Число секций миграций
+
+        :rtype: int
+        """
+
+        return len(self.__sections)
+
+    def save(self, path: str):
+        """Сохранить пакет миграций в файл
+
+        :param path: путь до файла
+        :raise: Exception
+        """
+
+        sink = ExportSink(path)
+        try:
+            sink.write(self.make_sql())
+        except Exception:
+            sink.discard()
+            raise
+        sink.commit()
+
+    def make_sql(self) -> str:
+        """Сформировать SQL пакета миграций
+
+        :rtype: str
+        """
+
+        database_title = self.__database
+        if database_title == "":
+            database_title = 'primary'
+        lines = [f"-- FlyCubeMigration bundle (database: {database_title}; section: {self.__command}; migrations: {len(self.__sections)})"]
+        if self.__adapter_name in ExportBundle.__postgresql_adapters:
+            lines += self.__postgresql_sql()
+        elif self.__adapter_name in ExportBundle.__mysql_adapters:
+            lines += self.__mysql_sql()
+        else:
+            lines += self.__sqlite_sql()
+        return "\n".join(lines) + "\n"
+
+    def __schema_migrations_sql(self) -> str:
+        """SQL создания таблицы версий миграций (если отсутствует)
+
+        :rtype: str
+        """
+
+        return "CREATE TABLE IF NOT EXISTS schema_migrations (\n" \
+               "version VARCHAR(128) NOT NULL,\n" \
+               "CONSTRAINT schema_migrations_pkey PRIMARY KEY (version)\n" \
+               ");"
+
+    def __version_sql(self, version: int) -> str:
+        """SQL изменения таблицы версий миграций для секции
+
+        :param version: версия миграции
+        :rtype: str
+        """
+
+        if self.__command == 'up':
+            return f"INSERT INTO schema_migrations (version) VALUES ('{version}');"
+        return f"DELETE FROM schema_migrations WHERE version = '{version}';"
+
+    def __postgresql_sql(self) -> list:
+        """SQL пакета миграций PostgreSQL (psql)
+
+        :rtype: list
+        """
+
+        exists = "NOT EXISTS" if self.__command == 'up' else "EXISTS"
+        lines = ["\\set ON_ERROR_STOP on", "BEGIN;", self.__schema_migrations_sql()]
+        for section in self.__sections:
+            lines += [
+                "",
+                f"-- {section['version']} - {section['class_name']}",
+                f"SELECT {exists} (SELECT 1 FROM schema_migrations WHERE version = '{section['version']}') AS {self.__guard_name} \\gset",
+                f"\\if :{self.__guard_name}",
+                section['sql'],
+                self.__version_sql(section['version']),
+                "\\endif"
+            ]
+        lines += ["", "COMMIT;"]
+        return lines
+
+    def __mysql_sql(self) -> list:
+        """SQL пакета миграций MySQL (mysql)
+
+        :rtype: list
+
+        NOTE: MySQL has no conditions outside of stored programs, so every section is executed
+              by a temporary procedure (created, called and dropped).
+        """
+
+        exists = "NOT EXISTS" if self.__command == 'up' else "EXISTS"
+        lines = [self.__schema_migrations_sql(), f"DROP PROCEDURE IF EXISTS {self.__guard_name};"]
+        for section in self.__sections:
+            lines += [
+                "",
+                f"-- {section['version']} - {section['class_name']}",
+                "DELIMITER $$",
+                f"CREATE PROCEDURE {self.__guard_name}()",
+                "BEGIN",
+                f"IF {exists} (SELECT 1 FROM schema_migrations WHERE version = '{section['version']}') THEN",
+                section['sql'],
+                self.__version_sql(section['version']),
+                "END IF;",
+                "END$$",
+                "DELIMITER ;",
+                f"CALL {self.__guard_name}();",
+                f"DROP PROCEDURE {self.__guard_name};"
+            ]
+        return lines
+
+    def __sqlite_sql(self) -> list:
+        """SQL пакета миграций SQLite (sqlite3)
+
+        :rtype: list
+
+        NOTE: The version check is a temporary trigger: inserting the version of a section into
+              the temporary guard table aborts the bundle if the section can not be applied.
+        """
+
+        exists = "EXISTS" if self.__command == 'up' else "NOT EXISTS"
+        message = "migration is already installed" if self.__command == 'up' else "migration is not installed"
+        lines = [
+            ".bail on",
+            "BEGIN;",
+            self.__schema_migrations_sql(),
+            f"CREATE TEMP TABLE {self.__guard_name} (version VARCHAR(128));",
+            f"CREATE TEMP TRIGGER {self.__guard_name}_check BEFORE INSERT ON {self.__guard_name}\n"
+            f"WHEN {exists} (SELECT 1 FROM main.schema_migrations WHERE version = NEW.version)\n"
+            f"BEGIN SELECT RAISE(ABORT, '[FlyCubeMigration] Bundle: {message}'); END;"
+        ]
+        for section in self.__sections:
+            lines += [
+                "",
+                f"-- {section['version']} - {section['class_name']}",
+                f"INSERT INTO {self.__guard_name} (version) VALUES ('{section['version']}');",
+                section['sql'],
+                self.__version_sql(section['version'])
+            ]
+        lines += ["", f"DROP TABLE {self.__guard_name};", "COMMIT;"]
+        return lines
@@ -0,0 +1,209 @@
+import os
+import json
+import hashlib
+
+
+class ExportManifest:
+    """Манифест каталога экспорта миграций (файл '.flycube-export-manifest')
+
+    For every exported SQL file the manifest keeps the source migration hash, the input hash
+    (see chain_hash) and the output file hash. A migration is not exported again if its input
+    hash is the same and the exported file is not changed.
+    """
+
+    __file_name = ".flycube-export-manifest"
+    __format_version = 1
+    __generator_hash = ""
+    __path = ""
+    __entries = {}
+    __changed = False
+
+    def __init__(self, dir_path: str):
+        self.__path = f"{dir_path.rstrip('/')}/{self.__file_name}"
+        self.__entries = {}
+        self.__changed = False
+        if not os.path.exists(self.__path):
+            return
+        with open(self.__path, "r") as stream:
+            try:
+                data = json.load(stream)
+            except ValueError:
+                return
+        if not isinstance(data, dict) or data.get('format', 0) != self.__format_version:
+            return
+        entries = data.get('files', {})
+        if isinstance(entries, dict):
+            self.__entries = entries
+
+    @staticmethod
+    def generator_hash() -> str:
+        """Получить хэш генератора SQL (хэш исходных файлов пакета 'src')
+
+        :rtype: str
+
+        NOTE: Any change of the FlyCubeMigration sources changes the hash, so the files exported
+              by another version of the generator are exported again.
+        """
+
+        if ExportManifest.__generator_hash != "":
+            return ExportManifest.__generator_hash
+        src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        files = []
+        for root, dirs, names in os.walk(src_dir):
+            dirs[:] = [d for d in dirs if d != '__pycache__']
+            for name in names:
+                if name.endswith('.py'):
+                    files.append(os.path.join(root, name))
+        h = hashlib.sha1()
+        for path in sorted(files):
+            h.update(os.path.relpath(path, src_dir).encode('utf-8'))
+            with open(path, 'rb') as f:
+                h.update(f.read())
+        ExportManifest.__generator_hash = h.hexdigest()
+        return ExportManifest.__generator_hash
+
+    @staticmethod
+    def chain_hash(prev_hash: str, values: list) -> str:
+        """Получить входной хэш выгрузки миграции
+
+        :param prev_hash: входной хэш предыдущей миграции базы данных (или начальный хэш)
+        :param values: значения, от которых зависит выгрузка (команда, мигратор, хэш миграции и т.д.)
+        :rtype: str
+
+        NOTE: The hash is chained over the migrations of one database, so a changed migration
+              exports all following migrations of the database again.
+        """
+
+        h = hashlib.sha1()
+        h.update(prev_hash.encode('utf-8'))
+        for value in values:
+            h.update(f"\n{value}".encode('utf-8'))
+        return h.hexdigest()
+
+    @staticmethod
+    def file_hash(file_path: str) -> str:
+        """Получить хэш содержимого файла (SHA-1)
+
+        :param file_path: путь до файла
+        :rtype: str
+        """
+
+        h = hashlib.sha1()
+        with open(file_path, 'rb') as f:
+            h.update(f.read())
+        return h.hexdigest()
+
+    def path(self) -> str:
+        """Путь до файла манифеста
+
+        :rtype: str
+        """
+
+        return self.__path
+
+    def source_hash(self, key: str, file_path: str) -> str:
+        """Получить хэш файла миграции (хэш из манифеста, если файл не изменялся)
+
+        :param key: ключ файла экспорта (путь относительно каталога экспорта)
+        :param file_path: путь до файла миграции
+        :rtype: str
+        """
+
+        entry = self.__entries.get(key, {})
+        info = self.__file_info(file_path, entry.get('source', {}))
+        if not info:
+            return ""
+        return info['hash']
+
+    def is_exported(self, key: str, input_hash: str, export_file: str) -> bool:
+        """Проверить, что файл экспорта актуален
+
+        :param key: ключ файла экспорта (путь относительно каталога экспорта)
+        :param input_hash: входной хэш выгрузки миграции
+        :param export_file: путь до файла экспорта
+        :rtype: bool
+        """
+
+        entry = self.__entries.get(key, None)
+        if not entry or entry.get('input', '') != input_hash:
+            return False
+        info = self.__file_info(export_file, entry.get('output', {}))
+        if not info or info['hash'] != entry['output'].get('hash', ''):
+            return False
+        if info != entry['output']:
+            entry['output'] = info
+            self.__changed = True
+        return True
+
+    def update(self, key: str, version: int, input_hash: str, source_file: str, export_file: str):
+        """Обновить запись манифеста для выгруженного файла
+
+        :param key: ключ файла экспорта (путь относительно каталога экспорта)
+        :param version: версия миграции
+        :param input_hash: входной хэш выгрузки миграции
+        :param source_file: путь до файла миграции
+        :param export_file: путь до файла экспорта
+        """
+
+        entry = self.__entries.get(key, {})
+        source = self.__file_info(source_file, entry.get('source', {}))
+        output = self.__file_info(export_file, {})
+        if not source or not output:
+            self.remove(key)
+            return
+        self.__entries[key] = {
+            'version': version,
+            'input': input_hash,
+            'source': source,
+            'output': output
+        }
+        self.__changed = True
+
+    def remove(self, key: str):
+        """Удалить запись манифеста
+
+        :param key: ключ файла экспорта (путь относительно каталога экспорта)
+        """
+
+        if not key in self.__entries:
+            return
+        del self.__entries[key]
+        self.__changed = True
+
+    def save(self):
+        """Сохранить манифест (если были изменения)"""
+
+        if not self.__changed:
+            return
+        data = {
+            'format': self.__format_version,
+            'files': self.__entries
+        }
+        tmp_path = f"{self.__path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.__path)
+        except OSError:
+            return
+        self.__changed = False
+
+    def __file_info(self, file_path: str, cached: dict):
+        """Получить хэш, время изменения и размер файла
+
+        :param file_path: путь до файла
+        :param cached: сохраненные ранее данные файла
+        :return: данные файла (hash, mtime, size) или None (если файл не найден)
+        :rtype: dict|None
+
+        NOTE: If mtime and size are not changed, the cached hash is used.
+        """
+
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if cached.get('size', -1) == stat.st_size and cached.get('mtime', -1) == stat.st_mtime_ns \
+                and cached.get('hash', '') != '':
+            return dict(cached)
+        return {'hash': ExportManifest.file_hash(file_path), 'mtime': stat.st_mtime_ns, 'size': stat.st_size}
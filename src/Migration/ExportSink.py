@@ -0,0 +1,90 @@
+import os
+
+
+class ExportSink:
+    """Файл экспорта SQL миграции (буферизованная запись и атомарная замена файла)
+
+    The statements are written to '<file>.tmp', which stays open until the export is finished:
+    the writes are buffered ('buffer_size' bytes), so a migration is usually written by one write call.
+    The finished file is renamed over the export file ('commit'), so readers never see a partially
+    written export file; on error the temporary file is removed ('discard').
+
+    NOTE: The files are not synced to disk one by one (fsync per file is slow on network file systems):
+          the written files are synced once per export run ('sync').
+    """
+
+    __buffer_size = 1024 * 1024
+    __path = ""
+    __tmp_path = ""
+    __stream = None
+
+    def __init__(self, path: str, buffer_size: int = 0):
+        self.__path = path
+        self.__tmp_path = f"{path}.tmp"
+        if buffer_size <= 0:
+            buffer_size = ExportSink.__buffer_size
+        self.__stream = open(self.__tmp_path, 'w', buffering=buffer_size)
+
+    def path(self) -> str:
+        """Путь до файла экспорта
+
+        :rtype: str
+        """
+
+        return self.__path
+
+    def is_open(self) -> bool:
+        """Открыт ли файл экспорта для записи
+
+        :rtype: bool
+        """
+
+        return self.__stream is not None
+
+    def write(self, data: str):
+        """Записать данные в файл экспорта
+
+        :param data: данные
+        :raise: Exception
+        """
+
+        if not self.__stream:
+            raise Exception(f"[ExportSink][write] Export file is closed! File: {self.__path}")
+        self.__stream.write(data)
+
+    @staticmethod
+    def sync():
+        """Записать на диск файлы экспорта (один раз после выгрузки всех миграций)"""
+
+        if hasattr(os, 'sync'):
+            os.sync()
+
+    def commit(self):
+        """Завершить экспорт: записать буфер в файл и заменить файл экспорта
+
+        :raise: Exception
+        """
+
+        if not self.__stream:
+            return
+        try:
+            self.__stream.flush()
+        except Exception:
+            self.discard()
+            raise
+        self.__stream.close()
+        self.__stream = None
+        os.replace(self.__tmp_path, self.__path)
+
+    def discard(self):
+        """Отменить экспорт: удалить временный файл
+
+        NOTE: The export file of a previous run is removed too, so a failed export does not leave a stale file.
+        """
+
+        if self.__stream:
+            self.__stream.close()
+            self.__stream = None
+        for path in (self.__tmp_path, self.__path):
+            if os.path.isfile(path):
+                os.remove(path)
@@ -1,15 +1,25 @@
 import sys
 import os
 import re
+import io
+import bisect
+import contextlib
+import multiprocessing
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import importlib
 import shutil
+from src.Config.Config import Config
 from src.Logger.ConsoleLogger import ConsoleLogger
 from src.Database.DatabaseFactory import DatabaseFactory
+from src.Database.SQLiteShadowCopy import SQLiteShadowCopy
 from src.Helper.Helper import Helper
 from src.Migration.Migrators.BaseMigrator import BaseMigrator
-from src.Migration.Migrators.SQLiteMigrator import SQLiteMigrator
-from src.Migration.Migrators.PostgreSQLMigrator import PostgreSQLMigrator
-from src.Migration.Migrators.MySQLMigrator import MySQLMigrator
+from src.Migration.MigrationManifest import MigrationManifest
+from src.Migration.ExportManifest import ExportManifest
+from src.Migration.ExportBundle import ExportBundle
+from src.Migration.ExportSink import ExportSink
+from src.Migration.OfflineCatalog import OfflineCatalog
 from src.PostScripts.PostScripts import PostScripts
 
 
@@ -17,14 +27,18 @@ class MigrationCore:
     __instance = None
     __migrators = {}
     __migrations = {}
+    __migrations_dir = ""
+    __migration_objects = {}
+    __manifest = None
+    __migration_versions = {}
 
     def __init__(self):
-        # --- append default migrators - --
-        self.__register_migrator('sqlite', 'SQLiteMigrator')
-        self.__register_migrator('sqlite3', 'SQLiteMigrator')
-        self.__register_migrator('postgresql', 'PostgreSQLMigrator')
-        self.__register_migrator('mysql', 'MySQLMigrator')
-        self.__register_migrator('mariadb', 'MySQLMigrator')
+        # --- append default migrators (imported on first use) ---
+        self.__register_migrator('sqlite', 'src.Migration.Migrators.SQLiteMigrator.SQLiteMigrator')
+        self.__register_migrator('sqlite3', 'src.Migration.Migrators.SQLiteMigrator.SQLiteMigrator')
+        self.__register_migrator('postgresql', 'src.Migration.Migrators.PostgreSQLMigrator.PostgreSQLMigrator')
+        self.__register_migrator('mysql', 'src.Migration.Migrators.MySQLMigrator.MySQLMigrator')
+        self.__register_migrator('mariadb', 'src.Migration.Migrators.MySQLMigrator.MySQLMigrator')
 
     @staticmethod
     def instance():
@@ -39,10 +53,13 @@ class MigrationCore:
         return MigrationCore.__instance
 
     def load_migrations(self, path: str):
-        """Произвести поиск и зугрузку файлов миграций
+        """Произвести поиск файлов миграций
 
         :param path: путь до каталога с файлами миграций
         :return:
+
+        NOTE: Only file names are parsed here. The migration module is imported
+              on first use (see '__migration').
         """
 
         if len(self.__migrations) > 0:
@@ -50,7 +67,9 @@ class MigrationCore:
         if not os.path.isdir(path):
             return
         sys.path.append(path)
+        self.__migrations_dir = path
         arr = os.listdir(path)
+        file_names = []
         for f in arr:
             file_extension = Helper.file_extension(f)
             if not file_extension.lower() == ".py":
@@ -60,21 +79,32 @@ class MigrationCore:
                 continue
             migration_version = int(result.group(1))
             migration_class_name = result.group(2)
-            try:
-                module = importlib.import_module(f"{migration_version}_{migration_class_name}")
-                class_ = getattr(module, migration_class_name)
-                instance = class_()
-                if instance.is_valid():
-                    self.__migrations[migration_version] = instance
-                else:
-                    del instance
-            except Exception as inst:
-                print(f"Exception: {inst}")
+            if len(str(migration_version)) != 14:
+                continue
+            self.__migrations[migration_version] = migration_class_name
+            file_names.append(f)
+        # load cached migrations info
+        self.__manifest = MigrationManifest(path)
+        self.__manifest.retain(set(file_names))
 
     def reset_migrations(self):
         """Сбросить список миграций"""
 
         self.__migrations = {}
+        self.__migrations_dir = ""
+        self.__migration_objects = {}
+        self.__manifest = None
+
+    def reset_migration_versions(self, db_name: str = None):
+        """Сбросить загруженный список установленных версий миграций
+
+        :param db_name: имя базы данных (если None - для всех баз данных)
+        """
+
+        if db_name is None:
+            self.__migration_versions = {}
+        elif db_name in self.__migration_versions:
+            del self.__migration_versions[db_name]
 
     def current_version(self, db_names: list):
         """Получить текущую версию установленных миграций
@@ -85,11 +115,12 @@ class MigrationCore:
 
         return self.__current_migration_version(db_names)
 
-    def migrate(self, db_names: list, version: int = -1) -> int:
+    def migrate(self, db_names: list, version: int = -1, jobs: int = 1) -> int:
         """Метод миграции базы данных
 
         :param db_names: список имен баз данных в которых будет производиться миграция
         :param version: версия миграции, до которой требуется актуализировать базы данных
+        :param jobs: число баз данных, мигрируемых параллельно (default: 1)
         :returns: Код результата выполнения
         :rtype: int
         """
@@ -118,98 +149,200 @@ class MigrationCore:
             m_command = 'down'
 
         print(f"[MigrationsCore] Start migrate from {current_version}:")
-        new_version = -1
-        changed_databases = []
-        r_code = 0
-        for k, m in mirgations.items():
-            # configuration current migration
-            m.configuration()
+        # make migrations plan
+        plan = []
+        plan_versions = {}
+        for k, m_class_name in mirgations.items():
             # select migration info
             m_version = int(k)
-            m_class_name = type(m).__name__
-            m_database = m.database()
-            m_database_title = m_database
-            if m_database_title == "":
-                m_database_title = 'primary'
-            # select current adapter name
-            db_adapter_name = ''
-            if m_database == "":
-                db_adapter_name = DatabaseFactory.instance().primary_adapter_name()
-            else:
-                db_adapter_name = DatabaseFactory.instance().secondary_adapter_name(m_database)
-            # check db adapter name
-            if db_adapter_name == "":
-                print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Invalid current database adapter name!", 'error'))
+            # check version range
+            if m_command == "up" and m_version > version:
+                break
+            elif m_command == "down" and m_version <= version:
+                break
+            m_database = self.__migration_database(m_version, db_names)
+            if m_database is None:
+                self.__print_migration_load_failed(m_version, m_class_name)
                 return 1
-            # select current migrator name
-            migrator_name = self.__migrator_class_name(db_adapter_name)
+            migrator_name = self.__database_migrator_class_name(m_database)
             if migrator_name == "":
-                print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Invalid current migrator name for database adapter (name: {db_adapter_name})!", 'error'))
                 return 1
             # check database name
             if not m_database in db_names:
                 continue
-            # check version
-            if m_command == "up" and new_version == version:
-                break
-            elif m_command == "down" and m_version == version:
-                new_version = version
-                break
             # select current migration database version
-            current_db_version = self.__last_migration_version(m_database)
+            if not m_database in plan_versions:
+                plan_versions[m_database] = list(self.__migration_versions_index(m_database))
+            db_versions = plan_versions[m_database]
+            current_db_version = 0
+            if len(db_versions) > 0:
+                current_db_version = db_versions[-1]
             # check skip
-            if m_command == "up" and current_version >= version:
-                print(f"[{ConsoleLogger.instance().make_color_string('Skip', 'info')}][DB: {m_database_title}] Migration ({m_version} - '{m_class_name}')")
-                continue
-            if m_command == "up" and current_db_version >= m_version:
-                print(f"[{ConsoleLogger.instance().make_color_string('Skip', 'info')}][DB: {m_database_title}] Migration ({m_version} - '{m_class_name}')")
-                continue
-            if m_command == "down" and current_version < m_version:
-                print(f"[{ConsoleLogger.instance().make_color_string('Skip', 'info')}][DB: {m_database_title}] Migration ({m_version} - '{m_class_name}')")
-                continue
-            if m_command == "down" and current_db_version < m_version:
-                print(f"[{ConsoleLogger.instance().make_color_string('Skip', 'info')}][DB: {m_database_title}] Migration ({m_version} - '{m_class_name}')")
+            is_skip = False
+            if m_command == "up" and (current_version >= version or current_db_version >= m_version):
+                is_skip = True
+            if m_command == "down" and (current_version < m_version or current_db_version < m_version):
+                is_skip = True
+            plan.append({
+                'command': m_command,
+                'version': m_version,
+                'class_name': m_class_name,
+                'database': m_database,
+                'migrator': migrator_name,
+                'migrate_version': version,
+                'skip': is_skip
+            })
+            if is_skip:
                 continue
-
-            msg_attr = "to"
-            if m_command == "down":
-                msg_attr = "from"
-
-            print(f"[{ConsoleLogger.instance().make_color_string(m_command.capitalize(), 'ok')}][DB: {m_database_title}] Migrate {msg_attr} ({m_version} - '{m_class_name}')")
-            if not m.migrate(version, migrator_name):
-                print(f"[{ConsoleLogger.instance().make_color_string(m_command.capitalize() + ' - FAILED', 'error')}][DB: {m_database_title}] Migrate {msg_attr} ({m_version} - '{m_class_name}')")
-                r_code = 1
-                break
-
-            # save changed database
-            if not m_database in changed_databases:
-                changed_databases.append(m_database)
-
-            new_version = m_version
+            # update planned database versions
+            index = bisect.bisect_left(db_versions, m_version)
             if m_command == "up":
-                self.__append_migration_version(m_database, new_version)
-            elif m_command == "down":
-                self.__remove_migration_version(m_database, new_version)
+                db_versions.insert(index, m_version)
+            elif index < len(db_versions) and db_versions[index] == m_version:
+                del db_versions[index]
+
+        # make shadow copies of SQLite databases
+        shadow_copies = self.__begin_shadow_copies(plan)
+        if shadow_copies is None:
+            return 1
+        # execute migrations plan
+        r_code, changed_databases = self.__execute_plan(plan, jobs)
 
         print("[MigrationsCore] Finish migrate")
         # select current migration version from database
         current_version = self.__current_migration_version(db_names)
         print(f"[MigrationsCore] Current migration version: {current_version}")
 
+        self.__save_manifest()
         # Execute post-scripts
         if not self.__execute_all_post_scripts(changed_databases):
             r_code = 1
+        # replace SQLite databases by shadow copies
+        if not self.__finish_shadow_copies(shadow_copies, r_code == 0):
+            r_code = 1
+        return r_code
+
+    def migrate_fleet(self, tenants: list, version: int = -1, jobs: int = 1) -> int:
+        """Метод миграции баз данных арендаторов
+
+        :param tenants: список имен арендаторов (см. DatabaseFactory.set_fleet_tenants)
+        :param version: версия миграции, до которой требуется актуализировать базы данных
+        :param jobs: число арендаторов, мигрируемых параллельно (default: 1)
+        :returns: Код результата выполнения
+        :rtype: int
+
+        NOTE: The migrations of the primary database are applied to every tenant database.
+              Tenants are migrated independently: a failed tenant does not stop the others.
+              The number of workers is limited by the connections budget of the database factory.
+              In the schema-per-tenant mode (PostgreSQL) the tenants are schemas of one database:
+              the pool connections are reused and 'search_path' is switched per schema.
+        """
+
+        if len(self.__migrations) == 0:
+            print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Not found migration files!", 'error'))
+            return 1
+        if len(tenants) == 0:
+            print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Tenants list is Empty!", 'error'))
+            return 1
+        if version < 0:
+            version = sys.maxsize
+        migrator_name = self.__database_migrator_class_name(tenants[0])
+        if migrator_name == "":
+            return 1
+        # select migrations of the primary database
+        m_versions = []
+        for m_version in sorted(self.__migrations.keys()):
+            if self.__migration_database(m_version, []) == "":
+                m_versions.append(m_version)
+        self.__save_manifest()
+        # select number of workers
+        workers = max(1, jobs)
+        max_connections = DatabaseFactory.instance().max_connections()
+        if max_connections > 0:
+            workers = min(workers, max_connections)
+        workers = min(workers, len(tenants))
+
+        def process(tenant: str) -> dict:
+            result = {'failed': False, 'version': 0}
+            try:
+                if not self.__check_migration_table(tenant):
+                    print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Check migrations table failed! Tenant: {tenant}", 'error'))
+                    result['failed'] = True
+                    return result
+                plan = self.__fleet_plan(tenant, m_versions, version, migrator_name)
+                lane_result = self.__execute_lane(plan)
+                result['failed'] = lane_result['failed']
+                if len(lane_result['changed']) > 0:
+                    for f in PostScripts.instance().post_scripts():
+                        print(f"[{ConsoleLogger.instance().make_color_string('Install', 'ok')}][DB: {tenant}] Post-script: {f}")
+                        if not self.__execute_post_script(tenant, f):
+                            print(f"[{ConsoleLogger.instance().make_color_string('Install' + ' - FAILED', 'error')}][DB: {tenant}] Post-script: {f}")
+                            result['failed'] = True
+                            break
+                result['version'] = self.__last_migration_version(tenant)
+            except Exception as err:
+                print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Migrate tenant failed! Tenant: {tenant}; Error: {err}", 'error'))
+                result['failed'] = True
+            finally:
+                # NOTE: connections shared by tenant schemas are kept in the pool
+                DatabaseFactory.instance().close_database_adapters(tenant)
+                self.reset_migration_versions(tenant)
+            return result
+
+        BaseMigrator.clear_catalog_cache()
+        print(f"[MigrationsCore] Start migrate fleet (tenants: {len(tenants)}; jobs: {workers}):")
+        if workers <= 1:
+            results = [process(t) for t in tenants]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(process, tenants))
+        print("[MigrationsCore] Finish migrate fleet")
+
+        # show report
+        r_code = 0
+        tenant_versions = {}
+        print("")
+        print("[MigrationsCore] Fleet report:")
+        for tenant, result in zip(tenants, results):
+            state_str = ConsoleLogger.instance().make_color_string('OK', 'ok')
+            if result['failed']:
+                state_str = ConsoleLogger.instance().make_color_string('FAILED', 'error')
+                r_code = 1
+            print(f"[{state_str}][DB: {tenant}] Current migration version: {result['version']}")
+            tenant_versions[result['version']] = tenant_versions.get(result['version'], 0) + 1
+        for m_version in sorted(tenant_versions.keys()):
+            print(f"[MigrationsCore] Version {m_version}: {tenant_versions[m_version]} tenant(s)")
         return r_code
 
-    def migrate_export(self, db_names: list, version: int = -1, dir_export: str = "", re_create_dir: bool = False) -> int:
+    def migrate_export(self, db_names: list, version: int = -1, dir_export: str = "", re_create_dir: bool = False,
+                       offline: bool = False, schema_dir: str = "", jobs: int = 1, from_version: int = 0,
+                       bundle: bool = False) -> int:
         """Метод выгрузки миграций базы данных в SQL файлы
 
         :param db_names: список имен баз данных для которых требуется миграция
         :param version: версия миграции, до которой требуется актуализировать базы данных
         :param dir_export: каталог для экспорта миграций
         :param re_create_dir: пересоздать каталог для экспорта миграций
+        :param offline: экспорт без подключения к базам данных (схема базы данных в памяти)
+        :param schema_dir: каталог файлов схем баз данных для offline экспорта ('<database>.json' / '<database>.sql')
+        :param jobs: число баз данных, выгружаемых параллельно (default: 1)
+        :param from_version: версия миграции, с которой выгружаются миграции (более ранние не выгружаются)
+        :param bundle: сформировать пакет миграций для каждой базы данных ('<database>_<up/down>.sql'; см. ExportBundle)
         :returns: Код результата выполнения
         :rtype: int
+
+        NOTE: In the offline mode the schema of every database is seeded from the schema file
+              (or empty) and is changed by replaying the exported migrations (see OfflineCatalog).
+              For the export of the 'down' sections the 'up' sections are replayed first.
+
+        NOTE: If jobs > 1, the migrations of every database are exported by a separate worker
+              process (see __export_parallel); the exported files and the console output are
+              the same as in the serial export.
+
+        NOTE: The export is incremental: the export directory keeps a manifest (see ExportManifest)
+              and a migration is skipped if its source, the previous migrations of its database
+              and the generator are not changed and the exported file is not modified.
+              In the offline mode the skipped migrations are still replayed to the schema in memory.
         """
 
         if len(self.__migrations) == 0:
@@ -230,6 +363,7 @@ class MigrationCore:
             m_command = 'down'
 
         print(f"[MigrationsCore] Start export migrations:")
+        BaseMigrator.clear_catalog_cache()
 
         # check export dir
         if not os.path.exists(dir_export):
@@ -238,65 +372,85 @@ class MigrationCore:
             shutil.rmtree(dir_export)
             os.mkdir(dir_export)
 
-        new_version = -1
+        # make export plan
+        manifest = ExportManifest(dir_export)
+        plan = self.__export_plan(mirgations, m_command, version, db_names, dir_export, from_version,
+                                  manifest, offline, schema_dir)
+        if plan is None:
+            return 1
+
         r_code = 0
-        for k, m in mirgations.items():
-            # configuration current migration
-            m.configuration()
-            # select migration info
-            m_version = int(k)
-            m_class_name = type(m).__name__
-            m_database = m.database()
-            m_database_title = m_database
-            if m_database_title == "":
-                m_database_title = 'primary'
-            # select current adapter name
-            db_adapter_name = ''
-            if m_database == "":
-                db_adapter_name = DatabaseFactory.instance().primary_adapter_name()
-            else:
-                db_adapter_name = DatabaseFactory.instance().secondary_adapter_name(m_database)
-            # check db adapter name
-            if db_adapter_name == "":
-                print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Invalid current database adapter name!", 'error'))
-                return 1
-            # select current migrator name
-            migrator_name = self.__migrator_class_name(db_adapter_name)
-            if migrator_name == "":
-                print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Invalid current migrator name for database adapter (name: {db_adapter_name})!", 'error'))
+        if jobs > 1 and len(set([step['database'] for step in plan])) > 1 \
+                and 'fork' in multiprocessing.get_all_start_methods():
+            r_code = self.__export_parallel(plan, version, dir_export, offline, schema_dir, jobs, manifest)
+        else:
+            catalogs = {}
+            if offline and m_command == "down" and not self.__replay_offline_catalogs(catalogs, db_names, version, schema_dir):
+                self.__close_offline_catalogs(catalogs)
                 return 1
-            # check database name
-            if not m_database in db_names:
-                continue
-            # check version
-            if m_command == "up" and new_version == version:
-                break
-            elif m_command == "down" and m_version == version:
-                new_version = version
-                break
+            for step in plan:
+                if not self.__export_step(step, step['dir'], version, offline, schema_dir, catalogs):
+                    manifest.remove(step['key'])
+                    r_code = 1
+                    break
+                self.__update_export_manifest(manifest, step)
+            self.__close_offline_catalogs(catalogs)
+        if bundle and r_code == 0:
+            r_code = self.__export_bundles(plan, dir_export, from_version)
+        # the exported files are synced to disk before the manifest is saved
+        ExportSink.sync()
+        manifest.save()
+        self.__save_manifest()
+        print("[MigrationsCore] Finish export migrations")
+        print(f"[MigrationsCore] Directory for export: {dir_export}")
+        return r_code
 
-            # check dir for current database migrations
-            tmp_dir_export = f"{Helper.splice_symbol_last(dir_export, '/')}/{m_database_title}"
-            if not os.path.exists(tmp_dir_export):
-                os.mkdir(tmp_dir_export)
+    def catalog_dump(self, db_names: list, dir_path: str) -> int:
+        """Сохранить схемы баз данных для offline экспорта миграций (см. migrate_export)
 
-            print(f"[{ConsoleLogger.instance().make_color_string(m_command.capitalize(), 'ok')}][DB: {m_database_title}] Export ({m_version} - '{m_class_name}')")
-            if not m.export_migrate(version, migrator_name, Helper.splice_symbol_last(tmp_dir_export, '/')):
-                print(f"[{ConsoleLogger.instance().make_color_string(m_command.capitalize() + ' - FAILED', 'error')}][DB: {m_database_title}] Export ({m_version} - '{m_class_name}')")
-                r_code = 1
-                break
+        :param db_names: список имен баз данных
+        :param dir_path: каталог файлов схем
+        :returns: Код результата выполнения
+        :rtype: int
 
-            new_version = m_version
+        NOTE: SQLite schemas are saved as SQL scripts ('<database>.sql'), other databases
+              as JSON catalogs in the 'catalog_snapshot' format ('<database>.json').
+        """
 
-        print("[MigrationsCore] Finish export migrations")
-        print(f"[MigrationsCore] Directory for export: {dir_export}")
+        if len(db_names) == 0:
+            print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Database names list is Empty!", 'error'))
+            return 1
+        if not os.path.exists(dir_path):
+            os.makedirs(dir_path)
+        r_code = 0
+        for db_name in db_names:
+            db_name_title = db_name
+            if db_name_title == "":
+                db_name_title = 'primary'
+            migrator_name = self.__database_migrator_class_name(db_name)
+            if migrator_name == "":
+                return 1
+            db_adapter = DatabaseFactory.instance().acquire_database_adapter(db_name)
+            if not db_adapter:
+                print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Invalid database adapter (None)! Database: {db_name_title}", 'error'))
+                return 1
+            try:
+                migrator_ = Helper.import_class(migrator_name)
+                path = OfflineCatalog.save_schema(f"{Helper.splice_symbol_last(dir_path, '/')}/{db_name_title}", db_adapter, migrator_(db_adapter))
+                print(f"[{ConsoleLogger.instance().make_color_string('Dump', 'ok')}][DB: {db_name_title}] Schema: {path}")
+            except Exception as err:
+                print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Dump database schema failed! Database: {db_name_title}; Error: {err}", 'error'))
+                r_code = 1
+            finally:
+                DatabaseFactory.instance().release_database_adapter(db_adapter)
         return r_code
 
-    def rollback(self, db_names: list, step: int = 1) -> int:
+    def rollback(self, db_names: list, step: int = 1, jobs: int = 1) -> int:
         """Метод отката миграции
 
         :param db_names: список имен баз данных в которых будет производиться миграция
         :param step: число шагов, на которые нужно откатить базу данных
+        :param jobs: число баз данных, мигрируемых параллельно (default: 1)
         :returns: Код результата выполнения
         :rtype: int
         """
@@ -320,86 +474,107 @@ class MigrationCore:
             return 1
         mirgations = Helper.sort(self.__migrations, True)
         print(f"[MigrationsCore] Start rollback from {current_version}:")
-        new_version = -1
+        # make migrations plan
+        plan = []
+        plan_versions = {}
         save_version_in_db = False
-        changed_databases = []
-        r_code = 0
-        for k, m in mirgations.items():
-            # configuration current migration
-            m.configuration()
+        for k, m_class_name in mirgations.items():
+            # check steps
+            if step == 0 and not save_version_in_db:
+                break
             # select migration info
             m_version = int(k)
-            m_class_name = type(m).__name__
-            m_database = m.database()
-            m_database_title = m_database
-            if m_database_title == "":
-                m_database_title = 'primary'
-            # select current adapter name
-            db_adapter_name = ''
-            if m_database == "":
-                db_adapter_name = DatabaseFactory.instance().primary_adapter_name()
-            else:
-                db_adapter_name = DatabaseFactory.instance().secondary_adapter_name(m_database)
-            # check db adapter name
-            if db_adapter_name == "":
-                print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Invalid current database adapter name!", 'error'))
+            m_database = self.__migration_database(m_version, db_names)
+            if m_database is None and step == 0:
+                # the version is saved for the next loaded migration
+                continue
+            if m_database is None:
+                self.__print_migration_load_failed(m_version, m_class_name)
                 return 1
-            # select current migrator name
-            migrator_name = self.__migrator_class_name(db_adapter_name)
+            migrator_name = self.__database_migrator_class_name(m_database)
             if migrator_name == "":
-                print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Invalid current migrator name for database adapter (name: {db_adapter_name})!", 'error'))
                 return 1
+            # select current migration database version
+            if not m_database in plan_versions:
+                plan_versions[m_database] = list(self.__migration_versions_index(m_database))
+            db_versions = plan_versions[m_database]
             # check save version in db
             if save_version_in_db:
-                self.__append_migration_version(m_database, m_version)
+                plan.append({
+                    'command': 'save',
+                    'version': m_version,
+                    'class_name': m_class_name,
+                    'database': m_database,
+                    'migrator': migrator_name,
+                    'migrate_version': m_version,
+                    'skip': False
+                })
+                index = bisect.bisect_left(db_versions, m_version)
+                if index == len(db_versions) or db_versions[index] != m_version:
+                    db_versions.insert(index, m_version)
                 save_version_in_db = False
-
-            # select current migration database version
-            current_db_version = self.__last_migration_version(m_database)
             # check steps
             if step == 0:
-                new_version = m_version
                 break
             # check database name
             if not m_database in db_names:
                 continue
+            current_db_version = 0
+            if len(db_versions) > 0:
+                current_db_version = db_versions[-1]
             # check version
-            if current_version < m_version or current_db_version < m_version:
-                print(f"[{ConsoleLogger.instance().make_color_string('Skip', 'info')}][DB: {m_database_title}] Migration ({m_version} - '{m_class_name}')")
+            is_skip = current_version < m_version or current_db_version < m_version
+            plan.append({
+                'command': 'down',
+                'version': m_version,
+                'class_name': m_class_name,
+                'database': m_database,
+                'migrator': migrator_name,
+                'migrate_version': m_version - 1,
+                'skip': is_skip
+            })
+            if is_skip:
                 continue
-            print(f"[{ConsoleLogger.instance().make_color_string('Down', 'ok')}][DB: {m_database_title}] Migrate from ({m_version} - '{m_class_name}')")
-            if not m.migrate(m_version - 1, migrator_name):
-                print(f"[{ConsoleLogger.instance().make_color_string('Down - FAILED', 'error')}][DB: {m_database_title}] Migrate from ({m_version} - '{m_class_name}')")
-                r_code = 1
-                break
-
-            # save changed database
-            if not m_database in changed_databases:
-                changed_databases.append(m_database)
-
-            new_version = m_version
-            self.__remove_migration_version(m_database, new_version)
+            # update planned database versions
+            index = bisect.bisect_left(db_versions, m_version)
+            if index < len(db_versions) and db_versions[index] == m_version:
+                del db_versions[index]
             # check is remove all versions
-            tmp_current_db_version = self.__last_migration_version(m_database)
-            if tmp_current_db_version == 0:
+            if len(db_versions) == 0:
                 save_version_in_db = True
             step -= 1
 
+        # NOTE: The saved version of the next migration depends on the result of the previous
+        #       step (of other database maybe), so such plan is executed in the plan order.
+        if jobs > 1 and any(p_step['command'] == 'save' for p_step in plan):
+            jobs = 1
+        # make shadow copies of SQLite databases
+        shadow_copies = self.__begin_shadow_copies(plan)
+        if shadow_copies is None:
+            return 1
+        # execute migrations plan
+        r_code, changed_databases = self.__execute_plan(plan, jobs)
+
         print("[MigrationsCore] Finish rollback")
         # select current migration version from database
         current_version = self.__current_migration_version(db_names)
         print(f"[MigrationsCore] Current migration version: {current_version}")
 
+        self.__save_manifest()
         # Execute post-scripts
         if not self.__execute_all_post_scripts(changed_databases):
             r_code = 1
+        # replace SQLite databases by shadow copies
+        if not self.__finish_shadow_copies(shadow_copies, r_code == 0):
+            r_code = 1
         return r_code
 
-    def migrate_redo(self, db_names: list, step: int = 1) -> int:
+    def migrate_redo(self, db_names: list, step: int = 1, jobs: int = 1) -> int:
         """Метод перустановки миграции
 
         :param db_names: список имен баз данных в которых будет производиться миграция
         :param step: число шагов, на которые нужно перустановить базу данных
+        :param jobs: число баз данных, мигрируемых параллельно (default: 1)
         :returns: Код результата выполнения
         :rtype: int
         """
@@ -408,11 +583,11 @@ class MigrationCore:
         if cur_v == 0:
             print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Migrations have not yet been installed!", 'warning'))
             return 1
-        r_code = self.rollback(db_names, step)
+        r_code = self.rollback(db_names, step, jobs)
         if r_code != 0:
             return r_code
         print("")
-        r_code = self.migrate(db_names, cur_v)
+        r_code = self.migrate(db_names, cur_v, jobs)
         return r_code
 
     def migrate_status(self, db_names: list) -> int:
@@ -425,37 +600,41 @@ class MigrationCore:
 
         cur_v = self.current_version(db_names)
         all_v = self.__all_install_migration_versions(db_names)
+        # installed versions (database is known from 'schema_migrations'; the migration file is not imported)
+        installed_databases = {}
+        for name in db_names:
+            for v in self.__install_migration_versions(name):
+                installed_databases[v] = name
+        r_code = 0
         tmp_state_lst = {}
         for v in all_v:
             m_class_name = ConsoleLogger.instance().make_color_string('???', 'warning')
             state_str = ConsoleLogger.instance().make_color_string('File Not Found', 'warning')
             db_title = ConsoleLogger.instance().make_color_string('???', 'warning')
             if v in self.__migrations:
-                m = self.__migrations[v]
-                # configuration current migration
-                m.configuration()
                 # select migration info
-                m_class_name = type(m).__name__
-                m_database = m.database()
-                db_title = m_database
+                m_class_name = self.__migrations[v]
+                db_title = installed_databases.get(v, '')
                 if db_title == "":
                     db_title = 'primary'
-                # check database name
-                if not m_database in db_names:
-                    continue  # skip
-                state_str = ConsoleLogger.instance().make_color_string('Not Installed', 'info-2')
-                if self.__last_migration_version(m.database()) >= v:
-                    state_str = ConsoleLogger.instance().make_color_string('Installed', 'ok')
+                state_str = ConsoleLogger.instance().make_color_string('Installed', 'ok')
 
             tmp_state_lst[v] = str(f"[{state_str}][DB: {db_title}] Migration ({v} - '{m_class_name}')")
 
         size = 0
-        for k, m in self.__migrations.items():
-            # configuration current migration
-            m.configuration()
+        for k, m_class_name in self.__migrations.items():
+            if k in installed_databases:
+                size += 1
+                continue
             # select migration info
-            m_class_name = type(m).__name__
-            m_database = m.database()
+            m_database = self.__migration_database(k, db_names)
+            if m_database is None:
+                state_str = ConsoleLogger.instance().make_color_string('Load - FAILED', 'error')
+                db_title = ConsoleLogger.instance().make_color_string('???', 'warning')
+                tmp_state_lst[k] = str(f"[{state_str}][DB: {db_title}] Migration ({k} - '{m_class_name}')")
+                size += 1
+                r_code = 1
+                continue
             db_title = m_database
             if db_title == "":
                 db_title = 'primary'
@@ -463,11 +642,12 @@ class MigrationCore:
             if not m_database in db_names:
                 continue  # skip
             state_str = ConsoleLogger.instance().make_color_string('Not Installed', 'info-2')
-            if self.__last_migration_version(m.database()) >= k:
+            if self.__last_migration_version(m_database) >= k:
                 state_str = ConsoleLogger.instance().make_color_string('Installed', 'ok')
             tmp_state_lst[k] = str(f"[{state_str}][DB: {db_title}] Migration ({k} - '{m_class_name}')")
             size += 1
 
+        self.__save_manifest()
         size_installed = len(all_v)
         tmp_state_lst_sorted = Helper.sort(tmp_state_lst)
         print(f"[MigrationsCore] Current database version: {cur_v}")
@@ -475,19 +655,22 @@ class MigrationCore:
         print(f"[MigrationsCore] Installed in database: {size_installed}")
         for t in tmp_state_lst_sorted.values():
             print(t)
-        return 0
+        return r_code
 
-    def db_create(self, db_name: str) -> int:
+    def db_create(self, db_name: str, factory: DatabaseFactory = None) -> int:
         """Создать базу данных для миграций
 
         :param db_name: имя базы данных
+        :param factory: фабрика адаптеров баз данных (если None - DatabaseFactory.instance())
         :returns: Код результата выполнения
         :rtype: int
         """
 
-        db_adapter_name = DatabaseFactory.instance().primary_adapter_name()
+        if factory is None:
+            factory = DatabaseFactory.instance()
+        db_adapter_name = factory.primary_adapter_name()
         if db_name != "":
-            db_adapter_name = DatabaseFactory.instance().secondary_adapter_name(db_name)
+            db_adapter_name = factory.secondary_adapter_name(db_name)
         if db_adapter_name == "":
             print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Invalid current database adapter name!", 'error'))
             return 1
@@ -497,11 +680,11 @@ class MigrationCore:
             return 1
         # processing
         # create database
-        db_adapter = DatabaseFactory.instance().create_database_adapter({'database': db_name, 'auto-connect': False})
+        db_adapter = factory.create_database_adapter({'database': db_name, 'auto-connect': False})
         if not db_adapter:
             print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Invalid database adapter (None)!", 'error'))
             return 1
-        migrator_ = Helper.lookup(migrator_name, globals())
+        migrator_ = Helper.import_class(migrator_name)
         migrator = migrator_(db_adapter)
         if not migrator:
             print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Invalid database migrator (None)!", 'error'))
@@ -519,22 +702,26 @@ class MigrationCore:
             print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Connect to database server failed!", 'error'))
             return 1
         migrator.create_database(tmp_db_name)
+        self.reset_migration_versions(db_name)
         del migrator
         del db_adapter
         print("[MigrationsCore] Finish create database")
         return 0
 
-    def db_drop(self, db_name: str) -> int:
+    def db_drop(self, db_name: str, factory: DatabaseFactory = None) -> int:
         """Удалить базу данных для миграций
 
         :param db_name: имя базы данных
+        :param factory: фабрика адаптеров баз данных (если None - DatabaseFactory.instance())
         :returns: Код результата выполнения
         :rtype: int
         """
 
-        db_adapter_name = DatabaseFactory.instance().primary_adapter_name()
+        if factory is None:
+            factory = DatabaseFactory.instance()
+        db_adapter_name = factory.primary_adapter_name()
         if db_name != "":
-            db_adapter_name = DatabaseFactory.instance().secondary_adapter_name(db_name)
+            db_adapter_name = factory.secondary_adapter_name(db_name)
         if db_adapter_name == "":
             print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Invalid current database adapter name!", 'error'))
             return 1
@@ -544,11 +731,11 @@ class MigrationCore:
             return 1
         # processing
         # create database
-        db_adapter = DatabaseFactory.instance().create_database_adapter({'database': db_name, 'auto-connect': False})
+        db_adapter = factory.create_database_adapter({'database': db_name, 'auto-connect': False})
         if not db_adapter:
             print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Invalid database adapter (None)!", 'error'))
             return 1
-        migrator_ = Helper.lookup(migrator_name, globals())
+        migrator_ = Helper.import_class(migrator_name)
         migrator = migrator_(db_adapter)
         if not migrator:
             print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Invalid database migrator (None)!", 'error'))
@@ -560,22 +747,831 @@ class MigrationCore:
             return 1
 
         print(f"[MigrationsCore] Start drop database (name: {tmp_db_name})")
+        factory.close_database_adapters(db_name)
         del db_adapter_settings['database']
         db_adapter.set_settings(db_adapter_settings)
         if not db_adapter.connect():
             print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Connect to database server failed!", 'error'))
             return 1
         migrator.drop_database(tmp_db_name)
+        self.reset_migration_versions(db_name)
         del migrator
         del db_adapter
         print("[MigrationsCore] Finish drop database")
         return 0
 
+    def db_create_all(self, factories: dict, jobs: int = 1) -> int:
+        """Создать все базы данных для миграций
+
+        :param factories: фабрики адаптеров баз данных по окружениям (пример: {'development': DatabaseFactory})
+        :param jobs: число баз данных, создаваемых параллельно (default: 1)
+        :returns: Код результата выполнения
+        :rtype: int
+        """
+
+        return self.__db_process_all('create', factories, jobs)
+
+    def db_drop_all(self, factories: dict, jobs: int = 1) -> int:
+        """Удалить все базы данных для миграций
+
+        :param factories: фабрики адаптеров баз данных по окружениям (пример: {'development': DatabaseFactory})
+        :param jobs: число баз данных, удаляемых параллельно (default: 1)
+        :returns: Код результата выполнения
+        :rtype: int
+        """
+
+        return self.__db_process_all('drop', factories, jobs)
+
+    def __db_process_all(self, action: str, factories: dict, jobs: int = 1) -> int:
+        """Создать или удалить все базы данных для миграций
+
+        :param action: действие (create/drop)
+        :param factories: фабрики адаптеров баз данных по окружениям
+        :param jobs: число баз данных, обрабатываемых параллельно
+        :returns: Код результата выполнения
+        :rtype: int
+        """
+
+        tasks = []
+        for env, factory in factories.items():
+            for db_name in [''] + factory.secondary_databases():
+                tasks.append((env, db_name, factory))
+        if len(tasks) == 0:
+            return 0
+
+        def process(task) -> int:
+            env, db_name, factory = task
+            try:
+                if action == 'create':
+                    return self.db_create(db_name, factory)
+                return self.db_drop(db_name, factory)
+            except Exception as err:
+                print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Failed to {action} database! Error: {err}", 'error'))
+                return 1
+
+        if jobs <= 1:
+            results = [process(t) for t in tasks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+                results = list(executor.map(process, tasks))
+
+        # show results
+        r_code = 0
+        print("")
+        print(f"[MigrationsCore] Result ({action} database):")
+        for task, result in zip(tasks, results):
+            env, db_name, factory = task
+            db_title = db_name
+            if db_title == "":
+                db_title = 'primary'
+            state_str = ConsoleLogger.instance().make_color_string('OK', 'ok')
+            if result != 0:
+                state_str = ConsoleLogger.instance().make_color_string('FAILED', 'error')
+                r_code = 1
+            print(f"[{state_str}][Env: {env}][DB: {db_title}] {factory.database_settings(db_name).get('database', '')}")
+        return r_code
+
+    def __migration(self, version: int):
+        """Получить объект миграции
+
+        :param version: версия миграции
+        :return: объект миграции или None
+        :rtype: BaseMigration|None
+
+        NOTE: The migration module is imported and configured on the first call only.
+        """
+
+        if version in self.__migration_objects:
+            return self.__migration_objects[version]
+        instance = None
+        class_name = self.__migrations.get(version, "")
+        if class_name != "":
+            try:
+                module = importlib.import_module(f"{version}_{class_name}")
+                class_ = getattr(module, class_name)
+                instance = class_()
+                if instance.is_valid():
+                    # configuration current migration
+                    instance.configuration()
+                    # save migration info
+                    if self.__manifest:
+                        self.__manifest.update(self.__migration_file(version), version, class_name,
+                                               self.__env_name(), instance.database())
+                else:
+                    print(f"Invalid migration version: {instance.version()}")
+                    instance = None
+            except Exception as inst:
+                print(f"Exception: {inst}")
+                instance = None
+        self.__migration_objects[version] = instance
+        return instance
+
+    def __print_migration_load_failed(self, version: int, class_name: str):
+        """Вывести сообщение об ошибке загрузки миграции
+
+        :param version: версия миграции
+        :param class_name: имя класса миграции
+        """
+
+        print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Load migration failed! Migration: ({version} - '{class_name}')", 'error'))
+
+    def __fleet_migration(self, migration, db_name: str):
+        """Создать отдельный объект миграции для базы данных арендатора
+
+        :param migration: загруженный объект миграции
+        :param db_name: имя базы данных арендатора
+        :return: объект миграции
+        :rtype: BaseMigration
+
+        NOTE: Migration objects store the adapter while migrating, so tenants migrated
+              in parallel use own objects of the migration class.
+        """
+
+        instance = type(migration)()
+        instance.configuration()
+        instance.set_database(db_name)
+        return instance
+
+    def __fleet_plan(self, tenant: str, m_versions: list, version: int, migrator_name: str) -> list:
+        """Составить план миграций базы данных арендатора
+
+        :param tenant: имя арендатора
+        :param m_versions: отсортированный список версий миграций основной базы данных
+        :param version: версия миграции, до которой требуется актуализировать базу данных
+        :param migrator_name: название класса мигратора
+        :return: список шагов миграций (в порядке выполнения)
+        :rtype: list
+        """
+
+        db_versions = list(self.__migration_versions_index(tenant))
+        current_version = 0
+        if len(db_versions) > 0:
+            current_version = db_versions[-1]
+        if current_version == version:
+            return []
+        m_command = 'up'
+        if current_version > version:
+            m_command = 'down'
+            m_versions = list(reversed(m_versions))
+        plan = []
+        for m_version in m_versions:
+            # check version range
+            if m_command == "up" and m_version > version:
+                break
+            elif m_command == "down" and m_version <= version:
+                break
+            current_db_version = 0
+            if len(db_versions) > 0:
+                current_db_version = db_versions[-1]
+            is_skip = False
+            if m_command == "up" and current_db_version >= m_version:
+                is_skip = True
+            if m_command == "down" and current_db_version < m_version:
+                is_skip = True
+            plan.append({
+                'command': m_command,
+                'version': m_version,
+                'class_name': self.__migrations[m_version],
+                'database': tenant,
+                'migrator': migrator_name,
+                'migrate_version': version,
+                'skip': is_skip,
+                'fleet': True
+            })
+            if is_skip:
+                continue
+            index = bisect.bisect_left(db_versions, m_version)
+            if m_command == "up":
+                db_versions.insert(index, m_version)
+            elif index < len(db_versions) and db_versions[index] == m_version:
+                del db_versions[index]
+        return plan
+
+    def __migration_database(self, version: int, db_names: list):
+        """Получить имя базы данных миграции
+
+        :param version: версия миграции
+        :param db_names: список имен баз данных, установленные версии которых проверяются без загрузки миграции
+        :return: имя базы данных или None (если миграцию не удалось загрузить)
+        :rtype: str|None
+        """
+
+        for name in db_names:
+            versions = self.__migration_versions_index(name)
+            index = bisect.bisect_left(versions, version)
+            if index < len(versions) and versions[index] == version:
+                return name
+        if self.__manifest:
+            m_database = self.__manifest.database(self.__migration_file(version), self.__env_name())
+            if not m_database is None:
+                return m_database
+        m = self.__migration(version)
+        if not m:
+            return None
+        return m.database()
+
+    def __migration_file(self, version: int) -> str:
+        """Получить путь до файла миграции
+
+        :param version: версия миграции
+        :rtype: str
+        """
+
+        return f"{Helper.splice_symbol_last(self.__migrations_dir, '/')}/{version}_{self.__migrations.get(version, '')}.py"
+
+    def __env_name(self) -> str:
+        """Название текущего окружения (production/development)
+
+        :rtype: str
+        """
+
+        if Config.instance().is_production():
+            return 'production'
+        return 'development'
+
+    def __save_manifest(self):
+        """Сохранить кэш сведений о миграциях"""
+
+        if self.__manifest:
+            self.__manifest.save()
+
+    def __database_adapter_name(self, db_name: str) -> str:
+        """Запросить имя адаптера базы данных
+
+        :param db_name: имя базы данных
+        :return: имя адаптера базы данных (пустая строка, если не найден)
+        :rtype: str
+        """
+
+        # select current adapter name
+        db_adapter_name = ''
+        if db_name == "":
+            db_adapter_name = DatabaseFactory.instance().primary_adapter_name()
+        elif DatabaseFactory.instance().is_fleet_tenant(db_name):
+            db_adapter_name = DatabaseFactory.instance().fleet_adapter_name()
+        else:
+            db_adapter_name = DatabaseFactory.instance().secondary_adapter_name(db_name)
+        # check db adapter name
+        if db_adapter_name == "":
+            print(ConsoleLogger.instance().make_color_string("[MigrationsCore] Invalid current database adapter name!", 'error'))
+        return db_adapter_name
+
+    def __database_migrator_class_name(self, db_name: str) -> str:
+        """Запросить имя класса обработчика миграций для базы данных
+
+        :param db_name: имя базы данных
+        :return: имя класса обработчика миграций (пустая строка, если не найден)
+        :rtype: str
+        """
+
+        db_adapter_name = self.__database_adapter_name(db_name)
+        if db_adapter_name == "":
+            return ""
+        # select current migrator name
+        migrator_name = self.__migrator_class_name(db_adapter_name)
+        if migrator_name == "":
+            print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Invalid current migrator name for database adapter (name: {db_adapter_name})!", 'error'))
+        return migrator_name
+
+    def __execute_plan(self, plan: list, jobs: int = 1):
+        """Выполнить план миграций
+
+        :param plan: список шагов миграций (в порядке выполнения)
+        :param jobs: число баз данных, мигрируемых параллельно
+        :return: код результата выполнения и список измененных баз данных
+        :rtype: tuple
+
+        NOTE: If jobs > 1, the plan is split into lanes (one lane per database; the order
+              of migrations inside a lane is kept) and the lanes are executed in parallel.
+              The catalog cache of the migrators is cleared before the run.
+        """
+
+        BaseMigrator.clear_catalog_cache()
+        lanes = {}
+        for step in plan:
+            if not step['database'] in lanes:
+                lanes[step['database']] = []
+            lanes[step['database']].append(step)
+        if jobs <= 1 or len(lanes) <= 1:
+            results = [self.__execute_lane(plan)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(jobs, len(lanes))) as executor:
+                futures = [executor.submit(self.__execute_lane, lane) for lane in lanes.values()]
+                results = [f.result() for f in futures]
+        r_code = 0
+        changed_databases = []
+        for result in results:
+            if result['failed']:
+                r_code = 1
+        for step in plan:
+            if step['database'] in changed_databases:
+                continue
+            for result in results:
+                if step['database'] in result['changed']:
+                    changed_databases.append(step['database'])
+                    break
+        return r_code, changed_databases
+
+    def __execute_lane(self, lane: list) -> dict:
+        """Выполнить шаги миграций последовательно
+
+        :param lane: список шагов миграций
+        :return: результат выполнения (failed - есть ошибки; changed - список измененных баз данных)
+        :rtype: dict
+        """
+
+        result = {'failed': False, 'changed': []}
+        for step in lane:
+            m_command = step['command']
+            m_version = step['version']
+            m_class_name = step['class_name']
+            m_database = step['database']
+            m_database_title = m_database
+            if m_database_title == "":
+                m_database_title = 'primary'
+            if step['skip']:
+                print(f"[{ConsoleLogger.instance().make_color_string('Skip', 'info')}][DB: {m_database_title}] Migration ({m_version} - '{m_class_name}')")
+                continue
+            if m_command == "save":
+                # save version of the next migration in db (rollback of all versions of database)
+                self.__append_migration_version(m_database, m_version)
+                continue
+
+            msg_attr = "to"
+            if m_command == "down":
+                msg_attr = "from"
+
+            print(f"[{ConsoleLogger.instance().make_color_string(m_command.capitalize(), 'ok')}][DB: {m_database_title}] Migrate {msg_attr} ({m_version} - '{m_class_name}')")
+            try:
+                m = self.__migration(m_version)
+                if m and step.get('fleet', False):
+                    m = self.__fleet_migration(m, m_database)
+                is_ok = m and m.migrate(step['migrate_version'], step['migrator'])
+                if is_ok:
+                    # save changed database
+                    if not m_database in result['changed']:
+                        result['changed'].append(m_database)
+                    if m_command == "up":
+                        self.__append_migration_version(m_database, m_version)
+                    elif m_command == "down":
+                        self.__remove_migration_version(m_database, m_version)
+            except Exception as err:
+                print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Migrate failed! Error: {err}", 'error'))
+                is_ok = False
+            if not is_ok:
+                print(f"[{ConsoleLogger.instance().make_color_string(m_command.capitalize() + ' - FAILED', 'error')}][DB: {m_database_title}] Migrate {msg_attr} ({m_version} - '{m_class_name}')")
+                result['failed'] = True
+                break
+        return result
+
+    def __export_plan(self, migrations: dict, command: str, version: int, db_names: list, dir_export: str,
+                      from_version: int, manifest: ExportManifest, offline: bool, schema_dir: str):
+        """Сформировать план выгрузки миграций
+
+        :param migrations: отсортированные миграции (ключ - версия, значение - имя класса)
+        :param command: секция миграций (up/down)
+        :param version: версия миграции, до которой выгружаются миграции
+        :param db_names: список имен баз данных
+        :param dir_export: каталог для экспорта миграций
+        :param from_version: версия миграции, с которой выгружаются миграции
+        :param manifest: манифест каталога экспорта
+        :param offline: экспорт без подключения к базам данных
+        :param schema_dir: каталог файлов схем баз данных
+        :return: список шагов выгрузки (в порядке выполнения) или None при ошибке
+        :rtype: list|None
+
+        NOTE: A step is skipped ('skip') if its version is lower than from_version or the exported
+              file is up to date (see ExportManifest.is_exported).
+        NOTE: The databases of the migrations are selected from the migrations manifest (see
+              MigrationManifest); the migrations are loaded by __export_step only.
+        """
+
+        plan = []
+        new_version = -1
+        for k, m_class_name in migrations.items():
+            # select migration info
+            m_version = int(k)
+            # check version range
+            if command == "up" and m_version > version:
+                break
+            elif command == "down" and m_version <= version:
+                break
+            m_database = self.__migration_database(m_version, [])
+            if m_database is None:
+                self.__print_migration_load_failed(m_version, m_class_name)
+                return None
+            m_database_title = m_database
+            if m_database_title == "":
+                m_database_title = 'primary'
+            db_adapter_name = self.__database_adapter_name(m_database)
+            if db_adapter_name == "":
+                return None
+            migrator_name = self.__database_migrator_class_name(m_database)
+            if migrator_name == "":
+                return None
+            # check database name
+            if not m_database in db_names:
+                continue
+            # check version
+            if command == "up" and new_version == version:
+                break
+            m_file = os.path.basename(self.__migration_file(m_version)).replace(".py", ".sql")
+            m_key = f"{m_database_title}/{m_file}"
+            plan.append({
+                'command': command,
+                'version': m_version,
+                'class_name': m_class_name,
+                'database': m_database,
+                'adapter': db_adapter_name,
+                'migrator': migrator_name,
+                'dir': f"{Helper.splice_symbol_last(dir_export, '/')}/{m_database_title}",
+                'file': m_file,
+                'key': m_key,
+                'source_hash': manifest.source_hash(m_key, self.__migration_file(m_version)),
+                'input': "",
+                'skip': False
+            })
+            new_version = m_version
+
+        # make input hashes (chained over the migrations of every database)
+        input_hashes = {}
+        for step in plan:
+            if step['database'] in input_hashes:
+                continue
+            values = ['offline' if offline else 'online']
+            if offline:
+                schema_file = OfflineCatalog.schema_file(schema_dir, step['database'])
+                values.append(ExportManifest.file_hash(schema_file) if schema_file else "")
+            if command == "down":
+                # the 'up' sections are replayed before the export of the 'down' sections
+                values += [s['source_hash'] for s in plan if s['database'] == step['database']]
+            input_hashes[step['database']] = ExportManifest.chain_hash(ExportManifest.generator_hash(), values)
+        for step in plan:
+            step['input'] = ExportManifest.chain_hash(input_hashes[step['database']],
+                                                      [step['command'], step['migrator'], step['version'],
+                                                       step['class_name'], step['source_hash']])
+            input_hashes[step['database']] = step['input']
+            step['skip'] = step['version'] < from_version \
+                or manifest.is_exported(step['key'], step['input'], f"{step['dir']}/{step['file']}")
+        return plan
+
+    def __export_bundles(self, plan: list, dir_export: str, from_version: int) -> int:
+        """Сформировать пакеты миграций баз данных из выгруженных SQL файлов
+
+        :param plan: список шагов выгрузки (в порядке выполнения)
+        :param dir_export: каталог для экспорта миграций
+        :param from_version: версия миграции, с которой выгружаются миграции
+        :returns: Код результата выполнения
+        :rtype: int
+        """
+
+        bundles = {}
+        for step in plan:
+            export_file = f"{step['dir']}/{step['file']}"
+            if step['version'] < from_version or not os.path.isfile(export_file):
+                continue
+            if not step['database'] in bundles:
+                try:
+                    bundles[step['database']] = ExportBundle(step['adapter'], step['command'], step['database'])
+                except Exception as err:
+                    print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Make export bundle failed! Error: {err}", 'error'))
+                    return 1
+            with open(export_file, 'r') as f:
+                bundles[step['database']].append(step['version'], step['class_name'], f.read())
+        for step in plan:
+            if not step['database'] in bundles:
+                continue
+            export_bundle = bundles.pop(step['database'])
+            bundle_file = f"{Helper.splice_symbol_last(dir_export, '/')}/{os.path.basename(step['dir'])}_{step['command']}.sql"
+            try:
+                export_bundle.save(bundle_file)
+            except Exception as err:
+                print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Save export bundle failed! File: {bundle_file}; Error: {err}", 'error'))
+                return 1
+            print(f"[{ConsoleLogger.instance().make_color_string('Bundle', 'ok')}][DB: {os.path.basename(step['dir'])}] Export ({export_bundle.size()} migration(s)): {bundle_file}")
+        return 0
+
+    def __update_export_manifest(self, manifest: ExportManifest, step: dict):
+        """Обновить запись манифеста каталога экспорта для выгруженной миграции
+
+        :param manifest: манифест каталога экспорта
+        :param step: шаг плана выгрузки
+        """
+
+        if step['skip']:
+            return
+        manifest.update(step['key'], step['version'], step['input'], self.__migration_file(step['version']),
+                        f"{step['dir']}/{step['file']}")
+
+    def __export_step(self, step: dict, dir_path: str, version: int, offline: bool, schema_dir: str, catalogs: dict) -> bool:
+        """Выгрузить миграцию шага плана выгрузки
+
+        :param step: шаг плана выгрузки
+        :param dir_path: каталог для SQL файла миграции
+        :param version: версия миграции, до которой выгружаются миграции
+        :param offline: экспорт без подключения к базе данных
+        :param schema_dir: каталог файлов схем баз данных
+        :param catalogs: созданные схемы баз данных в памяти (ключ - имя базы данных)
+        :rtype: bool
+        """
+
+        m_database_title = step['database']
+        if m_database_title == "":
+            m_database_title = 'primary'
+        m_command = step['command']
+        # check dir for current database migrations
+        if not os.path.exists(dir_path):
+            os.mkdir(dir_path)
+
+        # select schema in memory (offline export)
+        catalog = None
+        if offline:
+            catalog = self.__offline_catalog(catalogs, step['database'], schema_dir)
+            if not catalog:
+                return False
+
+        if step['skip']:
+            print(f"[{ConsoleLogger.instance().make_color_string('Skip', 'info')}][DB: {m_database_title}] Export ({step['version']} - '{step['class_name']}')")
+            if not catalog:
+                return True
+            # replay the skipped migration to the schema in memory
+            m = self.__migration(step['version'])
+            if not m:
+                self.__print_migration_load_failed(step['version'], step['class_name'])
+            if not m or not m.export_migrate(version, step['migrator'], "", catalog):
+                print(f"[{ConsoleLogger.instance().make_color_string('Skip - FAILED', 'error')}][DB: {m_database_title}] Export ({step['version']} - '{step['class_name']}')")
+                return False
+            return True
+
+        print(f"[{ConsoleLogger.instance().make_color_string(m_command.capitalize(), 'ok')}][DB: {m_database_title}] Export ({step['version']} - '{step['class_name']}')")
+        m = self.__migration(step['version'])
+        if not m:
+            self.__print_migration_load_failed(step['version'], step['class_name'])
+        if not m or not m.export_migrate(version, step['migrator'], Helper.splice_symbol_last(dir_path, '/'), catalog):
+            print(f"[{ConsoleLogger.instance().make_color_string(m_command.capitalize() + ' - FAILED', 'error')}][DB: {m_database_title}] Export ({step['version']} - '{step['class_name']}')")
+            return False
+        return True
+
+    def __export_parallel(self, plan: list, version: int, dir_export: str, offline: bool, schema_dir: str, jobs: int,
+                          manifest: ExportManifest) -> int:
+        """Выгрузить миграции параллельно (один процесс на базу данных)
+
+        :param plan: список шагов выгрузки (в порядке выполнения)
+        :param version: версия миграции, до которой выгружаются миграции
+        :param dir_export: каталог для экспорта миграций
+        :param offline: экспорт без подключения к базам данных
+        :param schema_dir: каталог файлов схем баз данных
+        :param jobs: число процессов
+        :param manifest: манифест каталога экспорта
+        :returns: Код результата выполнения
+        :rtype: int
+
+        NOTE: The plan is split into lanes (one lane per database; the order of migrations inside
+              a lane is kept). Every lane is exported by a forked worker process (see export_lane)
+              into a staging directory, and the console output of every step is captured.
+              The results are merged in the plan order: the output is printed and the files are
+              moved into the export directory up to the first failed step, so the export
+              directory and the output are the same as in the serial export.
+        """
+
+        lanes = {}
+        for i, step in enumerate(plan):
+            if not step['database'] in lanes:
+                lanes[step['database']] = []
+            lanes[step['database']].append(dict(step, index=i))
+        stage_dir = tempfile.mkdtemp(prefix='.export-', dir=dir_export)
+        try:
+            tasks = []
+            for db_name, steps in lanes.items():
+                tasks.append({
+                    'database': db_name,
+                    'steps': steps,
+                    'dir': f"{stage_dir}/{os.path.basename(steps[0]['dir'])}",
+                    'version': version,
+                    'offline': offline,
+                    'schema_dir': schema_dir
+                })
+            context = multiprocessing.get_context('fork')
+            sys.stdout.flush()
+            with ProcessPoolExecutor(max_workers=min(jobs, len(tasks)), mp_context=context) as executor:
+                futures = [executor.submit(MigrationCore.export_lane, task) for task in tasks]
+                results = [f.result() for f in futures]
+
+            # offline replay output (in the order of the serial replay: by the first migration version)
+            is_replayed = True
+            for result in sorted(results, key=lambda r: r['order']):
+                print(result['replay'], end='')
+                is_replayed = is_replayed and result['is_replayed']
+            if not is_replayed:
+                return 1
+
+            # merge results in the plan order
+            steps = {}
+            for result in results:
+                for step in result['steps']:
+                    steps[step['index']] = step
+            for i, step in enumerate(plan):
+                result_step = steps.get(i, None)
+                if not result_step:
+                    break
+                print(result_step['output'], end='')
+                if not os.path.exists(step['dir']):
+                    os.mkdir(step['dir'])
+                export_file = f"{step['dir']}/{step['file']}"
+                if not result_step['is_ok']:
+                    # same as ExportSink.discard in the serial export
+                    if os.path.isfile(export_file):
+                        os.remove(export_file)
+                    manifest.remove(step['key'])
+                    return 1
+                stage_file = f"{stage_dir}/{os.path.basename(step['dir'])}/{step['file']}"
+                if os.path.isfile(stage_file):
+                    os.replace(stage_file, export_file)
+                self.__update_export_manifest(manifest, step)
+            return 0
+        finally:
+            shutil.rmtree(stage_dir, ignore_errors=True)
+
+    @staticmethod
+    def export_lane(task: dict) -> dict:
+        """Выгрузить миграции одной базы данных (в процессе-обработчике __export_parallel)
+
+        :param task: задача (database, steps, dir, version, offline, schema_dir)
+        :return: результат выгрузки (order - минимальная версия миграции; replay - вывод повтора миграций;
+                 is_replayed - повтор выполнен; steps - шаги с выводом в консоль (output) и результатом (is_ok))
+        :rtype: dict
+
+        NOTE: The worker is forked from the main process, so the loaded configuration and
+              migrations are inherited; the inherited connections are not used (see
+              DatabaseFactory.detach_database_adapters).
+        """
+
+        DatabaseFactory.instance().detach_database_adapters()
+        BaseMigrator.clear_catalog_cache()
+        core = MigrationCore.instance()
+        result = {'order': min([step['version'] for step in task['steps']]), 'replay': "", 'is_replayed': True, 'steps': []}
+        catalogs = {}
+        try:
+            if task['offline'] and len(task['steps']) > 0 and task['steps'][0]['command'] == "down":
+                with contextlib.redirect_stdout(io.StringIO()) as output:
+                    result['is_replayed'] = core.__replay_offline_catalogs(catalogs, [task['database']], task['version'], task['schema_dir'])
+                result['replay'] = output.getvalue()
+                if not result['is_replayed']:
+                    return result
+            for step in task['steps']:
+                with contextlib.redirect_stdout(io.StringIO()) as output:
+                    try:
+                        is_ok = core.__export_step(step, task['dir'], task['version'], task['offline'], task['schema_dir'], catalogs)
+                    except Exception as err:
+                        print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Export failed! Error: {err}", 'error'))
+                        is_ok = False
+                result['steps'].append({'index': step['index'], 'version': step['version'], 'output': output.getvalue(), 'is_ok': is_ok})
+                if not is_ok:
+                    break
+        finally:
+            core.__close_offline_catalogs(catalogs)
+            DatabaseFactory.instance().close_database_adapters()
+        return result
+
+    def __offline_catalog(self, catalogs: dict, db_name: str, schema_dir: str):
+        """Получить схему базы данных в памяти для offline экспорта (создается при первом обращении)
+
+        :param catalogs: созданные схемы баз данных (ключ - имя базы данных)
+        :param db_name: имя базы данных
+        :param schema_dir: каталог файлов схем баз данных
+        :rtype: OfflineCatalog|None
+        """
+
+        if db_name in catalogs:
+            return catalogs[db_name]
+        db_name_title = db_name
+        if db_name_title == "":
+            db_name_title = 'primary'
+        schema_file = OfflineCatalog.schema_file(schema_dir, db_name)
+        try:
+            catalog = OfflineCatalog(db_name, DatabaseFactory.instance().database_settings(db_name), schema_file)
+        except Exception as err:
+            print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Make offline catalog failed! Database: {db_name_title}; Error: {err}", 'error'))
+            return None
+        print(f"[{ConsoleLogger.instance().make_color_string('Offline', 'info')}][DB: {db_name_title}] Schema: {schema_file if schema_file else 'empty'}")
+        catalogs[db_name] = catalog
+        return catalog
+
+    def __replay_offline_catalogs(self, catalogs: dict, db_names: list, version: int, schema_dir: str) -> bool:
+        """Повторить миграции (секция up) в схемах баз данных в памяти без экспорта (перед экспортом секций down)
+
+        :param catalogs: созданные схемы баз данных (ключ - имя базы данных)
+        :param db_names: список имен баз данных
+        :param version: версия миграции, до которой выгружаются секции down
+        :param schema_dir: каталог файлов схем баз данных
+        :rtype: bool
+        """
+
+        for k in Helper.sort(self.__migrations).keys():
+            m_version = int(k)
+            if m_version <= version:
+                continue
+            m = self.__migration(m_version)
+            if not m or not m.database() in db_names:
+                continue
+            migrator_name = self.__database_migrator_class_name(m.database())
+            if migrator_name == "":
+                return False
+            catalog = self.__offline_catalog(catalogs, m.database(), schema_dir)
+            if not catalog or not m.export_migrate(sys.maxsize, migrator_name, "", catalog):
+                print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Replay migration to offline catalog failed! Version: {m_version}", 'error'))
+                return False
+        return True
+
+    @staticmethod
+    def __close_offline_catalogs(catalogs: dict):
+        """Закрыть схемы баз данных в памяти
+
+        :param catalogs: созданные схемы баз данных (ключ - имя базы данных)
+        """
+
+        for catalog in catalogs.values():
+            catalog.close()
+        catalogs.clear()
+
+    def __begin_shadow_copies(self, plan: list):
+        """Создать теневые копии баз данных SQLite, изменяемых планом миграций (ключ 'shadow_copy')
+
+        :param plan: список шагов миграций
+        :return: список теневых копий (None - при ошибке)
+        :rtype: list|None
+        """
+
+        shadow_copies = []
+        for step in plan:
+            m_database = step['database']
+            if step['skip'] or m_database in [c.database() for c in shadow_copies]:
+                continue
+            settings = DatabaseFactory.instance().database_settings(m_database)
+            if DatabaseFactory.instance().is_fleet_tenant(m_database) or not SQLiteShadowCopy.is_enabled(settings):
+                continue
+            m_database_title = m_database
+            if m_database_title == "":
+                m_database_title = 'primary'
+            shadow_copy = SQLiteShadowCopy(m_database, settings)
+            DatabaseFactory.instance().close_database_adapters(m_database)
+            try:
+                shadow_copy.begin()
+            except Exception as err:
+                print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Make shadow copy failed! Database: {m_database_title}; Error: {err}", 'error'))
+                self.__finish_shadow_copies(shadow_copies, False)
+                return None
+            print(f"[{ConsoleLogger.instance().make_color_string('Copy', 'ok')}][DB: {m_database_title}] Shadow copy: {shadow_copy.shadow_path()}")
+            shadow_copies.append(shadow_copy)
+        return shadow_copies
+
+    def __finish_shadow_copies(self, shadow_copies: list, is_swap: bool) -> bool:
+        """Заменить базы данных SQLite их теневыми копиями (или удалить копии)
+
+        :param shadow_copies: список теневых копий
+        :param is_swap: заменить базы данных (если False - удалить копии)
+        :return: результат замены
+        :rtype: bool
+
+        NOTE: If the copy is removed, the loaded migration versions of the database are reset
+              (the original database was not changed).
+        """
+
+        is_ok = True
+        for shadow_copy in shadow_copies:
+            m_database = shadow_copy.database()
+            m_database_title = m_database
+            if m_database_title == "":
+                m_database_title = 'primary'
+            DatabaseFactory.instance().close_database_adapters(m_database)
+            if not is_swap or not is_ok:
+                shadow_copy.discard()
+                self.reset_migration_versions(m_database)
+                print(f"[{ConsoleLogger.instance().make_color_string('Skip', 'info')}][DB: {m_database_title}] Shadow copy removed; the database is not changed")
+                continue
+            try:
+                shadow_copy.swap(self.__migration_versions_cache(m_database))
+                print(f"[{ConsoleLogger.instance().make_color_string('Swap', 'ok')}][DB: {m_database_title}] The database is replaced by the shadow copy")
+            except Exception as err:
+                print(ConsoleLogger.instance().make_color_string(f"[MigrationsCore] Swap shadow copy failed! Database: {m_database_title}; Error: {err}", 'error'))
+                self.reset_migration_versions(m_database)
+                is_ok = False
+        return is_ok
+
+    def __migration_versions_cache(self, db_name: str) -> list:
+        """Загруженный список установленных версий миграций для конкретной БД (без запроса к базе данных)
+
+        :param db_name: имя базы данных
+        :return:
+        """
+
+        return list(self.__migration_versions.get(db_name, []))
+
     def __register_migrator(self, name: str, class_name: str):
         """Зарегистрировать обработчик миграций
 
         :param name: название
-        :param class_name: имя класса
+        :param class_name: имя класса (с namespace; наследник класса BaseMigrator)
         :return:
         """
 
@@ -620,14 +1616,7 @@ class MigrationCore:
         :return:
         """
 
-        db_adapter = DatabaseFactory.instance().create_database_adapter({'database': db_name})
-        if not db_adapter:
-            return False
-        show_out = ConsoleLogger.instance().show_out()
-        ConsoleLogger.instance().set_show_out(False)
-        tables = db_adapter.tables()
-        ConsoleLogger.instance().set_show_out(show_out)
-        if 'schema_migrations' in tables or 'public.schema_migrations' in tables:
+        if db_name in self.__migration_versions:
             return True
         sql = """
         CREATE TABLE schema_migrations (
@@ -635,13 +1624,19 @@ class MigrationCore:
             CONSTRAINT schema_migrations_pkey PRIMARY KEY (version)
         )
         """
+        db_adapter = DatabaseFactory.instance().acquire_database_adapter(db_name)
+        if not db_adapter:
+            return False
+        ConsoleLogger.instance().push_show_out(False)
         try:
-            show_out = ConsoleLogger.instance().show_out()
-            ConsoleLogger.instance().set_show_out(False)
+            if db_adapter.table_exists('schema_migrations'):
+                return True
             db_adapter.query(sql)
-            ConsoleLogger.instance().set_show_out(show_out)
         except:
             return False
+        finally:
+            ConsoleLogger.instance().pop_show_out()
+            DatabaseFactory.instance().release_database_adapter(db_adapter)
         return True
 
     def __current_migration_version(self, db_names: list, max: bool = True) -> int:
@@ -674,18 +1669,10 @@ class MigrationCore:
         :return:
         """
 
-        if not self.__check_migration_table(db_name):
-            return 0
-        db_adapter = DatabaseFactory.instance().create_database_adapter({'database': db_name})
-        if not db_adapter:
+        versions = self.__migration_versions_index(db_name)
+        if len(versions) == 0:
             return 0
-        show_out = ConsoleLogger.instance().show_out()
-        ConsoleLogger.instance().set_show_out(False)
-        res = db_adapter.query("SELECT version FROM schema_migrations ORDER BY version DESC LIMIT 1;")
-        ConsoleLogger.instance().set_show_out(show_out)
-        if len(res) == 0:
-            return 0
-        return int(res[0]['version'])
+        return versions[-1]
 
     def __all_install_migration_versions(self, db_names: list) -> list:
         """Получить все версии установленных миграций
@@ -712,18 +1699,36 @@ class MigrationCore:
         :return:
         """
 
+        return list(self.__migration_versions_index(db_name))
+
+    def __migration_versions_index(self, db_name: str) -> list:
+        """Получить отсортированный список установленных версий миграций для конкретной БД
+
+        :param db_name: имя базы данных
+        :return:
+
+        NOTE: The list is selected from the database once per run and then updated in place
+              by '__append_migration_version' and '__remove_migration_version'.
+        """
+
+        if db_name in self.__migration_versions:
+            return self.__migration_versions[db_name]
         if not self.__check_migration_table(db_name):
             return []
-        db_adapter = DatabaseFactory.instance().create_database_adapter({'database': db_name})
+        db_adapter = DatabaseFactory.instance().acquire_database_adapter(db_name)
         if not db_adapter:
             return []
-        show_out = ConsoleLogger.instance().show_out()
-        ConsoleLogger.instance().set_show_out(False)
-        res = db_adapter.query("SELECT version FROM schema_migrations ORDER BY version ASC;")
-        ConsoleLogger.instance().set_show_out(show_out)
+        ConsoleLogger.instance().push_show_out(False)
+        try:
+            res = db_adapter.query("SELECT version FROM schema_migrations;", True)
+        finally:
+            ConsoleLogger.instance().pop_show_out()
+            DatabaseFactory.instance().release_database_adapter(db_adapter)
         tmp_list = []
         for row in res:
-            tmp_list.append(int(row['version']))
+            tmp_list.append(int(row[0]))
+        tmp_list.sort()
+        self.__migration_versions[db_name] = tmp_list
         return tmp_list
 
     def __append_migration_version(self, db_name: str, version: int):
@@ -734,15 +1739,22 @@ class MigrationCore:
         :return:
         """
 
+        versions = self.__migration_versions_index(db_name)
         if not self.__check_migration_table(db_name):
             return
-        db_adapter = DatabaseFactory.instance().create_database_adapter({'database': db_name})
+        index = bisect.bisect_left(versions, version)
+        if index < len(versions) and versions[index] == version:
+            return
+        db_adapter = DatabaseFactory.instance().acquire_database_adapter(db_name)
         if not db_adapter:
             return
-        show_out = ConsoleLogger.instance().show_out()
-        ConsoleLogger.instance().set_show_out(False)
-        db_adapter.query(f"INSERT INTO schema_migrations (version) VALUES ('{version}');")
-        ConsoleLogger.instance().set_show_out(show_out)
+        ConsoleLogger.instance().push_show_out(False)
+        try:
+            db_adapter.query(f"INSERT INTO schema_migrations (version) VALUES ('{version}');")
+        finally:
+            ConsoleLogger.instance().pop_show_out()
+            DatabaseFactory.instance().release_database_adapter(db_adapter)
+        versions.insert(index, version)
 
     def __remove_migration_version(self, db_name: str, version: int):
         """Удалить запись из базы данных об установленной версии миграции
@@ -752,15 +1764,21 @@ class MigrationCore:
         :return:
         """
 
+        versions = self.__migration_versions_index(db_name)
         if not self.__check_migration_table(db_name):
             return
-        db_adapter = DatabaseFactory.instance().create_database_adapter({'database': db_name})
+        db_adapter = DatabaseFactory.instance().acquire_database_adapter(db_name)
         if not db_adapter:
             return
-        show_out = ConsoleLogger.instance().show_out()
-        ConsoleLogger.instance().set_show_out(False)
-        db_adapter.query(f"DELETE FROM schema_migrations WHERE version = '{version}';")
-        ConsoleLogger.instance().set_show_out(show_out)
+        ConsoleLogger.instance().push_show_out(False)
+        try:
+            db_adapter.query(f"DELETE FROM schema_migrations WHERE version = '{version}';")
+        finally:
+            ConsoleLogger.instance().pop_show_out()
+            DatabaseFactory.instance().release_database_adapter(db_adapter)
+        index = bisect.bisect_left(versions, version)
+        if index < len(versions) and versions[index] == version:
+            del versions[index]
 
     def __execute_all_post_scripts(self, databases: list) -> bool:
         """Установить все SQL post-скрипты на все измененные базы данных
@@ -804,7 +1822,7 @@ class MigrationCore:
         :return:
         """
 
-        db_adapter = DatabaseFactory.instance().create_database_adapter({'database': db_name})
+        db_adapter = DatabaseFactory.instance().acquire_database_adapter(db_name)
         if not db_adapter:
             return False
         db_adapter.begin_transaction()
@@ -817,5 +1835,5 @@ class MigrationCore:
             db_adapter.rollback_transaction()
             result = False
 
-        db_adapter.disconnect()
+        DatabaseFactory.instance().release_database_adapter(db_adapter)
         return result
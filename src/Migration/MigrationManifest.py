@@ -0,0 +1,173 @@
+import os
+import json
+import hashlib
+import threading
+
+
+class MigrationManifest:
+    """Кэш сведений о миграциях (файл '.flycube-manifest')
+
+    NOTE: The manifest is shared by the migration lanes executed in parallel,
+          so the entries are read and changed under the manifest lock.
+    """
+
+    __file_name = ".flycube-manifest"
+    __format_version = 1
+    __path = ""
+    __entries = {}
+    __changed = False
+    __lock = None
+
+    def __init__(self, dir_path: str):
+        self.__path = f"{dir_path.rstrip('/')}/{self.__file_name}"
+        self.__entries = {}
+        self.__changed = False
+        self.__lock = threading.RLock()
+        if not os.path.exists(self.__path):
+            return
+        with open(self.__path, "r") as stream:
+            try:
+                data = json.load(stream)
+            except ValueError:
+                return
+        if not isinstance(data, dict) or data.get('format', 0) != self.__format_version:
+            return
+        entries = data.get('migrations', {})
+        if isinstance(entries, dict):
+            self.__entries = entries
+
+    def path(self) -> str:
+        """Путь до файла манифеста
+
+        :rtype: str
+        """
+
+        return self.__path
+
+    def database(self, file_path: str, env: str):
+        """Получить имя базы данных миграции из манифеста
+
+        :param file_path: путь до файла миграции
+        :param env: окружение (production/development)
+        :return: имя базы данных или None (если запись отсутствует или файл миграции изменен)
+        :rtype: str|None
+        """
+
+        with self.__lock:
+            entry = self.__valid_entry(file_path)
+            if not entry:
+                return None
+            databases = entry.get('database', {})
+            if not env in databases:
+                return None
+            return databases[env]
+
+    def update(self, file_path: str, version: int, class_name: str, env: str, database: str):
+        """Обновить запись манифеста для файла миграции
+
+        :param file_path: путь до файла миграции
+        :param version: версия миграции
+        :param class_name: имя класса миграции
+        :param env: окружение (production/development)
+        :param database: имя базы данных миграции
+        """
+
+        with self.__lock:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return
+            key = os.path.basename(file_path)
+            entry = self.__valid_entry(file_path)
+            if not entry:
+                entry = {
+                    'version': version,
+                    'class_name': class_name,
+                    'database': {},
+                    'hash': self.__file_hash(file_path),
+                    'mtime': stat.st_mtime_ns,
+                    'size': stat.st_size
+                }
+                self.__entries[key] = entry
+            if entry['database'].get(env, None) == database:
+                return
+            entry['database'][env] = database
+            self.__changed = True
+
+    def retain(self, file_names: list):
+        """Удалить из манифеста записи для отсутствующих файлов миграций
+
+        :param file_names: список имен существующих файлов миграций
+        """
+
+        with self.__lock:
+            for key in list(self.__entries.keys()):
+                if key in file_names:
+                    continue
+                del self.__entries[key]
+                self.__changed = True
+
+    def save(self):
+        """Сохранить манифест (если были изменения)"""
+
+        with self.__lock:
+            if not self.__changed:
+                return
+            data = {
+                'format': self.__format_version,
+                'migrations': self.__entries
+            }
+            tmp_path = f"{self.__path}.tmp"
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f, indent=1, sort_keys=True)
+                os.replace(tmp_path, self.__path)
+            except OSError:
+                return
+            self.__changed = False
+
+    def __valid_entry(self, file_path: str):
+        """Получить запись манифеста, если файл миграции не изменялся
+
+        :param file_path: путь до файла миграции
+        :return: запись манифеста или None
+        :rtype: dict|None
+
+        NOTE: The entry is checked by mtime and size; if only mtime has changed,
+              the file hash is compared and the entry is kept for unchanged content.
+        """
+
+        key = os.path.basename(file_path)
+        if not key in self.__entries:
+            return None
+        entry = self.__entries[key]
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if entry.get('size', -1) != stat.st_size:
+            del self.__entries[key]
+            self.__changed = True
+            return None
+        if entry.get('mtime', -1) != stat.st_mtime_ns:
+            if entry.get('hash', '') != self.__file_hash(file_path):
+                del self.__entries[key]
+                self.__changed = True
+                return None
+            entry['mtime'] = stat.st_mtime_ns
+            self.__changed = True
+        if not isinstance(entry.get('database', None), dict):
+            entry['database'] = {}
+        return entry
+
+    def __file_hash(self, file_path: str) -> str:
+        """Получить хэш содержимого файла (SHA-1)
+
+        :param file_path: путь до файла
+        :rtype: str
+        """
+
+        h = hashlib.sha1()
+        with open(file_path, 'rb') as f:
+            h.update(f.read())
+        return h.hexdigest()
@@ -1,15 +1,42 @@
+import re
+import copy
+import threading
 from abc import ABCMeta, abstractmethod, abstractproperty
 from src.Helper.Helper import Helper
+from src.Migration.ExportSink import ExportSink
 
 
 class BaseMigrator:
     __metaclass__ = ABCMeta
+    __catalog_cache = {}
+    __catalog_snapshots = set()
+    __catalog_lock = threading.Lock()
+    __identifier = r'(?:"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\]|[\w$]+)(?:\s*\.\s*(?:"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\]|[\w$]+))*'
+    __no_catalog_change_rx = re.compile(r'^(SELECT|INSERT|UPDATE|DELETE|WITH|PRAGMA|SET|ANALYZE|VACUUM|BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b', re.IGNORECASE)
+    __alter_table_rx = re.compile(r'^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?(' + __identifier + r')(?:\s+RENAME\s+TO\s+(' + __identifier + r'))?', re.IGNORECASE)
+    __create_table_rx = re.compile(r'^CREATE\s+(?:(?:GLOBAL\s+|LOCAL\s+)?(?:TEMP|TEMPORARY|UNLOGGED)\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(' + __identifier + r')', re.IGNORECASE)
+    __drop_table_rx = re.compile(r'^DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?(' + __identifier + r')\s*(?:CASCADE|RESTRICT)?\s*;?\s*$', re.IGNORECASE)
+    __create_index_rx = re.compile(r'^CREATE\s+(?:UNIQUE\s+)?INDEX\s+.*?\bON\s+(?:ONLY\s+)?(' + __identifier + r')', re.IGNORECASE | re.DOTALL)
+    __drop_index_rx = re.compile(r'^DROP\s+INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+EXISTS\s+)?(' + __identifier + r')(?:\s+ON\s+(' + __identifier + r'))?', re.IGNORECASE)
     _db_adapter = None
     _export_file = None
+    __export_sink = None
+    __own_export_sink = False
+    __offline_catalog = None
 
-    def __init__(self, db_adapter, export_file: str = None):
+    def __init__(self, db_adapter, export_file=None):
         self._db_adapter = db_adapter
-        self._export_file = export_file
+        self._export_file = None
+        self.__export_sink = None
+        self.__own_export_sink = False
+        self.__offline_catalog = None
+        if isinstance(export_file, ExportSink):
+            self.__export_sink = export_file
+        elif export_file:
+            self.__export_sink = ExportSink(export_file)
+            self.__own_export_sink = True
+        if self.__export_sink:
+            self._export_file = self.__export_sink.path()
 
     #
     # base methods to override if needed:
@@ -127,10 +154,11 @@ class BaseMigrator:
             ...
         }
 
-        NOTE: override this method for correct implementation.
+        NOTE: The result is cached per database for the migrations run (see '_table_indexes');
+              the cache of the table is cleared by the executed DDL.
         """
 
-        return {}
+        return self.__catalog_value('indexes', table_name, self._table_indexes)
 
     def table_columns(self, table_name: str) -> dict:
         """Запросить список колонок таблицы и их типов
@@ -160,10 +188,11 @@ class BaseMigrator:
             ...
         }
 
-        NOTE: override this method for correct implementation.
+        NOTE: The result is cached per database for the migrations run (see '_table_columns');
+              the cache of the table is cleared by the executed DDL.
         """
 
-        return {}
+        return self.__catalog_value('columns', table_name, self._table_columns)
 
     def table_primary_keys(self, table_name: str) -> dict:
         """Запросить список первичных ключей таблицы
@@ -182,10 +211,11 @@ class BaseMigrator:
             }
         }
 
-        NOTE: override this method for correct implementation.
+        NOTE: The result is cached per database for the migrations run (see '_table_primary_keys');
+              the cache of the table is cleared by the executed DDL.
         """
 
-        return {}
+        return self.__catalog_value('primary_keys', table_name, self._table_primary_keys)
 
     def table_foreign_keys(self, table_name) -> dict:
         """Запросить список вторичных ключей для таблицы
@@ -208,10 +238,11 @@ class BaseMigrator:
             ...
         }
 
-        NOTE: override this method for correct implementation.
+        NOTE: The result is cached per database for the migrations run (see '_table_foreign_keys');
+              the cache of the table is cleared by the executed DDL.
         """
 
-        return {}
+        return self.__catalog_value('foreign_keys', table_name, self._table_foreign_keys)
 
     def to_database_type(self, name: str, limit: int = None) -> str:
         """Преобразование типа колонки в тип базы данных
@@ -324,6 +355,8 @@ class BaseMigrator:
         sql += self._prepare_create_table(name, args)
         sql += "\n);"
         self._exec_query_or_export(sql)
+        if self.is_offline():
+            self.__replay_create_table(name, args)
 
     def rename_table(self, name: str, new_name: str):
         """Переименовать таблицу
@@ -341,6 +374,7 @@ class BaseMigrator:
         tmp_name = self._db_adapter.quote_table_name(name)
         tmp_new_name = self._db_adapter.quote_table_name(new_name)
         self._exec_query_or_export(f"ALTER TABLE {tmp_name} RENAME TO {tmp_new_name};")
+        self._replay_catalog('rename_table', name, new_name)
         for k, v in tmp_indexes.items():
             index_new_name = str(v['index_name']).replace(name, new_name)
             if str(v['index_name']) == index_new_name:
@@ -362,6 +396,7 @@ class BaseMigrator:
             raise Exception("[BaseMigrator][drop_table] Table name is Empty!")
         if not self._db_adapter:
             raise Exception("[BaseMigrator][drop_table] Database adapter is None!")
+        self._replay_catalog('drop_table', name)
         name = self._db_adapter.quote_table_name(name)
         sql = f"DROP TABLE {name}"
         if props.get('if_exists', False):
@@ -398,6 +433,8 @@ class BaseMigrator:
             raise Exception("[BaseMigrator][add_column] Prepare create column return empty result!")
         tmp_table_name = self._db_adapter.quote_table_name(table_name)
         self._exec_query_or_export(f"ALTER TABLE {tmp_table_name} ADD COLUMN {if_not_exists} {tmp_res.get('sql')};")
+        if self.is_offline():
+            self._replay_catalog('add_column', table_name, column_name, self._catalog_column(props))
 
     def rename_column(self, table_name: str, column_name: str, column_new_name: str):
         """Переименовать колонку в таблице
@@ -418,11 +455,13 @@ class BaseMigrator:
         tmp_column_name = self._db_adapter.quote_table_name(column_name)
         tmp_column_new_name = self._db_adapter.quote_table_name(column_new_name)
         self._exec_query_or_export(f"ALTER TABLE {tmp_table_name} RENAME COLUMN {tmp_column_name} TO {tmp_column_new_name};")
+        self._replay_catalog('rename_column', table_name, column_name, column_new_name)
+        # rename the default index of the column only ('add_index' name); other indexes keep their names
+        index_name = f"{table_name}_{column_name}_index"
         for k, v in tmp_indexes.items():
-            if not column_name in v['columns']:
+            if str(v['index_name']) != index_name or not column_name in v['columns']:
                 continue
-            index_new_name = f"{table_name}_{column_name}_index"
-            self.rename_index(table_name, str(v['index_name']), index_new_name)
+            self.rename_index(table_name, index_name, f"{table_name}_{column_new_name}_index")
 
     def change_column(self, table_name: str, column_name: str, new_type: str, props: dict = {}):
         """Изменить тип колонки и ее дополнительные параметры, если они заданы
@@ -442,6 +481,11 @@ class BaseMigrator:
             raise Exception("[BaseMigrator][change_column] Table name or column name or new type is Empty!")
         if not self._db_adapter:
             raise Exception("[BaseMigrator][change_column] Database adapter is None!")
+        if self.is_offline():
+            tmp_info = self._catalog_column(dict(props, type=new_type))
+            if not 'null' in props:
+                tmp_info.pop('is_not_null')
+            self._replay_catalog('change_column', table_name, column_name, tmp_info)
         table_name = self._db_adapter.quote_table_name(table_name)
         # drop default
         sql = f"ALTER TABLE {table_name} ALTER COLUMN {self._db_adapter.quote_table_name(column_name)} DROP DEFAULT;"
@@ -482,6 +526,7 @@ class BaseMigrator:
             raise Exception("[BaseMigrator][change_column_default] Table name or column name is Empty!")
         if not self._db_adapter:
             raise Exception("[BaseMigrator][change_column_default] Database adapter is None!")
+        self._replay_catalog('change_column', table_name, column_name, {'default': str(default) if default else None})
         if not default:
             # drop default
             table_name = self._db_adapter.quote_table_name(table_name)
@@ -510,6 +555,7 @@ class BaseMigrator:
             raise Exception("[BaseMigrator][change_column_null] Table name or column name is Empty!")
         if not self._db_adapter:
             raise Exception("[BaseMigrator][change_column_null] Database adapter is None!")
+        self._replay_catalog('change_column', table_name, column_name, {'is_not_null': bool(not_null)})
         table_name = self._db_adapter.quote_table_name(table_name)
         if not_null:
             self._exec_query_or_export(f"ALTER TABLE {table_name} ALTER COLUMN {self._db_adapter.quote_table_name(column_name)} SET NOT NULL;")
@@ -529,6 +575,7 @@ class BaseMigrator:
             raise Exception("[BaseMigrator][drop_column] Table name or column name is Empty!")
         if not self._db_adapter:
             raise Exception("[BaseMigrator][drop_column] Database adapter is None!")
+        self._replay_catalog('drop_column', table_name, column_name)
         table_name = self._db_adapter.quote_table_name(table_name)
         self._exec_query_or_export(f"ALTER TABLE {table_name} DROP COLUMN {self._db_adapter.quote_table_name(column_name)};")
 
@@ -567,6 +614,7 @@ class BaseMigrator:
         tmp_old_name = self._db_adapter.quote_table_name(old_name)
         tmp_new_name = self._db_adapter.quote_table_name(new_name)
         self._exec_query_or_export(f"ALTER INDEX {tmp_old_name} RENAME TO {tmp_new_name};")
+        self._replay_catalog('rename_index', table_name, old_name, new_name)
 
     def drop_index(self, table_name: str, props: dict = {}):
         """Удалить индекс таблицы
@@ -607,6 +655,7 @@ class BaseMigrator:
         # set new primary key
         tmp_table_lst = table_name.split(".")
         tmp_name = self._db_adapter.quote_table_name(f"{tmp_table_lst[len(tmp_table_lst) - 1]}_pkey")
+        self._replay_catalog('set_primary_key', table_name, f"{tmp_table_lst[len(tmp_table_lst) - 1]}_pkey", column_name)
         table_name = self._db_adapter.quote_table_name(table_name)
         self._exec_query_or_export(f"ALTER TABLE {table_name} ADD CONSTRAINT {tmp_name} PRIMARY KEY ({column_name});")
 
@@ -629,6 +678,7 @@ class BaseMigrator:
                 break
         if tmp_p_key_name == "":
             raise Exception(f"[BaseMigrator][drop_primary_key] Not found primary key name for table \"{table_name}\"!")
+        self._replay_catalog('drop_primary_key', table_name, tmp_p_key_name)
         table_name = self._db_adapter.quote_table_name(table_name)
         self._exec_query_or_export(f"ALTER TABLE {table_name} DROP CONSTRAINT {self._db_adapter.quote_table_name(tmp_p_key_name)};")
 
@@ -671,6 +721,7 @@ class BaseMigrator:
         tmp_name = f"fk_{table_name}_{columns_names_2}"
         if 'name' in props:
             tmp_name = props['name']  # TODO name to underscore?
+        self._replay_catalog('add_foreign_key', table_name, tmp_name, columns, ref_table_name, ref_columns, self._catalog_reference_action(props))
         table_name = self._db_adapter.quote_table_name(table_name)
         ref_table_name = self._db_adapter.quote_table_name(ref_table_name)
         sql = f"ALTER TABLE {table_name} ADD CONSTRAINT {self._db_adapter.quote_table_name(tmp_name)} FOREIGN KEY ({columns_names}) REFERENCES {ref_table_name} ({ref_columns_names})"
@@ -742,6 +793,7 @@ class BaseMigrator:
                 break
         if tmp_name == "":
             raise Exception(f"[BaseMigrator][drop_foreign_key] Not found foreign key for columns \"{columns_names}\"!")
+        self._replay_catalog('drop_foreign_key', table_name, tmp_name)
         table_name = self._db_adapter.quote_table_name(table_name)
         self._exec_query_or_export(f"ALTER TABLE {table_name} DROP CONSTRAINT {self._db_adapter.quote_table_name(tmp_name)};")
 
@@ -771,10 +823,227 @@ class BaseMigrator:
             raise Exception("[BaseMigrator][execute] Database adapter is None!")
         self._exec_query_or_export(sql)
 
+    def apply_pending_changes(self, table_name: str = None):
+        """Выполнить отложенные изменения схемы
+
+        :param table_name: название таблицы (если None - для всех таблиц)
+
+        NOTE: override this method for correct implementation.
+        """
+
+        return
+
+    def close_export(self, commit: bool = True):
+        """Завершить экспорт миграции, если файл экспорта был открыт мигратором
+
+        :param commit: сохранить файл экспорта (иначе - удалить)
+
+        NOTE: An export sink passed to the constructor is owned by the caller and is not closed here.
+        """
+
+        if not self.__own_export_sink or not self.__export_sink:
+            return
+        if commit:
+            self.__export_sink.commit()
+        else:
+            self.__export_sink.discard()
+
+    def set_offline_catalog(self, catalog):
+        """Задать схему базы данных в памяти (экспорт миграций без подключения к базе данных)
+
+        :param catalog: схема базы данных в памяти (None - используется подключение к базе данных)
+        :type catalog: OfflineCatalog|None
+
+        NOTE: The catalog methods are answered from the offline catalog and the migration operations
+              are replayed to it (SQLite: the statements are executed on the in-memory database).
+        """
+
+        self.__offline_catalog = catalog
+
+    def is_offline(self) -> bool:
+        """Используется ли схема базы данных в памяти вместо подключения к базе данных
+
+        :rtype: bool
+        """
+
+        return self.__offline_catalog is not None
+
+    def reset_catalog_cache(self):
+        """Сбросить кэш каталога (индексы, колонки, ключи таблиц) текущей базы данных
+
+        NOTE: Called on the rollback of the migration transaction.
+        """
+
+        with BaseMigrator.__catalog_lock:
+            if self.__catalog_key() in BaseMigrator.__catalog_cache:
+                del BaseMigrator.__catalog_cache[self.__catalog_key()]
+            BaseMigrator.__catalog_snapshots.discard(self.__catalog_key())
+
+    @staticmethod
+    def clear_catalog_cache():
+        """Сбросить кэш каталога всех баз данных (вызывается в начале выполнения миграций)"""
+
+        with BaseMigrator.__catalog_lock:
+            BaseMigrator.__catalog_cache = {}
+            BaseMigrator.__catalog_snapshots = set()
+
+    def catalog_snapshot(self):
+        """Загрузить каталог всей базы данных (таблицы, колонки, первичные и вторичные ключи, индексы)
+
+        :return: каталог базы данных (None - если не поддерживается мигратором)
+        :rtype: dict|None
+
+        Return example:
+        {
+            'tables': [ 'test', 'test_2' ],
+            'columns': {
+                'test': { ... }       # see 'table_columns'
+            },
+            'primary_keys': {
+                'test': { ... }       # see 'table_primary_keys'
+            },
+            'foreign_keys': {
+                'test_2': { ... }     # see 'table_foreign_keys'
+            },
+            'indexes': {
+                'test': { ... }       # see 'table_indexes'
+            }
+        }
+
+        NOTE: The catalog is loaded by a few set-based queries (see '_catalog_snapshot') and fills
+              the catalog cache; the per-table methods are answered from it. The snapshot is loaded
+              automatically once per database for the migrations run.
+        """
+
+        if self.__offline_catalog and not self.__offline_catalog.is_sql_replay():
+            return self.__offline_catalog.snapshot()
+        snapshot = self.__load_catalog_snapshot()
+        if snapshot is None:
+            return None
+        return copy.deepcopy(snapshot)
+
+    def begin_bulk_ddl(self, props):
+        """Включить режим массовых изменений схемы (настройки сессии на время миграции)
+
+        :param props: True (настройки по умолчанию) или словарь настроек
+
+        NOTE: override this method for correct implementation.
+        """
+
+        return
+
+    def end_bulk_ddl(self):
+        """Выключить режим массовых изменений схемы (восстановить настройки сессии)
+
+        NOTE: override this method for correct implementation.
+        """
+
+        return
+
     #
     # protected methods:
     #
 
+    def _catalog_snapshot(self):
+        """Загрузить каталог всей базы данных набором запросов (формат см. в 'catalog_snapshot')
+
+        :rtype: dict|None
+
+        NOTE: override this method for correct implementation (None - the snapshot is not supported;
+              the catalog is selected per table).
+        """
+
+        return None
+
+    def _table_indexes(self, table_name: str) -> dict:
+        """Запросить список индексов для таблицы (запрос к базе данных)
+
+        :param table_name: название таблицы
+        :type table_name: str
+        :rtype: dict
+
+        NOTE: override this method for correct implementation (the result format see in 'table_indexes').
+        """
+
+        return {}
+
+    def _table_columns(self, table_name: str) -> dict:
+        """Запросить список колонок таблицы и их типов (запрос к базе данных)
+
+        :param table_name: название таблицы
+        :type table_name: str
+        :rtype: dict
+
+        NOTE: override this method for correct implementation (the result format see in 'table_columns').
+        """
+
+        return {}
+
+    def _table_primary_keys(self, table_name: str) -> dict:
+        """Запросить список первичных ключей таблицы (запрос к базе данных)
+
+        :param table_name: название таблицы
+        :type table_name: str
+        :rtype: dict
+
+        NOTE: override this method for correct implementation (the result format see in 'table_primary_keys').
+        """
+
+        return {}
+
+    def _table_foreign_keys(self, table_name) -> dict:
+        """Запросить список вторичных ключей для таблицы (запрос к базе данных)
+
+        :param table_name: название таблицы
+        :type table_name: str
+        :rtype: dict
+
+        NOTE: override this method for correct implementation (the result format see in 'table_foreign_keys').
+        """
+
+        return {}
+
+    def _replay_catalog(self, method: str, *args):
+        """Повторить операцию миграции в схеме базы данных в памяти (PostgreSQL / MySQL)
+
+        :param method: название метода OfflineCatalog
+        :param args: аргументы метода
+
+        NOTE: Nothing is done if the offline catalog is not set or the statements are replayed
+              on the in-memory SQLite database.
+        """
+
+        if not self.__offline_catalog or self.__offline_catalog.is_sql_replay():
+            return
+        getattr(self.__offline_catalog, method)(*args)
+
+    def _catalog_column(self, props: dict) -> dict:
+        """Описание колонки для схемы базы данных в памяти
+
+        :param props: свойства колонки (см. 'add_column')
+        :rtype: dict
+        """
+
+        tmp_limit = props.get('limit', None)
+        if tmp_limit:
+            tmp_limit = int(tmp_limit)
+        return {
+            'type': self.to_database_type(str(props.get('type', '')), tmp_limit),
+            'is_not_null': not props.get('null', True),
+            'default': str(props['default']) if props.get('default', None) is not None else None
+        }
+
+    def _catalog_reference_action(self, props: dict) -> str:
+        """Поведение вторичного ключа для схемы базы данных в памяти
+
+        :param props: свойства вторичного ключа (см. 'add_foreign_key')
+        :rtype: str
+        """
+
+        if (props.get('on_update', False) or props.get('on_delete', False)) and props.get('action', None):
+            return self.make_reference_action(props['action'])
+        return 'NO ACTION'
+
     def _add_index_protected(self, args: dict):
         """Добавить индекс для таблицы
 
@@ -808,6 +1077,7 @@ class BaseMigrator:
         is_unique = ''
         if args.get('unique', False):
             is_unique = 'UNIQUE'
+        self._replay_catalog('add_index', str(args['table']), tmp_name, tmp_columns, is_unique != '')
         table = self._db_adapter.quote_table_name(args['table'])
         self._exec_query_or_export(f"CREATE {is_unique} INDEX {self._db_adapter.quote_table_name(tmp_name)} ON {table} ({tmp_columns_names});")
 
@@ -847,6 +1117,7 @@ class BaseMigrator:
         if 'name' in args:
             tmp_name = args['name']
 
+        self._replay_catalog('drop_index', str(args['table']), tmp_name)
         sql = "DROP INDEX"
         if args.get('if_exists', False):
             sql += " IF EXISTS"
@@ -973,11 +1244,37 @@ class BaseMigrator:
         z.update(y)  # modifies z with keys and values of y
         return z
 
+    def __replay_create_table(self, name: str, args: dict):
+        """Повторить создание таблицы в схеме базы данных в памяти
+
+        :param name: название таблицы
+        :param args: массив колонок и их спецификация (см. 'create_table')
+        """
+
+        tmp_columns = {}
+        tmp_p_key = ""
+        if args.get('id', False):
+            tmp_p_key = 'id'
+            tmp_columns['id'] = {'type': 'serial', 'is_not_null': True, 'default': None}
+        for k, v in args.items():
+            if k == 'id':
+                continue
+            if isinstance(v, dict):
+                if not 'type' in v:
+                    continue
+                tmp_columns[k] = self._catalog_column(v)
+                if tmp_p_key == "" and v.get('primary_key', False):
+                    tmp_p_key = k
+            else:
+                tmp_columns[k] = {'type': self.to_database_type(str(v)), 'is_not_null': False, 'default': None}
+        tmp_table_lst = name.split('.')
+        self._replay_catalog('create_table', name, tmp_columns, tmp_p_key, f"{tmp_table_lst[len(tmp_table_lst) - 1]}_pkey")
+
     def __is_export(self) -> bool:
         """Используется ли экспортирование миграции
         """
 
-        if not self._export_file:
+        if not self.__export_sink:
             return False
         return True
 
@@ -985,13 +1282,14 @@ class BaseMigrator:
         """Сохранить SQL миграции в файл
 
         :param sql: SQL данные
+
+        NOTE: Every exported statement is terminated by ';' (see Helper.sql_terminate),
+              so the export file can be executed by the database console utilities.
         """
 
         if not self.__is_export():
             return
-        with open(self._export_file, 'a') as f:
-            f.write(Helper.text_left_strip(sql, True))
-            f.write("\n")
+        self.__export_sink.write(f"{Helper.sql_terminate(Helper.text_left_strip(sql, True))}\n")
 
     def _exec_query_or_export(self, sql: str):
         """Выполнить в БД или сохранить SQL миграцию в файл
@@ -1001,5 +1299,129 @@ class BaseMigrator:
 
         if self.__is_export():
             self.__export(sql)
-        else:
-            self._db_adapter.query(sql)
+            if not self.__offline_catalog:
+                return
+        if self.__offline_catalog and not self.__offline_catalog.is_sql_replay():
+            return
+        self._db_adapter.query(sql)
+        self.__invalidate_catalog(sql)
+
+    def __catalog_key(self) -> str:
+        """Ключ кэша каталога текущей базы данных
+
+        :rtype: str
+        """
+
+        adapter = self._db_adapter
+        if self.__offline_catalog:
+            return f"offline:{adapter.name()}:{self.__offline_catalog.database()}"
+        return f"{adapter.name()}:{adapter.settings_value('host', '')}:{adapter.settings_value('port', '')}:{adapter.database()}:{adapter.schema()}"
+
+    def __catalog(self) -> dict:
+        """Кэш каталога текущей базы данных
+
+        :rtype: dict
+        """
+
+        with BaseMigrator.__catalog_lock:
+            return BaseMigrator.__catalog_cache.setdefault(self.__catalog_key(), {})
+
+    def __catalog_value(self, kind: str, table_name: str, loader) -> dict:
+        """Получить значение из кэша каталога (или загрузить его)
+
+        :param kind: тип значения (indexes / columns / primary_keys / foreign_keys)
+        :param table_name: название таблицы
+        :param loader: метод загрузки значения из базы данных
+        :rtype: dict
+        """
+
+        if self.__offline_catalog and not self.__offline_catalog.is_sql_replay():
+            return self.__offline_catalog.value(kind, table_name)
+        catalog = self.__catalog()
+        key = (kind, table_name)
+        if not key in catalog and not self.__catalog_key() in BaseMigrator.__catalog_snapshots:
+            self.__load_catalog_snapshot()
+        if not key in catalog:
+            catalog[key] = loader(table_name)
+        return copy.deepcopy(catalog[key])
+
+    def __load_catalog_snapshot(self):
+        """Загрузить каталог всей базы данных и заполнить им кэш каталога
+
+        :rtype: dict|None
+        """
+
+        with BaseMigrator.__catalog_lock:
+            BaseMigrator.__catalog_snapshots.add(self.__catalog_key())
+        snapshot = self._catalog_snapshot()
+        if snapshot is None:
+            return None
+        catalog = self.__catalog()
+        for table_name in snapshot['tables']:
+            for kind in ('columns', 'primary_keys', 'foreign_keys', 'indexes'):
+                catalog[(kind, table_name)] = snapshot[kind].get(table_name, {})
+        return snapshot
+
+    def __invalidate_catalog(self, sql: str):
+        """Сбросить значения кэша каталога, измененные выполненным SQL запросом
+
+        :param sql: SQL запрос
+
+        NOTE: The tables are selected from the common DDL statements; the foreign keys of all tables
+              are cleared on 'ALTER TABLE' and 'DROP TABLE' (they may reference the changed table).
+              The whole cache of the database is cleared for unknown statements and scripts.
+        """
+
+        catalog = self.__catalog()
+        if len(catalog) == 0:
+            return
+        sql = re.sub(r'^(\s+|--[^\n]*(\n|$)|/\*.*?\*/)+', '', sql, flags=re.DOTALL).strip()
+        if ';' in sql.rstrip(';'):
+            catalog.clear()
+            return
+        if BaseMigrator.__no_catalog_change_rx.match(sql):
+            return
+        tables = []
+        foreign_keys = False
+        result = BaseMigrator.__alter_table_rx.match(sql)
+        if result:
+            tables = [result.group(1), result.group(2)]
+            foreign_keys = True
+        for rx in (BaseMigrator.__create_table_rx, BaseMigrator.__create_index_rx):
+            result = rx.match(sql)
+            if result:
+                tables = [result.group(1)]
+        result = BaseMigrator.__drop_table_rx.match(sql)
+        if result:
+            tables = [result.group(1)]
+            foreign_keys = True
+        result = BaseMigrator.__drop_index_rx.match(sql)
+        if result:
+            index_name = BaseMigrator.__unquote_name(result.group(1))
+            tables = [result.group(2)]
+            for (kind, table_name), value in catalog.items():
+                if kind == 'indexes' and index_name in [BaseMigrator.__unquote_name(name).lower() for name in value.keys()]:
+                    tables.append(table_name)
+        tables = [BaseMigrator.__unquote_name(name) for name in tables if name]
+        if len(tables) == 0:
+            catalog.clear()
+            return
+        for key in list(catalog.keys()):
+            kind, table_name = key
+            if (foreign_keys and kind == 'foreign_keys') or BaseMigrator.__unquote_name(table_name) in tables:
+                del catalog[key]
+
+    @staticmethod
+    def __unquote_name(name: str) -> str:
+        """Имя объекта без кавычек и схемы (в нижнем регистре)
+
+        :param name: имя объекта (пример: '"public"."test"')
+        :rtype: str
+        """
+
+        parts = re.findall(r'"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\]|[^\s."`\[]+', name)
+        if len(parts) > 0:
+            name = parts[-1]
+        if len(name) > 1 and name[0] in ('"', '`', '[') and name[-1] in ('"', '`', ']'):
+            name = name[1:-1]
+        return name.lower()
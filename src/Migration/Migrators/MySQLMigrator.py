@@ -5,7 +5,7 @@ from src.Migration.Migrators.BaseMigrator import BaseMigrator
 
 
 class MySQLMigrator(BaseMigrator):
-    def __init__(self, db_adapter, export_file: str = None):
+    def __init__(self, db_adapter, export_file=None):
         super().__init__(db_adapter, export_file)
 
     def create_database(self, name: str, props: dict = {}):
@@ -47,7 +47,7 @@ class MySQLMigrator(BaseMigrator):
             raise Exception("[MySQLMigrator][drop_database] Database adapter is None!")
         self._exec_query_or_export(f"DROP DATABASE IF EXISTS `{name}`;")
 
-    def table_indexes(self, table_name: str) -> dict:
+    def _table_indexes(self, table_name: str) -> dict:
         """Запросить список индексов для таблицы
 
         :param table_name: название таблицы
@@ -77,27 +77,9 @@ class MySQLMigrator(BaseMigrator):
         # select table information
         db_name = self._db_adapter.database()
         sql = f"SHOW INDEX FROM {self._db_adapter.quote_table_name(table_name)} FROM {self._db_adapter.quote_table_name(db_name)};"
-        res = self._db_adapter.query(sql)
-        if len(res) == 0:
-            return {}
-        tmp_indexes = {}
-        for r in res:
-            i_name = r['Key_name']
-            unique = not bool(r['Non_unique'])
-            i_columns = []
-            if i_name in tmp_indexes:
-                i_columns = tmp_indexes[i_name]['columns']
-            i_columns.append(r['Column_name'])
+        return self.__make_indexes(table_name, self._db_adapter.query(sql))
 
-            tmp_indexes[i_name] = {
-                'index_name': i_name,
-                'unique': unique,
-                'table': table_name,
-                'columns': i_columns
-            }
-        return tmp_indexes
-
-    def table_columns(self, table_name: str) -> dict:
+    def _table_columns(self, table_name: str) -> dict:
         """Запросить список колонок таблицы и их типов
 
         :param table_name: название таблицы
@@ -130,29 +112,9 @@ class MySQLMigrator(BaseMigrator):
             return {}
         # select table information
         sql = f"SHOW COLUMNS FROM {self._db_adapter.quote_table_name(table_name)};"
-        res = self._db_adapter.query(sql)
-        if len(res) == 0:
-            return {}
-        tmp_columns = {}
-        for r in res:
-            is_not_null = False
-            if str(r['Null']).lower() == 'no':
-                is_not_null = True
-            is_p_key = False
-            if str(r['Key']).lower() == 'pri':
-                is_p_key = True
+        return self.__make_columns(table_name, self._db_adapter.query(sql))
 
-            tmp_columns[r['Field']] = {
-                'table': table_name,
-                'column': r['Field'],
-                'type': r['Type'],
-                'is_pk': is_p_key,
-                'is_not_null': is_not_null,
-                'default': r['Default']
-            }
-        return tmp_columns
-
-    def table_primary_keys(self, table_name: str) -> dict:
+    def _table_primary_keys(self, table_name: str) -> dict:
         """Запросить список первичных ключей таблицы
 
         :param table_name: название таблицы
@@ -177,20 +139,9 @@ class MySQLMigrator(BaseMigrator):
         res = self._db_adapter.query(sql)
         if len(res) == 0:
             return {}
-        tmp_list = {}
-        for r in res:
-            t_columns = self.table_columns(table_name)
-            if not r['Column_name'] in t_columns:
-                continue
-            tmp_list[r['Key_name']] = {
-                'name': r['Key_name'],
-                'table': table_name,
-                'column': r['Column_name'],
-                'type': t_columns[r['Column_name']]['type']
-            }
-        return tmp_list
+        return self.__make_primary_keys(table_name, res, self.table_columns(table_name))
 
-    def table_foreign_keys(self, table_name) -> dict:
+    def _table_foreign_keys(self, table_name) -> dict:
         """Запросить список вторичных ключей для таблицы
 
         :param table_name: название таблицы
@@ -232,21 +183,59 @@ class MySQLMigrator(BaseMigrator):
         AND rc.constraint_schema = '{db_name}'
         AND rc.table_name = '{table_name}'
         """
-        res = self._db_adapter.query(sql)
-        if len(res) == 0:
-            return {}
-        tmp_list = {}
-        for r in res:
-            tmp_list[r['name']] = {
-                'name': r['name'],
-                'table': table_name,
-                'column': r['column'],
-                'ref_table': r['to_table'],
-                'ref_column': r['primary_key'],
-                'on_update': r['on_update'],
-                'on_delete': r['on_delete']
-            }
-        return tmp_list
+        return self.__make_foreign_keys(table_name, self._db_adapter.query(sql))
+
+    def _catalog_snapshot(self):
+        """Загрузить каталог всей базы данных набором запросов (формат см. в 'catalog_snapshot')
+
+        :rtype: dict|None
+        """
+
+        if not self._db_adapter:
+            return None
+        db_name = self._db_adapter.database()
+        res = self._db_adapter.query(f"SELECT table_name AS table_name FROM information_schema.tables WHERE table_schema = '{db_name}' AND table_type = 'BASE TABLE' ORDER BY table_name;")
+        tables = [r['table_name'] for r in res]
+        sql = f"""
+        SELECT table_name AS table_name, index_name AS Key_name, non_unique AS Non_unique, column_name AS Column_name
+        FROM information_schema.statistics
+        WHERE table_schema = '{db_name}'
+        ORDER BY table_name, index_name = 'PRIMARY' DESC, index_name, seq_in_index;
+        """
+        indexes_rows = self.__group_rows(self._db_adapter.query(sql), 'table_name')
+        sql = f"""
+        SELECT table_name AS table_name, column_name AS Field, column_type AS Type, is_nullable AS 'Null', column_key AS 'Key', column_default AS 'Default'
+        FROM information_schema.columns
+        WHERE table_schema = '{db_name}'
+        ORDER BY table_name, ordinal_position;
+        """
+        columns_rows = self.__group_rows(self._db_adapter.query(sql), 'table_name')
+        sql = f"""
+        SELECT fk.table_name AS 'table_name',
+               fk.referenced_table_name AS 'to_table',
+               fk.referenced_column_name AS 'primary_key',
+               fk.column_name AS 'column',
+               fk.constraint_name AS 'name',
+               rc.update_rule AS 'on_update',
+               rc.delete_rule AS 'on_delete'
+        FROM information_schema.referential_constraints rc
+        JOIN information_schema.key_column_usage fk
+        USING (constraint_schema, constraint_name)
+        WHERE fk.referenced_column_name IS NOT NULL
+        AND fk.table_schema = '{db_name}'
+        AND rc.constraint_schema = '{db_name}'
+        AND rc.table_name = fk.table_name
+        """
+        f_keys_rows = self.__group_rows(self._db_adapter.query(sql), 'table_name')
+        snapshot = {'tables': tables, 'columns': {}, 'primary_keys': {}, 'foreign_keys': {}, 'indexes': {}}
+        for table_name in tables:
+            i_rows = indexes_rows.get(table_name, [])
+            columns = self.__make_columns(table_name, columns_rows.get(table_name, []))
+            snapshot['columns'][table_name] = columns
+            snapshot['primary_keys'][table_name] = self.__make_primary_keys(table_name, [r for r in i_rows if r['Key_name'] == 'PRIMARY'], columns)
+            snapshot['foreign_keys'][table_name] = self.__make_foreign_keys(table_name, f_keys_rows.get(table_name, []))
+            snapshot['indexes'][table_name] = self.__make_indexes(table_name, i_rows)
+        return snapshot
 
     def rename_column(self, table_name: str, column_name: str, column_new_name: str):
         """Переименовать колонку в таблице
@@ -279,11 +268,13 @@ class MySQLMigrator(BaseMigrator):
             col_default = self.make_default_value(str(tmp_columns[column_name]['default']), col_type)
 
         self._exec_query_or_export(f"ALTER TABLE {tmp_table_name} CHANGE {tmp_column_name} {tmp_column_new_name} {col_type} {col_is_not_null} {col_default};")
+        self._replay_catalog('rename_column', table_name, column_name, column_new_name)
+        # rename the default index of the column only ('add_index' name); other indexes keep their names
+        index_name = f"{table_name}_{column_name}_index"
         for k, v in tmp_indexes.items():
-            if not column_name in v['columns']:
+            if str(v['index_name']) != index_name or not column_name in v['columns']:
                 continue
-            index_new_name = f"{table_name}_{column_name}_index"
-            self.rename_index(table_name, str(v['index_name']), index_new_name)
+            self.rename_index(table_name, index_name, f"{table_name}_{column_new_name}_index")
 
     def change_column(self, table_name: str, column_name: str, new_type: str, props: dict = {}):
         """Изменить тип колонки и ее дополнительные параметры, если они заданы
@@ -303,6 +294,10 @@ class MySQLMigrator(BaseMigrator):
             raise Exception("[MySQLMigrator][change_column] Table name or column name or new type is Empty!")
         if not self._db_adapter:
             raise Exception("[MySQLMigrator][change_column] Database adapter is None!")
+        if self.is_offline():
+            tmp_info = self._catalog_column(dict(props, type=new_type))
+            tmp_info['is_not_null'] = bool(props.get('null', False))
+            self._replay_catalog('change_column', table_name, column_name, tmp_info)
         table_name = self._db_adapter.quote_table_name(table_name)
         # drop default
         sql = f"ALTER TABLE {table_name} ALTER COLUMN {self._db_adapter.quote_table_name(column_name)} DROP DEFAULT;"
@@ -339,6 +334,7 @@ class MySQLMigrator(BaseMigrator):
         if not column_name in tmp_columns:
             raise Exception(f"[MySQLMigrator][change_column_null] Not found column \"{column_name}\" in table \"{table_name}\"!")
 
+        self._replay_catalog('change_column', table_name, column_name, {'is_not_null': bool(not_null)})
         table_name = self._db_adapter.quote_table_name(table_name)
         col_type = tmp_columns[column_name]['type']
         col_is_not_null = ""
@@ -395,6 +391,7 @@ class MySQLMigrator(BaseMigrator):
                 break
         if tmp_name == "":
             raise Exception(f"[MySQLMigrator][drop_foreign_key] Not found foreign key for columns \"{columns_names}\"!")
+        self._replay_catalog('drop_foreign_key', table_name, tmp_name)
         self._exec_query_or_export(f"ALTER TABLE {self._db_adapter.quote_table_name(table_name)} DROP CONSTRAINT {self._db_adapter.quote_table_name(tmp_name)};")
         self.drop_index(table_name, {'name': tmp_name, 'if_exists': True})
 
@@ -439,4 +436,113 @@ class MySQLMigrator(BaseMigrator):
             if not tmp_name in t_indexes:
                 return  # not found -> ok -> exit
 
+        self._replay_catalog('drop_index', str(args['table']), tmp_name)
         self._exec_query_or_export(f"DROP INDEX {self._db_adapter.quote_table_name(tmp_name)} ON {self._db_adapter.quote_table_name(args['table'])};")
+
+    def __make_indexes(self, table_name: str, rows: list) -> dict:
+        """Сформировать список индексов таблицы из строк результата запроса ('SHOW INDEX')
+
+        :param table_name: название таблицы
+        :param rows: строки результата запроса
+        :rtype: dict
+        """
+
+        tmp_indexes = {}
+        for r in rows:
+            i_name = r['Key_name']
+            unique = not bool(r['Non_unique'])
+            i_columns = []
+            if i_name in tmp_indexes:
+                i_columns = tmp_indexes[i_name]['columns']
+            i_columns.append(r['Column_name'])
+
+            tmp_indexes[i_name] = {
+                'index_name': i_name,
+                'unique': unique,
+                'table': table_name,
+                'columns': i_columns
+            }
+        return tmp_indexes
+
+    def __make_columns(self, table_name: str, rows: list) -> dict:
+        """Сформировать список колонок таблицы из строк результата запроса ('SHOW COLUMNS')
+
+        :param table_name: название таблицы
+        :param rows: строки результата запроса
+        :rtype: dict
+        """
+
+        tmp_columns = {}
+        for r in rows:
+            is_not_null = False
+            if str(r['Null']).lower() == 'no':
+                is_not_null = True
+            is_p_key = False
+            if str(r['Key']).lower() == 'pri':
+                is_p_key = True
+
+            tmp_columns[r['Field']] = {
+                'table': table_name,
+                'column': r['Field'],
+                'type': r['Type'],
+                'is_pk': is_p_key,
+                'is_not_null': is_not_null,
+                'default': r['Default']
+            }
+        return tmp_columns
+
+    def __make_primary_keys(self, table_name: str, rows: list, t_columns: dict) -> dict:
+        """Сформировать список первичных ключей таблицы из строк результата запроса ('SHOW KEYS')
+
+        :param table_name: название таблицы
+        :param rows: строки результата запроса
+        :param t_columns: список колонок таблицы
+        :rtype: dict
+        """
+
+        tmp_list = {}
+        for r in rows:
+            if not r['Column_name'] in t_columns:
+                continue
+            tmp_list[r['Key_name']] = {
+                'name': r['Key_name'],
+                'table': table_name,
+                'column': r['Column_name'],
+                'type': t_columns[r['Column_name']]['type']
+            }
+        return tmp_list
+
+    def __make_foreign_keys(self, table_name: str, rows: list) -> dict:
+        """Сформировать список вторичных ключей таблицы из строк результата запроса
+
+        :param table_name: название таблицы
+        :param rows: строки результата запроса
+        :rtype: dict
+        """
+
+        tmp_list = {}
+        for r in rows:
+            tmp_list[r['name']] = {
+                'name': r['name'],
+                'table': table_name,
+                'column': r['column'],
+                'ref_table': r['to_table'],
+                'ref_column': r['primary_key'],
+                'on_update': r['on_update'],
+                'on_delete': r['on_delete']
+            }
+        return tmp_list
+
+    @staticmethod
+    def __group_rows(rows: list, key: str) -> dict:
+        """Сгруппировать строки результата запроса по значению колонки
+
+        :param rows: строки результата запроса
+        :param key: название колонки
+        :rtype: dict
+        """
+
+        groups = {}
+        for r in rows:
+            groups.setdefault(r[key], []).append(r)
+        return groups
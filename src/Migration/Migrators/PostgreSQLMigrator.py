@@ -3,7 +3,7 @@ from src.Migration.Migrators.BaseMigrator import BaseMigrator
 
 
 class PostgreSQLMigrator(BaseMigrator):
-    def __init__(self, db_adapter, export_file: str = None):
+    def __init__(self, db_adapter, export_file=None):
         super().__init__(db_adapter, export_file)
 
     def create_database(self, name: str, props: dict = {}):
@@ -144,7 +144,7 @@ class PostgreSQLMigrator(BaseMigrator):
             if_exists = 'IF EXISTS'
         self._exec_query_or_export(f"DROP SCHEMA {if_exists} \"{name}\" CASCADE;")
 
-    def table_indexes(self, table_name: str) -> dict:
+    def _table_indexes(self, table_name: str) -> dict:
         """Запросить список индексов для таблицы
 
         :param table_name: название таблицы
@@ -172,7 +172,7 @@ class PostgreSQLMigrator(BaseMigrator):
         if not self._db_adapter:
             return {}
         # select table information
-        table_lst = table_name.split('.')
+        table_lst = self.__name_with_scheme_name(table_name, self._db_adapter.schema()).split('.')
         sql = ""
         if len(table_lst) == 1:
             sql = f"SELECT indexname, indexdef FROM pg_indexes WHERE tablename = '{table_name}';"
@@ -181,17 +181,9 @@ class PostgreSQLMigrator(BaseMigrator):
         else:
             raise Exception(f"[PostgreSQLMigrator][table_indexes] Invalid table name (name: \"{table_name}\")!")
 
-        res = self._db_adapter.query(sql)
-        if len(res) == 0:
-            return {}
-        tmp_indexes = {}
-        for r in res:
-            info = self.__parse_table_index(table_name, r['indexname'], r['indexdef'])
-            if 'index_name' in info:
-                tmp_indexes[info['index_name']] = info
-        return tmp_indexes
+        return self.__make_indexes(table_name, self._db_adapter.query(sql))
 
-    def table_columns(self, table_name: str) -> dict:
+    def _table_columns(self, table_name: str) -> dict:
         """Запросить список колонок таблицы и их типов
 
         :param table_name: название таблицы
@@ -223,7 +215,7 @@ class PostgreSQLMigrator(BaseMigrator):
         if not self._db_adapter:
             return {}
         # select table information
-        table_lst = table_name.split('.')
+        table_lst = self.__name_with_scheme_name(table_name, self._db_adapter.schema()).split('.')
         sql = ""
         if len(table_lst) == 1:
             sql = f"""
@@ -241,26 +233,9 @@ class PostgreSQLMigrator(BaseMigrator):
             raise Exception(f"[PostgreSQLMigrator][table_columns] Invalid table name (name: \"{table_name}\")!")
 
         tmp_p_keys = self.table_primary_keys(table_name)
-        res = self._db_adapter.query(sql)
-        if len(res) == 0:
-            return {}
-        tmp_columns = {}
-        for r in res:
-            is_pk = self.__column_is_p_key(r['column_name'], tmp_p_keys)
-            is_not_null = False
-            if str(r['is_nullable']).lower() == 'no':
-                is_not_null = True
-            tmp_columns[r['column_name']] = {
-                'table': f"{r['table_schema']}.{r['table_name']}",
-                'column': r['column_name'],
-                'type': self.to_database_type(str(r['data_type']), r['character_maximum_length']),
-                'is_pk': is_pk,
-                'is_not_null': is_not_null,
-                'default': r['column_default']
-            }
-        return tmp_columns
+        return self.__make_columns(self._db_adapter.query(sql), tmp_p_keys)
 
-    def table_primary_keys(self, table_name: str) -> dict:
+    def _table_primary_keys(self, table_name: str) -> dict:
         """Запросить список первичных ключей таблицы
 
         :param table_name: название таблицы
@@ -281,7 +256,7 @@ class PostgreSQLMigrator(BaseMigrator):
         if not self._db_adapter:
             return {}
         # select table information
-        table_lst = table_name.split('.')
+        table_lst = self.__name_with_scheme_name(table_name, self._db_adapter.schema()).split('.')
         sql = ""
         if len(table_lst) == 1:
             sql = f"""
@@ -327,20 +302,9 @@ class PostgreSQLMigrator(BaseMigrator):
         else:
             raise Exception(f"[PostgreSQLMigrator][table_primary_keys] Invalid table name (name: \"{table_name}\")!")
 
-        res = self._db_adapter.query(sql)
-        if len(res) == 0:
-            return {}
-        tmp_list = {}
-        for r in res:
-            tmp_list[r['constraint_name']] = {
-                'name': r['constraint_name'],
-                'table': f"{r['nspname']}.{r['relname']}",
-                'column': r['attname'],
-                'type': r['data_type']
-            }
-        return tmp_list
+        return self.__make_primary_keys(self._db_adapter.query(sql))
 
-    def table_foreign_keys(self, table_name) -> dict:
+    def _table_foreign_keys(self, table_name) -> dict:
         """Запросить список вторичных ключей для таблицы
 
         :param table_name: название таблицы
@@ -365,7 +329,7 @@ class PostgreSQLMigrator(BaseMigrator):
         if not self._db_adapter:
             return {}
         # select table information
-        table_lst = table_name.split('.')
+        table_lst = self.__name_with_scheme_name(table_name, self._db_adapter.schema()).split('.')
         sql = ""
         if len(table_lst) == 1:
             sql = f"""
@@ -422,21 +386,82 @@ class PostgreSQLMigrator(BaseMigrator):
         else:
             raise Exception(f"[PostgreSQLMigrator][table_foreign_keys] Invalid table name (name: \"{table_name}\")!")
 
-        res = self._db_adapter.query(sql)
-        if len(res) == 0:
-            return {}
-        tmp_list = {}
-        for r in res:
-            tmp_list[r['constraint_name']] = {
-                'name': r['constraint_name'],
-                'table': f"{r['table_schema']}.{r['table_name']}",
-                'column': r['column_name'],
-                'ref_table': f"{r['foreign_table_schema']}.{r['foreign_table_name']}",
-                'ref_column': r['foreign_column_name'],
-                'on_update': r['on_update'],
-                'on_delete': r['on_delete']
-            }
-        return tmp_list
+        return self.__make_foreign_keys(self._db_adapter.query(sql))
+
+    def _catalog_snapshot(self):
+        """Загрузить каталог всей базы данных набором запросов (формат см. в 'catalog_snapshot')
+
+        :rtype: dict|None
+
+        NOTE: The catalog of the current schema (see 'set_schema'; default: 'public') is selected;
+              the tables are stored by the names with and without the schema name.
+        """
+
+        if not self._db_adapter:
+            return None
+        schema = self.__scheme_name("")
+        res = self._db_adapter.query(f"SELECT table_name FROM information_schema.tables WHERE table_schema = '{schema}' AND table_type = 'BASE TABLE' ORDER BY table_name;")
+        tables = [r['table_name'] for r in res]
+        indexes_rows = self.__group_rows(self._db_adapter.query(f"SELECT tablename, indexname, indexdef FROM pg_indexes WHERE schemaname = '{schema}';"), 'tablename')
+        sql = f"""
+        SELECT table_schema, table_name, column_name, column_default, is_nullable, data_type, character_maximum_length 
+        FROM information_schema.columns 
+        WHERE table_schema = '{schema}'
+        ORDER BY table_name, ordinal_position;
+        """
+        columns_rows = self.__group_rows(self._db_adapter.query(sql), 'table_name')
+        sql = f"""
+        SELECT
+          pg_namespace.nspname,
+          pg_class.relname,
+          pg_attribute.attname,
+          format_type(pg_attribute.atttypid, pg_attribute.atttypmod) AS data_type,
+          pg_constraint.conname AS constraint_name
+        FROM pg_constraint
+        JOIN pg_class ON pg_class.oid = pg_constraint.conrelid
+        JOIN pg_namespace ON pg_namespace.oid = pg_class.relnamespace
+        JOIN pg_attribute ON pg_attribute.attrelid = pg_class.oid AND pg_attribute.attnum = any(pg_constraint.conkey)
+        WHERE pg_constraint.contype = 'p' AND pg_namespace.nspname = '{schema}';
+        """
+        p_keys_rows = self.__group_rows(self._db_adapter.query(sql), 'relname')
+        sql = f"""
+        SELECT
+          tc.table_schema, 
+          tc.constraint_name, 
+          tc.table_name, 
+          kcu.column_name, 
+          ccu.table_schema AS foreign_table_schema,
+          ccu.table_name AS foreign_table_name,
+          ccu.column_name AS foreign_column_name,
+          rc.update_rule AS on_update,
+          rc.delete_rule AS on_delete
+        FROM 
+          information_schema.table_constraints AS tc 
+        JOIN information_schema.key_column_usage AS kcu
+        ON tc.constraint_name = kcu.constraint_name
+        AND tc.table_schema = kcu.table_schema
+        JOIN information_schema.constraint_column_usage AS ccu
+        ON ccu.constraint_name = tc.constraint_name
+        AND ccu.table_schema = tc.table_schema
+        JOIN information_schema.referential_constraints rc
+        ON tc.constraint_catalog = rc.constraint_catalog
+        AND tc.constraint_schema = rc.constraint_schema
+        AND tc.constraint_name = rc.constraint_name
+        WHERE tc.constraint_type = 'FOREIGN KEY' AND tc.table_schema = '{schema}';
+        """
+        f_keys_rows = self.__group_rows(self._db_adapter.query(sql), 'table_name')
+        snapshot = {'tables': [], 'columns': {}, 'primary_keys': {}, 'foreign_keys': {}, 'indexes': {}}
+        for name in tables:
+            p_keys = self.__make_primary_keys(p_keys_rows.get(name, []))
+            columns = self.__make_columns(columns_rows.get(name, []), p_keys)
+            f_keys = self.__make_foreign_keys(f_keys_rows.get(name, []))
+            for table_name in (name, f"{schema}.{name}"):
+                snapshot['tables'].append(table_name)
+                snapshot['columns'][table_name] = columns
+                snapshot['primary_keys'][table_name] = p_keys
+                snapshot['foreign_keys'][table_name] = f_keys
+                snapshot['indexes'][table_name] = self.__make_indexes(table_name, indexes_rows.get(name, []))
+        return snapshot
 
     def to_database_type(self, name: str, limit: int = None) -> str:
         """Преобразование типа колонки в тип базы данных
@@ -478,6 +503,7 @@ class PostgreSQLMigrator(BaseMigrator):
         tmp_new_name = f"\"{self.__name_without_scheme_name(new_name)}\""
         # exec query
         self._exec_query_or_export(f"ALTER TABLE {tmp_name} RENAME TO {tmp_new_name};")
+        self._replay_catalog('rename_table', name, new_name)
         for k, v in tmp_indexes.items():
             index_new_name = str(v['index_name']).replace(name, new_name)
             if str(v['index_name']) == index_new_name:
@@ -506,6 +532,7 @@ class PostgreSQLMigrator(BaseMigrator):
         tmp_old_name = self._db_adapter.quote_table_name(self.__name_with_scheme_name(old_name, old_name_scheme_name))
         tmp_new_name = f"\"{self.__name_without_scheme_name(new_name)}\""
         self._exec_query_or_export(f"ALTER INDEX {tmp_old_name} RENAME TO {tmp_new_name};")
+        self._replay_catalog('rename_index', table_name, self.__name_without_scheme_name(old_name), self.__name_without_scheme_name(new_name))
 
     def _drop_index_protected(self, args: dict):
         """Удалить индекс у таблицы
@@ -547,6 +574,7 @@ class PostgreSQLMigrator(BaseMigrator):
         tmp_name_scheme_name = self.__scheme_name(tmp_name, table_scheme_name)
         if table_scheme_name != tmp_name_scheme_name:
             raise Exception("[PostgreSQLMigrator][_drop_index_protected] Scheme name in index name is not equal table scheme name!")
+        self._replay_catalog('drop_index', str(args['table']), self.__name_without_scheme_name(tmp_name))
         tmp_name = self._db_adapter.quote_table_name(self.__name_with_scheme_name(tmp_name, tmp_name_scheme_name))
 
         sql = "DROP INDEX"
@@ -596,6 +624,7 @@ class PostgreSQLMigrator(BaseMigrator):
         tmp_name = f"fk_{self.__name_without_scheme_name(table_name)}_{columns_names_2}"
         if 'name' in props:
             tmp_name = props['name']  # TODO name to underscore?
+        self._replay_catalog('add_foreign_key', table_name, tmp_name, columns, ref_table_name, ref_columns, self._catalog_reference_action(props))
         table_name = self._db_adapter.quote_table_name(table_name)
         ref_table_name = self._db_adapter.quote_table_name(ref_table_name)
         sql = f"ALTER TABLE {table_name} ADD CONSTRAINT {self._db_adapter.quote_table_name(tmp_name)} FOREIGN KEY ({columns_names}) REFERENCES {ref_table_name} ({ref_columns_names})"
@@ -640,6 +669,96 @@ class PostgreSQLMigrator(BaseMigrator):
             'columns': tmp_columns
         }
 
+    def __make_indexes(self, table_name: str, rows: list) -> dict:
+        """Сформировать список индексов таблицы из строк 'pg_indexes'
+
+        :param table_name: название таблицы
+        :param rows: строки результата запроса
+        :rtype: dict
+        """
+
+        tmp_indexes = {}
+        for r in rows:
+            info = self.__parse_table_index(table_name, r['indexname'], r['indexdef'])
+            if 'index_name' in info:
+                tmp_indexes[info['index_name']] = info
+        return tmp_indexes
+
+    def __make_columns(self, rows: list, p_keys: dict) -> dict:
+        """Сформировать список колонок таблицы из строк 'information_schema.columns'
+
+        :param rows: строки результата запроса
+        :param p_keys: массив первичных ключей таблицы
+        :rtype: dict
+        """
+
+        tmp_columns = {}
+        for r in rows:
+            is_pk = self.__column_is_p_key(r['column_name'], p_keys)
+            is_not_null = False
+            if str(r['is_nullable']).lower() == 'no':
+                is_not_null = True
+            tmp_columns[r['column_name']] = {
+                'table': f"{r['table_schema']}.{r['table_name']}",
+                'column': r['column_name'],
+                'type': self.to_database_type(str(r['data_type']), r['character_maximum_length']),
+                'is_pk': is_pk,
+                'is_not_null': is_not_null,
+                'default': r['column_default']
+            }
+        return tmp_columns
+
+    def __make_primary_keys(self, rows: list) -> dict:
+        """Сформировать список первичных ключей таблицы из строк результата запроса
+
+        :param rows: строки результата запроса
+        :rtype: dict
+        """
+
+        tmp_list = {}
+        for r in rows:
+            tmp_list[r['constraint_name']] = {
+                'name': r['constraint_name'],
+                'table': f"{r['nspname']}.{r['relname']}",
+                'column': r['attname'],
+                'type': r['data_type']
+            }
+        return tmp_list
+
+    def __make_foreign_keys(self, rows: list) -> dict:
+        """Сформировать список вторичных ключей таблицы из строк результата запроса
+
+        :param rows: строки результата запроса
+        :rtype: dict
+        """
+
+        tmp_list = {}
+        for r in rows:
+            tmp_list[r['constraint_name']] = {
+                'name': r['constraint_name'],
+                'table': f"{r['table_schema']}.{r['table_name']}",
+                'column': r['column_name'],
+                'ref_table': f"{r['foreign_table_schema']}.{r['foreign_table_name']}",
+                'ref_column': r['foreign_column_name'],
+                'on_update': r['on_update'],
+                'on_delete': r['on_delete']
+            }
+        return tmp_list
+
+    @staticmethod
+    def __group_rows(rows: list, key: str) -> dict:
+        """Сгруппировать строки результата запроса по значению колонки
+
+        :param rows: строки результата запроса
+        :param key: название колонки
+        :rtype: dict
+        """
+
+        groups = {}
+        for r in rows:
+            groups.setdefault(r[key], []).append(r)
+        return groups
+
     def __column_is_p_key(self, column: str, p_keys: dict) -> bool:
         """Проверка, является ли колонка первичным ключом
 
@@ -657,6 +776,9 @@ class PostgreSQLMigrator(BaseMigrator):
         name_lst = name.split('.')
         if len(name_lst) == 1:
             if not scheme_name:
+                # NOTE: the tenant schema (see 'set_schema') is used instead of 'public'
+                if self._db_adapter and self._db_adapter.schema() != "":
+                    return self._db_adapter.schema()
                 return 'public'
             return scheme_name
         return name_lst[0]
@@ -1,11 +1,33 @@
 import os
 import re
+import time
+import sqlite3
 from src.Migration.Migrators.BaseMigrator import BaseMigrator
+from src.Migration.Migrators.SQLiteTableSql import SQLiteTableSql
 
 
 class SQLiteMigrator(BaseMigrator):
-    def __init__(self, db_adapter, export_file: str = None):
+    __rebuilds = {}
+    __applying = False
+    __server_version = None
+    __bulk_ddl_defaults = {
+        'cache_size': -262144,
+        'temp_store': 'MEMORY',
+        'mmap_size': 268435456,
+        'synchronous': 'NORMAL'
+    }
+    __bulk_ddl_values = {
+        'temp_store': ('DEFAULT', 'FILE', 'MEMORY', '0', '1', '2'),
+        'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA', '0', '1', '2', '3')
+    }
+    __bulk_ddl_restore = {}
+
+    def __init__(self, db_adapter, export_file=None):
         super().__init__(db_adapter, export_file)
+        self.__rebuilds = {}
+        self.__applying = False
+        self.__server_version = None
+        self.__bulk_ddl_restore = {}
 
     #
     # base methods to override if needed:
@@ -72,29 +94,8 @@ class SQLiteMigrator(BaseMigrator):
         }
         """
 
-        if not self._db_adapter:
-            return {}
-        # select table information
-        res = self._db_adapter.query(f"PRAGMA INDEX_LIST(\"{table_name}\");")
-        if len(res) == 0:
-            return {}
-        tmp_indexes = {}
-        for r in res:
-            i_name = r['name']
-            i_res = self._db_adapter.query(f"PRAGMA index_info(\"{i_name}\");")
-            if len(i_res) == 0:
-                continue
-            i_columns = []
-            for info in i_res:
-                i_columns.append(info['name'])
-
-            tmp_indexes[i_name] = {
-                'index_name': i_name,
-                'unique': bool(r['unique']),  # TODO check is correct bool!
-                'table': table_name,
-                'columns': i_columns
-            }
-        return tmp_indexes
+        self.apply_pending_changes(table_name)
+        return super().table_indexes(table_name)
 
     def table_columns(self, table_name: str) -> dict:
         """Запросить список колонок таблицы и их типов
@@ -125,23 +126,8 @@ class SQLiteMigrator(BaseMigrator):
         }
         """
 
-        if not self._db_adapter:
-            return {}
-        # select table information
-        res = self._db_adapter.query(f"PRAGMA table_info(\"{table_name}\");")
-        if len(res) == 0:
-            return {}
-        tmp_columns = {}
-        for r in res:
-            tmp_columns[r['name']] = {
-                'table': table_name,
-                'column': r['name'],
-                'type': r['type'],
-                'is_pk': bool(r['pk']),
-                'is_not_null': bool(r['notnull']),
-                'default': r['dflt_value']
-            }
-        return tmp_columns
+        self.apply_pending_changes(table_name)
+        return super().table_columns(table_name)
 
     def table_primary_keys(self, table_name: str) -> dict:
         """Запросить список первичных ключей таблицы
@@ -161,37 +147,8 @@ class SQLiteMigrator(BaseMigrator):
         }
         """
 
-        if not self._db_adapter:
-            return {}
-        # select table sql
-        res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
-        if len(res) == 0:
-            return {}
-        t_sql = res[0]['sql']
-        # select table information
-        res = self._db_adapter.query(f"PRAGMA table_info(\"{table_name}\");")
-        if len(res) == 0:
-            return {}
-        tmp_columns = {}
-        for r in res:
-            if not bool(r['pk']):
-                continue
-            tmp_name = ""
-            column_name = r['name']
-            reg = r'\bCONSTRAINT \"?([A-Za-z0-9_]+\_pkey)\"? PRIMARY KEY \(' + column_name + r'\)'
-            result = re.search(reg, t_sql)
-            if result:
-                tmp_name = result.group(1).strip()
-            if tmp_name == "":
-                tmp_name = f"{table_name}_pkey"
-
-            tmp_columns[tmp_name] = {
-                'name': tmp_name,
-                'table': table_name,
-                'column': column_name,
-                'type': r['type']
-            }
-        return tmp_columns
+        self.apply_pending_changes(table_name)
+        return super().table_primary_keys(table_name)
 
     def table_foreign_keys(self, table_name) -> dict:
         """Запросить список вторичных ключей для таблицы
@@ -215,46 +172,8 @@ class SQLiteMigrator(BaseMigrator):
         }
         """
 
-        if not self._db_adapter:
-            return {}
-        # select table sql
-        res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
-        if len(res) == 0:
-            return {}
-        t_sql = res[0]['sql']
-        # select table information
-        res = self._db_adapter.query(f"PRAGMA foreign_key_list(\"{table_name}\");")
-        if len(res) == 0:
-            return {}
-        tmp_list = {}
-        for r in res:
-            tmp_columns_list = str(r['from']).split(',')
-            tmp_columns = []
-            for i in tmp_columns_list:
-                tmp_columns.append(i.strip())
-
-            tmp_name = ""
-            columns_names = r['from']
-            ref_table_name = r['table']
-            ref_columns_names = r['to']
-            reg = r'\bCONSTRAINT \"?([A-Za-z0-9_]+)\"? FOREIGN KEY \(' + columns_names + r'\) REFERENCES \"' + ref_table_name + r'\"\(' + ref_columns_names + r'\)'
-            result = re.search(reg, t_sql)
-            if result:
-                tmp_name = result.group(1).strip()
-            if tmp_name == "":
-                tmp_columns_names = str("_").join(tmp_columns)
-                tmp_name = f"fk_{table_name}_{tmp_columns_names}"
-
-            tmp_list[tmp_name] = {
-                'name': tmp_name,
-                'table': table_name,
-                'column': columns_names,
-                'ref_table': ref_table_name,
-                'ref_column': ref_columns_names,
-                'on_update': r['on_update'],
-                'on_delete': r['on_delete']
-            }
-        return tmp_list
+        self.apply_pending_changes(table_name)
+        return super().table_foreign_keys(table_name)
 
     def add_column(self, table_name: str, column_name: str, props: dict = {}):
         """Добавить колонку в таблицу
@@ -275,12 +194,12 @@ class SQLiteMigrator(BaseMigrator):
             raise Exception("[SQLiteMigrator][add_column] Table name or column name is Empty!")
         if not self._db_adapter:
             raise Exception("[SQLiteMigrator][add_column] Database adapter is None!")
+        self.apply_pending_changes(table_name)
         # select table information
         res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
         if len(res) == 0:
             raise Exception("[SQLiteMigrator][add_column] SQL data in sqlite_master is Empty!")
-        sql = str(res[0]['sql'])
-        if sql.find(f"\"{column_name}\"") != -1:
+        if SQLiteTableSql.parse(str(res[0]['sql'])).has_column(column_name):
             raise Exception(
                 f"[SQLiteMigrator][add_column] Column \"{column_name}\" in table \"{table_name}\" already exists!")
         tmp_res = self._prepare_create_column(column_name, props)
@@ -301,94 +220,20 @@ class SQLiteMigrator(BaseMigrator):
           - [integer]  limit          - размер данных колонки
           - [bool]     null           - может ли быть NULL
           - [string]   default        - базовое значение
+
+        NOTE: The table rebuild is deferred (see 'apply_pending_changes').
         """
 
         if table_name == "" or column_name == "" or new_type == "":
             raise Exception("[SQLiteMigrator][change_column] Table name or column name or new type is Empty!")
         if not self._db_adapter:
             raise Exception("[SQLiteMigrator][change_column] Database adapter is None!")
-        # select indexes
-        tmp_indexes = self.table_indexes(table_name)
         # select table information
-        res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
-        if len(res) == 0:
-            raise Exception(
-                f"[SQLiteMigrator][change_column] SQL data in sqlite_master fot table \"{table_name}\" is Empty!")
-        sql = str(res[0]['sql'])
-        pos = sql.find(f"\"{column_name}\"")
-        if pos == -1:
-            raise Exception(
-                f"[SQLiteMigrator][change_column] Column \"{column_name}\" not found in table \"{table_name}\"!")
-        new_sql = ""
-        new_sql_part = ""
-        use_skip = False
-        for i in range(len(sql)):
-            tmp_char = sql[i]
-            if tmp_char == ',':
-                if not use_skip:
-                    new_sql_part = new_sql_part.strip()
-                    if len(new_sql) == 0 and len(new_sql_part) > 0:
-                        new_sql = str(new_sql_part)
-                    elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                        new_sql += f",\n{str(new_sql_part)}"
-                else:
-                    props['type'] = new_type
-                    tmp_res = self._prepare_create_column(column_name, props)
-                    tmp_sql = tmp_res.get('sql', '')
-                    if len(new_sql) == 0 and len(tmp_sql) > 0:
-                        new_sql = str(tmp_sql)
-                    elif len(new_sql) > 0 and len(tmp_sql) > 0:
-                        new_sql += f",\n{str(tmp_sql)}"
-                    use_skip = False
-
-                new_sql_part = ""
-                continue
-
-            new_sql_part += str(tmp_char)
-            if i == pos:
-                use_skip = True
-
-        if not use_skip:
-            new_sql_part = new_sql_part.strip()
-            if len(new_sql) == 0 and len(new_sql_part) > 0:
-                new_sql = str(new_sql_part)
-            elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                new_sql += f",\n{str(new_sql_part)}"
-
-        # remove last ';'
-        new_sql = str(new_sql).strip()
-        if new_sql[len(new_sql) - 1] == ';':
-            new_sql = str(new_sql[0:(len(new_sql) - 1)]).strip()
-        # add last ')'
-        if new_sql[len(new_sql) - 1] != ')':
-            new_sql += " )"
-
-        res = self._db_adapter.query(f"PRAGMA table_info(\"{table_name}\");")
-        if len(res) == 0:
-            raise Exception(f"[SQLiteMigrator][change_column] SQLite table_info(\"{table_name}\") return empty result!")
-        tmp_columns = ""
-        for r in res:
-            if tmp_columns != "":
-                tmp_columns += ","
-            tmp_columns += f" {r['name']}"
-        tmp_columns = str(tmp_columns).strip()
-
-        # rename old table
-        new_t_name = f"{table_name}_old"
-        self._exec_query_or_export(f"ALTER TABLE \"{table_name}\" RENAME TO \"{new_t_name}\";")
-        # create new table
-        self._exec_query_or_export(new_sql)
-        # insert new data
-        if tmp_columns != "":
-            self._exec_query_or_export(f"INSERT INTO \"{table_name}\" SELECT {tmp_columns} FROM \"{new_t_name}\";")
-        # drop old table
-        self._exec_query_or_export(f"DROP TABLE \"{new_t_name}\";")
-        # append indexes
-        tmp_indexes_upd = self.table_indexes(table_name)
-        for index in tmp_indexes.values():
-            if index['index_name'] in tmp_indexes_upd:
-                continue  # skip - already added
-            self.add_index(table_name, index['columns'], {'unique': index['unique']})
+        table_sql = self.__table_model(table_name, column_name, 'change_column')
+        props['type'] = new_type
+        table_sql.set_column(column_name, self._prepare_create_column(column_name, props).get('sql', ''))
+        tmp_columns = self.__table_column_names(table_name, 'change_column')
+        self.__defer_rebuild(table_name, table_sql, tmp_columns, False, column_name)
 
     def change_column_default(self, table_name: str, column_name: str, default=None):
         """Изменить/Удалить секцию DEFAULT у колонки
@@ -396,95 +241,26 @@ class SQLiteMigrator(BaseMigrator):
         :param table_name: название таблицы
         :param column_name: название колонки
         :param default: значение секции DEFAULT (если None - секция DEFAULT удаляется)
+
+        NOTE: The table rebuild is deferred (see 'apply_pending_changes').
         """
 
         if table_name == "" or column_name == "":
             raise Exception("[SQLiteMigrator][change_column_default] Table name or column name is Empty!")
         if not self._db_adapter:
             raise Exception("[SQLiteMigrator][change_column_default] Database adapter is None!")
-        # select indexes
-        tmp_indexes = self.table_indexes(table_name)
-        # select columns
-        tmp_columns = self.table_columns(table_name)
-        if not column_name in tmp_columns:
-            raise Exception(
-                f"[SQLiteMigrator][change_column_default] Column \"{column_name}\" not found in table columns list!")
+        # select column
+        column_info = self.__table_column_info(table_name, column_name, 'change_column_default')
         # select table information
-        res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
-        if len(res) == 0:
-            raise Exception(
-                f"[SQLiteMigrator][change_column_default] SQL data in sqlite_master fot table \"{table_name}\" is Empty!")
-        sql = str(res[0]['sql'])
-        pos = sql.find(f"\"{column_name}\"")
-        if pos == -1:
-            raise Exception(
-                f"[SQLiteMigrator][change_column_default] Column \"{column_name}\" not found in table \"{table_name}\"!")
-        new_sql = ""
-        new_sql_part = ""
-        use_skip = False
-        for i in range(len(sql)):
-            tmp_char = sql[i]
-            if tmp_char == ',':
-                if not use_skip:
-                    new_sql_part = new_sql_part.strip()
-                    if len(new_sql) == 0 and len(new_sql_part) > 0:
-                        new_sql = str(new_sql_part)
-                    elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                        new_sql += f",\n{str(new_sql_part)}"
-                else:
-                    props = {
-                        'type': tmp_columns[column_name]['type'],
-                        'default': self.__prepare_default(default),
-                        'null': not tmp_columns[column_name]['is_not_null']
-                    }
-                    tmp_res = self._prepare_create_column(column_name, props)
-                    tmp_sql = tmp_res.get('sql', '')
-                    if len(new_sql) == 0 and len(tmp_sql) > 0:
-                        new_sql = str(tmp_sql)
-                    elif len(new_sql) > 0 and len(tmp_sql) > 0:
-                        new_sql += f",\n{str(tmp_sql)}"
-                    use_skip = False
-
-                new_sql_part = ""
-                continue
-
-            new_sql_part += str(tmp_char)
-            if i == pos:
-                use_skip = True
-
-        if not use_skip:
-            new_sql_part = new_sql_part.strip()
-            if len(new_sql) == 0 and len(new_sql_part) > 0:
-                new_sql = str(new_sql_part)
-            elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                new_sql += f",\n{str(new_sql_part)}"
-
-        # remove last ';'
-        new_sql = str(new_sql).strip()
-        if new_sql[len(new_sql) - 1] == ';':
-            new_sql = str(new_sql[0:(len(new_sql) - 1)]).strip()
-        # add last ')'
-        if new_sql[len(new_sql) - 1] != ')':
-            new_sql += " )"
-
-        tmp_columns_names = str(", ").join(tmp_columns.keys())
-
-        # rename old table
-        new_t_name = f"{table_name}_old"
-        self._exec_query_or_export(f"ALTER TABLE \"{table_name}\" RENAME TO \"{new_t_name}\";")
-        # create new table
-        self._exec_query_or_export(new_sql)
-        # insert new data
-        if tmp_columns_names != "":
-            self._exec_query_or_export(f"INSERT INTO \"{table_name}\" SELECT {tmp_columns_names} FROM \"{new_t_name}\";")
-        # drop old table
-        self._exec_query_or_export(f"DROP TABLE \"{new_t_name}\";")
-        # append indexes
-        tmp_indexes_upd = self.table_indexes(table_name)
-        for index in tmp_indexes.values():
-            if index['index_name'] in tmp_indexes_upd:
-                continue  # skip - already added
-            self.add_index(table_name, index['columns'], {'unique': index['unique']})
+        table_sql = self.__table_model(table_name, column_name, 'change_column_default')
+        props = {
+            'type': column_info['type'],
+            'default': self.__prepare_default(default),
+            'null': not column_info['is_not_null']
+        }
+        table_sql.set_column(column_name, self._prepare_create_column(column_name, props).get('sql', ''))
+        tmp_columns = self.__table_column_names(table_name, 'change_column_default')
+        self.__defer_rebuild(table_name, table_sql, tmp_columns, False, column_name)
 
     def change_column_null(self, table_name: str, column_name: str, not_null: bool = False):
         """Добавить/Удалить секцию NOT NULL у колонки
@@ -492,95 +268,26 @@ class SQLiteMigrator(BaseMigrator):
         :param table_name: название таблицы
         :param column_name: название колонки
         :param not_null: значение секции (если False - секция NOT NULL удаляется)
+
+        NOTE: The table rebuild is deferred (see 'apply_pending_changes').
         """
 
         if table_name == "" or column_name == "":
             raise Exception("[SQLiteMigrator][change_column_null] Table name or column name is Empty!")
         if not self._db_adapter:
             raise Exception("[SQLiteMigrator][change_column_null] Database adapter is None!")
-        # select indexes
-        tmp_indexes = self.table_indexes(table_name)
-        # select columns
-        tmp_columns = self.table_columns(table_name)
-        if not column_name in tmp_columns:
-            raise Exception(
-                f"[SQLiteMigrator][change_column_null] Column \"{column_name}\" not found in table columns list!")
+        # select column
+        column_info = self.__table_column_info(table_name, column_name, 'change_column_null')
         # select table information
-        res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
-        if len(res) == 0:
-            raise Exception(
-                f"[SQLiteMigrator][change_column_null] SQL data in sqlite_master fot table \"{table_name}\" is Empty!")
-        sql = str(res[0]['sql'])
-        pos = sql.find(f"\"{column_name}\"")
-        if pos == -1:
-            raise Exception(
-                f"[SQLiteMigrator][change_column_null] Column \"{column_name}\" not found in table \"{table_name}\"!")
-        new_sql = ""
-        new_sql_part = ""
-        use_skip = False
-        for i in range(len(sql)):
-            tmp_char = sql[i]
-            if tmp_char == ',':
-                if not use_skip:
-                    new_sql_part = new_sql_part.strip()
-                    if len(new_sql) == 0 and len(new_sql_part) > 0:
-                        new_sql = str(new_sql_part)
-                    elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                        new_sql += f",\n{str(new_sql_part)}"
-                else:
-                    props = {
-                        'type': tmp_columns[column_name]['type'],
-                        'default': self.__prepare_default(tmp_columns[column_name]['default']),
-                        'null': not not_null
-                    }
-                    tmp_res = self._prepare_create_column(column_name, props)
-                    tmp_sql = tmp_res.get('sql', '')
-                    if len(new_sql) == 0 and len(tmp_sql) > 0:
-                        new_sql = str(tmp_sql)
-                    elif len(new_sql) > 0 and len(tmp_sql) > 0:
-                        new_sql += f",\n{str(tmp_sql)}"
-                    use_skip = False
-
-                new_sql_part = ""
-                continue
-
-            new_sql_part += str(tmp_char)
-            if i == pos:
-                use_skip = True
-
-        if not use_skip:
-            new_sql_part = new_sql_part.strip()
-            if len(new_sql) == 0 and len(new_sql_part) > 0:
-                new_sql = str(new_sql_part)
-            elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                new_sql += f",\n{str(new_sql_part)}"
-
-        # remove last ';'
-        new_sql = str(new_sql).strip()
-        if new_sql[len(new_sql) - 1] == ';':
-            new_sql = str(new_sql[0:(len(new_sql) - 1)]).strip()
-        # add last ')'
-        if new_sql[len(new_sql) - 1] != ')':
-            new_sql += " )"
-
-        tmp_columns_names = str(", ").join(tmp_columns.keys())
-
-        # rename old table
-        new_t_name = f"{table_name}_old"
-        self._exec_query_or_export(f"ALTER TABLE \"{table_name}\" RENAME TO \"{new_t_name}\";")
-        # create new table
-        self._exec_query_or_export(new_sql)
-        # insert new data
-        if tmp_columns_names != "":
-            self._exec_query_or_export(f"INSERT INTO \"{table_name}\" SELECT {tmp_columns_names} FROM \"{new_t_name}\";")
-        # drop old table
-        self._exec_query_or_export(f"DROP TABLE \"{new_t_name}\";")
-        # append indexes
-        tmp_indexes_upd = self.table_indexes(table_name)
-        for index in tmp_indexes.values():
-            if index['index_name'] in tmp_indexes_upd:
-                continue  # skip - already added
-            self.add_index(table_name, index['columns'], {'unique': index['unique']})
+        table_sql = self.__table_model(table_name, column_name, 'change_column_null')
+        props = {
+            'type': column_info['type'],
+            'default': self.__prepare_default(column_info['default']),
+            'null': not not_null
+        }
+        table_sql.set_column(column_name, self._prepare_create_column(column_name, props).get('sql', ''))
+        tmp_columns = self.__table_column_names(table_name, 'change_column_null')
+        self.__defer_rebuild(table_name, table_sql, tmp_columns, False, column_name)
 
     def drop_column(self, table_name: str, column_name: str):
         """Удалить колонку из таблицы
@@ -588,82 +295,61 @@ class SQLiteMigrator(BaseMigrator):
         :param table_name: название таблицы
         :param column_name: название колонки
 
-        NOTE: not supported in SQLite -> override this method for correct implementation.
+        NOTE: SQLite 3.35+ drops the column in place ('ALTER TABLE ... DROP COLUMN'),
+              if the column is not used by indexes, keys, constraints, generated columns, views
+              and triggers and the table has no pending rebuild (not used for export); otherwise
+              (or if SQLite refuses the drop) the table rebuild is deferred (see 'apply_pending_changes').
         """
 
         if table_name == "" or column_name == "":
             raise Exception("[SQLiteMigrator][drop_column] Table name or column name is Empty!")
         if not self._db_adapter:
             raise Exception("[SQLiteMigrator][drop_column] Database adapter is None!")
+        if self.__is_native_drop_column(table_name, column_name):
+            try:
+                self._exec_query_or_export(f"ALTER TABLE \"{table_name}\" DROP COLUMN \"{column_name}\";")
+                return
+            except sqlite3.OperationalError:
+                pass  # the column is used by the schema (SQLite checks the whole schema): rebuild the table
         # select table information
-        res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
-        if len(res) == 0:
-            raise Exception(
-                f"[SQLiteMigrator][drop_column] SQL data in sqlite_master fot table \"{table_name}\" is Empty!")
-        sql = str(res[0]['sql'])
-        pos = sql.find(f"\"{column_name}\"")
-        if pos == -1:
-            raise Exception(
-                f"[SQLiteMigrator][drop_column] Column \"{column_name}\" not found in table \"{table_name}\"!")
-        new_sql = ""
-        new_sql_part = ""
-        use_skip = False
-        for i in range(len(sql)):
-            tmp_char = sql[i]
-            if tmp_char == ',':
-                if not use_skip:
-                    new_sql_part = new_sql_part.strip()
-                    if len(new_sql) == 0 and len(new_sql_part) > 0:
-                        new_sql = str(new_sql_part)
-                    elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                        new_sql += f",\n{str(new_sql_part)}"
-                else:
-                    use_skip = False
-
-                new_sql_part = ""
+        table_sql = self.__table_model(table_name, column_name, 'drop_column')
+        table_sql.drop_column(column_name)
+        tmp_columns = []
+        for name in self.__table_column_names(table_name, 'drop_column'):
+            if name == column_name:
                 continue
+            tmp_columns.append(name)
+        self.__defer_rebuild(table_name, table_sql, tmp_columns, False, column_name)
 
-            new_sql_part += str(tmp_char)
-            if i == pos:
-                use_skip = True
-
-        if not use_skip:
-            new_sql_part = new_sql_part.strip()
-            if len(new_sql) == 0 and len(new_sql_part) > 0:
-                new_sql = str(new_sql_part)
-            elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                new_sql += f",\n{str(new_sql_part)}"
-
-        # remove last ';'
-        new_sql = str(new_sql).strip()
-        if new_sql[len(new_sql) - 1] == ';':
-            new_sql = str(new_sql[0:(len(new_sql) - 1)]).strip()
-        # add last ')'
-        if new_sql[len(new_sql) - 1] != ')':
-            new_sql += " )"
+    def rename_column(self, table_name: str, column_name: str, column_new_name: str):
+        """Переименовать колонку в таблице
 
-        res = self._db_adapter.query(f"PRAGMA table_info(\"{table_name}\");")
-        if len(res) == 0:
-            raise Exception(f"[SQLiteMigrator][drop_column] SQLite table_info(\"{table_name}\") return empty result!")
-        tmp_columns = ""
-        for r in res:
-            if r['name'] == column_name:
-                continue
-            if tmp_columns != "":
-                tmp_columns += ","
-            tmp_columns += f" {r['name']}"
-        tmp_columns = str(tmp_columns).strip()
+        :param table_name: название таблицы
+        :param column_name: название колонки
+        :param column_new_name: новое название колонки
 
-        # rename old table
-        new_t_name = f"{table_name}_old"
-        self._exec_query_or_export(f"ALTER TABLE \"{table_name}\" RENAME TO \"{new_t_name}\";")
-        # create new table
-        self._exec_query_or_export(new_sql)
-        # insert new data
-        if tmp_columns != "":
-            self._exec_query_or_export(f"INSERT INTO \"{table_name}\" SELECT {tmp_columns} FROM \"{new_t_name}\";")
-        # drop old table
-        self._exec_query_or_export(f"DROP TABLE \"{new_t_name}\";")
+        NOTE: SQLite 3.25+ renames the column in place ('ALTER TABLE ... RENAME COLUMN');
+              older versions rebuild the table.
+        """
+
+        if table_name == "" or column_name == "" or column_new_name == "":
+            raise Exception("[SQLiteMigrator][rename_column] Table name or column name or column new name is Empty!")
+        if column_name == column_new_name:
+            raise Exception("[SQLiteMigrator][rename_column] Column name is the same as new column name!")
+        if not self._db_adapter:
+            raise Exception("[SQLiteMigrator][rename_column] Database adapter is None!")
+        if self.__is_server_version(3, 25):
+            super().rename_column(table_name, column_name, column_new_name)
+            return
+        self.apply_pending_changes(table_name)
+        # select table information
+        table_sql = self.__table_model(table_name, column_name, 'rename_column')
+        table_sql.rename_column(column_name, column_new_name)
+        tmp_columns = self.__table_column_names(table_name, 'rename_column')
+        self.__defer_rebuild(table_name, table_sql, tmp_columns, True)
+        for index in self.__rebuilds[table_name]['indexes'].values():
+            index['columns'] = [column_new_name if c == column_name else c for c in index['columns']]
+        self.apply_pending_changes(table_name)
 
     def rename_index(self, table_name: str, old_name: str, new_name: str):
         """Переименовать индекс для таблицы
@@ -679,6 +365,8 @@ class SQLiteMigrator(BaseMigrator):
             raise Exception("[SQLiteMigrator][rename_index] Database adapter is None!")
         if old_name == new_name:
             raise Exception("[SQLiteMigrator][rename_index] Old name is the same as new name!")
+        if old_name.startswith('sqlite_autoindex_'):
+            return  # UNIQUE / PRIMARY KEY constraint index (renamed by SQLite)
         tmp_indexes = self.table_indexes(table_name)
         if len(tmp_indexes) == 0:
             raise Exception(f"[SQLiteMigrator][rename_index] Table \"{table_name}\" has no indexes!")
@@ -701,6 +389,8 @@ class SQLiteMigrator(BaseMigrator):
 
         :param table_name: название таблицы
         :param column_name: название колонки
+
+        NOTE: The table rebuild is deferred (see 'apply_pending_changes').
         """
 
         if table_name == "" or column_name == "":
@@ -708,98 +398,25 @@ class SQLiteMigrator(BaseMigrator):
         if not self._db_adapter:
             raise Exception("[SQLiteMigrator][set_primary_key] Database adapter is None!")
         # drop old primary keys
-        tmp_p_keys = self.table_primary_keys(table_name)
+        tmp_p_keys = self.__pending_primary_keys(table_name)
         for info in tmp_p_keys.values():
-            self.drop_primary_key(table_name, info['column'])
-        # select foreign_keys
-        res = self._db_adapter.query("PRAGMA foreign_keys;")
-        if len(res) == 0:
-            raise Exception("[SQLiteMigrator][set_primary_key] \"PRAGMA foreign_keys\" is Empty!")
-        foreign_keys = res[0]['foreign_keys']
-        # select defer_foreign_keys
-        res = self._db_adapter.query("PRAGMA defer_foreign_keys;")
-        if len(res) == 0:
-            raise Exception("[SQLiteMigrator][set_primary_key] \"PRAGMA defer_foreign_keys\" is Empty!")
-        defer_foreign_keys = res[0]['defer_foreign_keys']
-        # set new states
-        self._db_adapter.query("PRAGMA defer_foreign_keys = ON;")
-        self._db_adapter.query("PRAGMA foreign_keys = OFF;")
-        # select indexes
-        tmp_indexes = self.table_indexes(table_name)
-        # select columns
-        tmp_columns = self.table_columns(table_name)
+            self.__drop_primary_key(table_name, info['name'], 'set_primary_key')
         # select table information
-        res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
-        if len(res) == 0:
-            raise Exception(
-                f"[SQLiteMigrator][set_primary_key] SQL data in sqlite_master fot table \"{table_name}\" is Empty!")
-        sql = res[0]['sql']
-        new_sql = ""
-        new_sql_part = ""
-        for i in range(len(sql)):
-            tmp_char = sql[i]
-            if tmp_char == ',':
-                new_sql_part = new_sql_part.strip()
-                if len(new_sql) == 0 and len(new_sql_part) > 0:
-                    new_sql = str(new_sql_part)
-                elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                    new_sql += f",\n{str(new_sql_part)}"
-                new_sql_part = ""
-                continue
-
-            new_sql_part += str(tmp_char)
-
-        # add end of sql
-        new_sql_part = new_sql_part.strip()
-        if len(new_sql) == 0 and len(new_sql_part) > 0:
-            new_sql = str(new_sql_part)
-        elif len(new_sql) > 0 and len(new_sql_part) > 0:
-            new_sql += f",\n{str(new_sql_part)}"
-
-        # remove last ';'
-        new_sql = str(new_sql).strip()
-        if new_sql[len(new_sql) - 1] == ';':
-            new_sql = str(new_sql[0:(len(new_sql) - 1)]).strip()
-        # remove last ')'
-        if new_sql[len(new_sql) - 1] == ')':
-            new_sql = str(new_sql[0:(len(new_sql) - 1)]).strip()
+        table_sql = self.__table_sql(table_name, 'set_primary_key')
         # add primary key
         tmp_table_list = table_name.split('.')
         tmp_p_key_name = f"{tmp_table_list[len(tmp_table_list) - 1]}_pkey"
-        f_sql = f"CONSTRAINT \"{tmp_p_key_name}\" PRIMARY KEY ({column_name})"
-        if new_sql != "":
-            f_sql = f", \n{f_sql}"
-        new_sql += f_sql
-        # add last ')'
-        new_sql += " )"
-
-        tmp_columns_names = str(', ').join(tmp_columns.keys())
-
-        # rename old table
-        new_t_name = f"{table_name}_old"
-        self._exec_query_or_export(f"ALTER TABLE \"{table_name}\" RENAME TO \"{new_t_name}\";")
-        # create new table
-        self._exec_query_or_export(new_sql)
-        # insert new data
-        if tmp_columns != "":
-            self._exec_query_or_export(f"INSERT INTO \"{table_name}\" SELECT {tmp_columns_names} FROM \"{new_t_name}\";")
-        # drop old table
-        self._exec_query_or_export(f"DROP TABLE \"{new_t_name}\";")
-        # append indexes
-        tmp_indexes_upd = self.table_indexes(table_name)
-        for index in tmp_indexes.values():
-            if index['index_name'] in tmp_indexes_upd:
-                continue  # skip - already added
-            self.add_index(table_name, index['columns'], {'unique': index['unique']})
-        # set old states
-        self._db_adapter.query(f"PRAGMA defer_foreign_keys = {defer_foreign_keys};")
-        self._db_adapter.query(f"PRAGMA foreign_keys = {foreign_keys};")
+        table_sql.add_constraint(f"CONSTRAINT \"{tmp_p_key_name}\" PRIMARY KEY ({column_name})")
+        tmp_columns = self.__table_column_names(table_name, 'set_primary_key')
+        self.__defer_rebuild(table_name, table_sql, tmp_columns, True)
 
     def drop_primary_key(self, table_name: str, column_name: str):
         """Удалить первичный ключ таблицы
 
         :param table_name: название таблицы
         :param column_name: название колонки
+
+        NOTE: The table rebuild is deferred (see 'apply_pending_changes').
         """
 
         if table_name == "" or column_name == "":
@@ -807,7 +424,7 @@ class SQLiteMigrator(BaseMigrator):
         if not self._db_adapter:
             raise Exception("[SQLiteMigrator][drop_primary_key] Database adapter is None!")
         tmp_p_key_name = ""
-        tmp_p_keys = self.table_primary_keys(table_name)
+        tmp_p_keys = self.__pending_primary_keys(table_name)
         for info in tmp_p_keys.values():
             if info['column'] == column_name:
                 tmp_p_key_name = info['name']
@@ -815,91 +432,7 @@ class SQLiteMigrator(BaseMigrator):
         if tmp_p_key_name == "":
             raise Exception(
                 f"[SQLiteMigrator][drop_primary_key] Not found primary key name for table \"{table_name}\"!")
-        # select foreign_keys
-        res = self._db_adapter.query("PRAGMA foreign_keys;")
-        if len(res) == 0:
-            raise Exception("[SQLiteMigrator][drop_primary_key] \"PRAGMA foreign_keys\" is Empty!")
-        foreign_keys = res[0]['foreign_keys']
-        # select defer_foreign_keys
-        res = self._db_adapter.query("PRAGMA defer_foreign_keys;")
-        if len(res) == 0:
-            raise Exception("[SQLiteMigrator][drop_primary_key] \"PRAGMA defer_foreign_keys\" is Empty!")
-        defer_foreign_keys = res[0]['defer_foreign_keys']
-        # set new states
-        self._db_adapter.query("PRAGMA defer_foreign_keys = ON;")
-        self._db_adapter.query("PRAGMA foreign_keys = OFF;")
-        # select indexes
-        tmp_indexes = self.table_indexes(table_name)
-        # select columns
-        tmp_columns = self.table_columns(table_name)
-        # select table information
-        res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
-        if len(res) == 0:
-            raise Exception(
-                f"[SQLiteMigrator][drop_primary_key] SQL data in sqlite_master fot table \"{table_name}\" is Empty!")
-        sql = str(res[0]['sql'])
-        pos = sql.find(f"CONSTRAINT \"{tmp_p_key_name}\" PRIMARY KEY")
-        if pos == -1:
-            raise Exception(
-                f"[SQLiteMigrator][drop_primary_key] Not found primary key section in SQL data fot table \"{table_name}\"!")
-        new_sql = ""
-        new_sql_part = ""
-        use_skip = False
-        for i in range(len(sql)):
-            tmp_char = sql[i]
-            if tmp_char == ',':
-                if not use_skip:
-                    new_sql_part = new_sql_part.strip()
-                    if len(new_sql) == 0 and len(new_sql_part) > 0:
-                        new_sql = str(new_sql_part)
-                    elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                        new_sql += f",\n{str(new_sql_part)}"
-                else:
-                    use_skip = False
-
-                new_sql_part = ""
-                continue
-
-            new_sql_part += str(tmp_char)
-            if i == pos:
-                use_skip = True
-
-        if not use_skip:
-            new_sql_part = new_sql_part.strip()
-            if len(new_sql) == 0 and len(new_sql_part) > 0:
-                new_sql = str(new_sql_part)
-            elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                new_sql += f",\n{str(new_sql_part)}"
-
-        # remove last ';'
-        new_sql = str(new_sql).strip()
-        if new_sql[len(new_sql) - 1] == ';':
-            new_sql = str(new_sql[0:(len(new_sql) - 1)]).strip()
-        # add last ')'
-        if new_sql[len(new_sql) - 1] != ')':
-            new_sql += " )"
-
-        tmp_columns_names = str(', ').join(tmp_columns)
-
-        # rename old table
-        new_t_name = f"{table_name}_old"
-        self._exec_query_or_export(f"ALTER TABLE \"{table_name}\" RENAME TO \"{new_t_name}\";")
-        # create new table
-        self._exec_query_or_export(new_sql)
-        # insert new data
-        if tmp_columns != "":
-            self._exec_query_or_export(f"INSERT INTO \"{table_name}\" SELECT {tmp_columns_names} FROM \"{new_t_name}\";")
-        # drop old table
-        self._exec_query_or_export(f"DROP TABLE \"{new_t_name}\";")
-        # append indexes
-        tmp_indexes_upd = self.table_indexes(table_name)
-        for index in tmp_indexes.values():
-            if index['index_name'] in tmp_indexes_upd:
-                continue  # skip - already added
-            self.add_index(table_name, index['columns'], {'unique': index['unique']})
-        # set old states
-        self._db_adapter.query(f"PRAGMA defer_foreign_keys = {defer_foreign_keys};")
-        self._db_adapter.query(f"PRAGMA foreign_keys = {foreign_keys};")
+        self.__drop_primary_key(table_name, tmp_p_key_name, 'drop_primary_key')
 
     def add_foreign_key(self,
                         table_name: str, columns: list,
@@ -918,6 +451,8 @@ class SQLiteMigrator(BaseMigrator):
           - [bool] on_delete - добавить флаг 'ON DELETE' (может не поддерживаться)
           - [string] action  - добавить флаг поведения 'NO ACTION / CASCADE / RESTRICT / SET DEFAULT / SET NULL' (может не поддерживаться)
           - [string] name    - задать имя вторичного ключа
+
+        NOTE: The table rebuild is deferred (see 'apply_pending_changes').
         """
 
         if table_name == "" or len(columns) == 0:
@@ -934,58 +469,8 @@ class SQLiteMigrator(BaseMigrator):
         ref_columns = list(filter(len, ref_columns))  # remove empty
         if len(ref_columns) == 0:
             raise Exception("[SQLiteMigrator][add_foreign_key] Reference columns is Empty!")
-        # select foreign_keys
-        res = self._db_adapter.query("PRAGMA foreign_keys;")
-        if len(res) == 0:
-            raise Exception("[SQLiteMigrator][add_foreign_key] \"PRAGMA foreign_keys\" is Empty!")
-        foreign_keys = res[0]['foreign_keys']
-        # select defer_foreign_keys
-        res = self._db_adapter.query("PRAGMA defer_foreign_keys;")
-        if len(res) == 0:
-            raise Exception("[SQLiteMigrator][add_foreign_key] \"PRAGMA defer_foreign_keys\" is Empty!")
-        defer_foreign_keys = res[0]['defer_foreign_keys']
-        # set new states
-        self._db_adapter.query("PRAGMA defer_foreign_keys = ON;")
-        self._db_adapter.query("PRAGMA foreign_keys = OFF;")
-        # select indexes
-        tmp_indexes = self.table_indexes(table_name)
-        # select columns
-        tmp_columns = self.table_columns(table_name)
         # select table information
-        res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
-        if len(res) == 0:
-            raise Exception(
-                f"[SQLiteMigrator][add_foreign_key] SQL data in sqlite_master fot table \"{table_name}\" is Empty!")
-        sql = str(res[0]['sql'])
-        new_sql = ""
-        new_sql_part = ""
-        for i in range(len(sql)):
-            tmp_char = sql[i]
-            if tmp_char == ',':
-                new_sql_part = new_sql_part.strip()
-                if len(new_sql) == 0 and len(new_sql_part) > 0:
-                    new_sql = str(new_sql_part)
-                elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                    new_sql += f",\n{str(new_sql_part)}"
-                new_sql_part = ""
-                continue
-
-            new_sql_part += str(tmp_char)
-
-        # add end of sql
-        new_sql_part = new_sql_part.strip()
-        if len(new_sql) == 0 and len(new_sql_part) > 0:
-            new_sql = str(new_sql_part)
-        elif len(new_sql) > 0 and len(new_sql_part) > 0:
-            new_sql += f",\n{str(new_sql_part)}"
-
-        # remove last ';'
-        new_sql = str(new_sql).strip()
-        if new_sql[len(new_sql) - 1] == ';':
-            new_sql = str(new_sql[0:(len(new_sql) - 1)]).strip()
-        # remove last ')'
-        if new_sql[len(new_sql) - 1] == ')':
-            new_sql = str(new_sql[0:(len(new_sql) - 1)]).strip()
+        table_sql = self.__table_sql(table_name, 'add_foreign_key')
         # add foreign key
         columns_names = str(", ").join(columns)
         columns_names_2 = str("_").join(columns)
@@ -1006,39 +491,17 @@ class SQLiteMigrator(BaseMigrator):
         elif add_next:
             f_sql += " NO ACTION"
 
-        if new_sql != "":
-            f_sql = f", \n{f_sql}"
-        new_sql += f_sql
-        # add last ')'
-        new_sql += " )"
+        table_sql.add_constraint(f_sql)
+        tmp_columns = self.__table_column_names(table_name, 'add_foreign_key')
+        self.__defer_rebuild(table_name, table_sql, tmp_columns, True)
 
-        tmp_columns_names = str(", ").join(tmp_columns)
-
-        # rename old table
-        new_t_name = f"{table_name}_old"
-        self._exec_query_or_export(f"ALTER TABLE \"{table_name}\" RENAME TO \"{new_t_name}\";")
-        # create new table
-        self._exec_query_or_export(new_sql)
-        # insert new data
-        if tmp_columns != "":
-            self._exec_query_or_export(f"INSERT INTO \"{table_name}\" SELECT {tmp_columns_names} FROM \"{new_t_name}\";")
-        # drop old table
-        self._exec_query_or_export(f"DROP TABLE \"{new_t_name}\";")
-        # append indexes
-        tmp_indexes_upd = self.table_indexes(table_name)
-        for index in tmp_indexes.values():
-            if index['index_name'] in tmp_indexes_upd:
-                continue  # skip - already added
-            self.add_index(table_name, index['columns'], {'unique': index['unique']})
-        # set old states
-        self._db_adapter.query(f"PRAGMA defer_foreign_keys = {defer_foreign_keys};")
-        self._db_adapter.query(f"PRAGMA foreign_keys = {foreign_keys};")
-
-    def drop_foreign_key(self, table_name: str, columns: list):
-        """Удалить вторичный ключ таблицы
+    def drop_foreign_key(self, table_name: str, columns: list):
+        """Удалить вторичный ключ таблицы
 
         :param table_name: название таблицы
         :param columns: названия колонок
+
+        NOTE: The table rebuild is deferred (see 'apply_pending_changes').
         """
 
         if table_name == "" or len(columns) == 0:
@@ -1049,25 +512,8 @@ class SQLiteMigrator(BaseMigrator):
         columns = list(filter(len, columns))  # remove empty
         if len(columns) == 0:
             raise Exception("[SQLiteMigrator][drop_foreign_key] Columns is Empty!")
-        # select foreign_keys
-        res = self._db_adapter.query("PRAGMA foreign_keys;")
-        if len(res) == 0:
-            raise Exception("[SQLiteMigrator][drop_foreign_key] \"PRAGMA foreign_keys\" is Empty!")
-        foreign_keys = res[0]['foreign_keys']
-        # select defer_foreign_keys
-        res = self._db_adapter.query("PRAGMA defer_foreign_keys;")
-        if len(res) == 0:
-            raise Exception("[SQLiteMigrator][drop_foreign_key] \"PRAGMA defer_foreign_keys\" is Empty!")
-        defer_foreign_keys = res[0]['defer_foreign_keys']
-        # set new states
-        self._db_adapter.query("PRAGMA defer_foreign_keys = ON;")
-        self._db_adapter.query("PRAGMA foreign_keys = OFF;")
-        # select indexes
-        tmp_indexes = self.table_indexes(table_name)
-        # select columns
-        tmp_columns = self.table_columns(table_name)
         # select f-keys list
-        tmp_foreign_keys_lst = self.table_foreign_keys(table_name)
+        tmp_foreign_keys_lst = self.__pending_foreign_keys(table_name)
         columns_names = str(", ").join(columns)
         tmp_name = ""
         for fk in tmp_foreign_keys_lst.values():
@@ -1078,72 +524,118 @@ class SQLiteMigrator(BaseMigrator):
             raise Exception(
                 f"[SQLiteMigrator][drop_foreign_key] Not found foreign key for columns \"{columns_names}\"!")
         # select table information
-        res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
-        if len(res) == 0:
-            raise Exception(
-                f"[SQLiteMigrator][drop_foreign_key] SQL data in sqlite_master fot table \"{table_name}\" is Empty!")
-        sql = str(res[0]['sql'])
-        pos = sql.find(f"CONSTRAINT \"{tmp_name}\" FOREIGN KEY")
-        if pos == -1:
+        table_sql = self.__table_sql(table_name, 'drop_foreign_key')
+        if not table_sql.drop_constraint(tmp_name):
             raise Exception(
                 f"[SQLiteMigrator][drop_foreign_key] Not found foreign key section in SQL data fot table \"{table_name}\"!")
-        new_sql = ""
-        new_sql_part = ""
-        use_skip = False
-        for i in range(len(sql)):
-            tmp_char = sql[i]
-            if tmp_char == ',':
-                if not use_skip:
-                    new_sql_part = new_sql_part.strip()
-                    if len(new_sql) == 0 and len(new_sql_part) > 0:
-                        new_sql = str(new_sql_part)
-                    elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                        new_sql += f",\n{str(new_sql_part)}"
-                else:
-                    use_skip = False
-
-                new_sql_part = ""
-                continue
+        tmp_columns = self.__table_column_names(table_name, 'drop_foreign_key')
+        self.__defer_rebuild(table_name, table_sql, tmp_columns, True)
 
-            new_sql_part += str(tmp_char)
-            if i == pos:
-                use_skip = True
+    def apply_pending_changes(self, table_name: str = None):
+        """Выполнить отложенные пересоздания таблиц
 
-        if not use_skip:
-            new_sql_part = new_sql_part.strip()
-            if len(new_sql) == 0 and len(new_sql_part) > 0:
-                new_sql = str(new_sql_part)
-            elif len(new_sql) > 0 and len(new_sql_part) > 0:
-                new_sql += f",\n{str(new_sql_part)}"
+        :param table_name: название таблицы (если None - для всех таблиц)
 
-        # remove last ';'
-        new_sql = str(new_sql).strip()
-        if new_sql[len(new_sql) - 1] == ';':
-            new_sql = str(new_sql[0:(len(new_sql) - 1)]).strip()
-        # add last ')'
-        new_sql += " )"
+        NOTE: SQLite has no ALTER for column and key changes, so every such change
+              rebuilds the table (rename / create / copy / drop). The rebuilds are deferred
+              and coalesced per table: several changes of one table in a migration give
+              one rebuild, applied once under a single 'PRAGMA foreign_keys' toggle.
+              Inside the migration transaction SQLite does not change 'foreign_keys', so the
+              foreign key checks are deferred till the commit ('defer_foreign_keys').
+        """
 
-        tmp_columns_names = str(', ').join(tmp_columns)
+        if self.__applying:
+            return
+        tables = list(self.__rebuilds.keys())
+        if table_name is not None:
+            tables = [table_name] if table_name in self.__rebuilds else []
+        if len(tables) == 0:
+            return
+        self.__applying = True
+        try:
+            use_foreign_keys = False
+            for name in tables:
+                if self.__rebuilds[name]['foreign_keys']:
+                    use_foreign_keys = True
+                    break
+            if not use_foreign_keys:
+                for name in tables:
+                    self.__rebuild_table(self.__rebuilds.pop(name))
+                return
+            # select foreign_keys
+            res = self._db_adapter.query("PRAGMA foreign_keys;")
+            if len(res) == 0:
+                raise Exception("[SQLiteMigrator][apply_pending_changes] \"PRAGMA foreign_keys\" is Empty!")
+            foreign_keys = res[0]['foreign_keys']
+            # select defer_foreign_keys
+            res = self._db_adapter.query("PRAGMA defer_foreign_keys;")
+            if len(res) == 0:
+                raise Exception("[SQLiteMigrator][apply_pending_changes] \"PRAGMA defer_foreign_keys\" is Empty!")
+            defer_foreign_keys = res[0]['defer_foreign_keys']
+            # set new states
+            self._db_adapter.query("PRAGMA defer_foreign_keys = ON;")
+            self._db_adapter.query("PRAGMA foreign_keys = OFF;")
+            try:
+                for name in tables:
+                    self.__rebuild_table(self.__rebuilds.pop(name))
+            finally:
+                # set old states
+                self._db_adapter.query(f"PRAGMA defer_foreign_keys = {defer_foreign_keys};")
+                self._db_adapter.query(f"PRAGMA foreign_keys = {foreign_keys};")
+        finally:
+            self.__applying = False
+
+    def begin_bulk_ddl(self, props):
+        """Включить режим массовых изменений схемы (настройки сессии на время миграции)
+
+        :param props: True (настройки по умолчанию) или словарь настроек
 
-        # rename old table
-        new_t_name = f"{table_name}_old"
-        self._exec_query_or_export(f"ALTER TABLE \"{table_name}\" RENAME TO \"{new_t_name}\";")
-        # create new table
-        self._exec_query_or_export(new_sql)
-        # insert new data
-        if tmp_columns != "":
-            self._exec_query_or_export(f"INSERT INTO \"{table_name}\" SELECT {tmp_columns_names} FROM \"{new_t_name}\";")
-        # drop old table
-        self._exec_query_or_export(f"DROP TABLE \"{new_t_name}\";")
-        # append indexes
-        tmp_indexes_upd = self.table_indexes(table_name)
-        for index in tmp_indexes.values():
-            if index['index_name'] in tmp_indexes_upd:
-                continue  # skip - already added
-            self.add_index(table_name, index['columns'], {'unique': index['unique']})
-        # set old states
-        self._db_adapter.query(f"PRAGMA defer_foreign_keys = {defer_foreign_keys};")
-        self._db_adapter.query(f"PRAGMA foreign_keys = {foreign_keys};")
+        Supported Props:
+          - [integer] cache_size  - размер кэша страниц (PRAGMA cache_size; default: -262144 (256 MB))
+          - [string]  temp_store  - хранение временных данных (PRAGMA temp_store; default: MEMORY)
+          - [integer] mmap_size   - размер отображаемой в память части файла (PRAGMA mmap_size; default: 256 MB)
+          - [string]  synchronous - режим синхронизации (PRAGMA synchronous; default: NORMAL)
+
+        NOTE: The current values are saved and restored by 'end_bulk_ddl'.
+        """
+
+        if not self._db_adapter or self._export_file:
+            return
+        settings = dict(self.__bulk_ddl_defaults)
+        if isinstance(props, dict):
+            for key, value in props.items():
+                if not key in settings:
+                    raise Exception(f"[SQLiteMigrator][begin_bulk_ddl] Unsupported bulk DDL setting \"{key}\"!")
+                if value is None:
+                    del settings[key]
+                    continue
+                settings[key] = value
+        elif props is not True:
+            raise Exception("[SQLiteMigrator][begin_bulk_ddl] Bulk DDL settings must be a bool or a dictionary!")
+        for key, value in settings.items():
+            value = str(value).strip().upper()
+            if key in self.__bulk_ddl_values:
+                if not value in self.__bulk_ddl_values[key]:
+                    raise Exception(f"[SQLiteMigrator][begin_bulk_ddl] Invalid value for bulk DDL setting \"{key}\"!")
+            elif not re.match(r'^-?[0-9]+$', value):
+                raise Exception(f"[SQLiteMigrator][begin_bulk_ddl] Invalid value for bulk DDL setting \"{key}\"!")
+            if not key in self.__bulk_ddl_restore:
+                res = self._db_adapter.query(f"PRAGMA {key};")
+                if len(res) == 0:
+                    continue
+                self.__bulk_ddl_restore[key] = list(res[0].values())[0]
+            self._db_adapter.query(f"PRAGMA {key} = {value};")
+
+    def end_bulk_ddl(self):
+        """Выключить режим массовых изменений схемы (восстановить настройки сессии)
+        """
+
+        if not self._db_adapter:
+            return
+        restore = self.__bulk_ddl_restore
+        self.__bulk_ddl_restore = {}
+        for key, value in restore.items():
+            self._db_adapter.query(f"PRAGMA {key} = {value};")
 
     def to_database_type(self, name: str, limit: int = None) -> str:
         """Преобразование типа колонки в тип базы данных
@@ -1208,7 +700,98 @@ class SQLiteMigrator(BaseMigrator):
             tmp_name = f"{table_lst[len(table_lst) - 1]}_{tmp_columns_names}_index"
         if 'name' in args:
             tmp_name = args['name']
-        self._exec_query_or_export(f"DROP INDEX \"{tmp_name}\"")
+        self._exec_query_or_export(f"DROP INDEX \"{tmp_name}\";")
+
+    def _table_indexes(self, table_name: str) -> dict:
+        """Запросить список индексов для таблицы (запрос к базе данных)
+
+        :param table_name: название таблицы
+        :rtype: dict
+        """
+
+        return self.__table_indexes(table_name)
+
+    def _table_columns(self, table_name: str) -> dict:
+        """Запросить список колонок таблицы и их типов (запрос к базе данных)
+
+        :param table_name: название таблицы
+        :rtype: dict
+        """
+
+        return self.__table_columns(table_name)
+
+    def _table_primary_keys(self, table_name: str) -> dict:
+        """Запросить список первичных ключей таблицы (запрос к базе данных)
+
+        :param table_name: название таблицы
+        :rtype: dict
+        """
+
+        return self.__table_primary_keys(table_name)
+
+    def _table_foreign_keys(self, table_name) -> dict:
+        """Запросить список вторичных ключей для таблицы (запрос к базе данных)
+
+        :param table_name: название таблицы
+        :rtype: dict
+        """
+
+        return self.__table_foreign_keys(table_name)
+
+    def _catalog_snapshot(self):
+        """Загрузить каталог всей базы данных набором запросов (формат см. в 'catalog_snapshot')
+
+        :rtype: dict|None
+
+        NOTE: The PRAGMA table-valued functions (SQLite 3.16+) select the information of all tables
+              in one query; the rows are grouped by the per-table PRAGMA statements and parsed
+              by the same methods as for one table.
+        """
+
+        if not self._db_adapter or not self.__is_server_version(3, 16):
+            return None
+        rows = {}
+        tables = []
+        for r in self._db_adapter.query("SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name;"):
+            tables.append(r['name'])
+            rows[f"SELECT sql FROM sqlite_master WHERE name = \"{r['name']}\";"] = [{'sql': r['sql']}]
+        for r in self._db_adapter.query("SELECT m.name AS table_name, p.* FROM sqlite_master AS m JOIN pragma_table_info(m.name) AS p WHERE m.type = 'table' ORDER BY m.name, p.cid;"):
+            rows.setdefault(f"PRAGMA table_info(\"{r['table_name']}\");", []).append(r)
+        for r in self._db_adapter.query("SELECT m.name AS table_name, f.* FROM sqlite_master AS m JOIN pragma_foreign_key_list(m.name) AS f WHERE m.type = 'table' ORDER BY m.name, f.id, f.seq;"):
+            rows.setdefault(f"PRAGMA foreign_key_list(\"{r['table_name']}\");", []).append(r)
+        sql = """
+        SELECT m.name AS table_name, l.name AS index_name, l."unique" AS is_unique, i.name AS column_name
+        FROM sqlite_master AS m
+        JOIN pragma_index_list(m.name) AS l
+        JOIN pragma_index_info(l.name) AS i
+        WHERE m.type = 'table'
+        ORDER BY m.name, l.seq, i.seqno;
+        """
+        for r in self._db_adapter.query(sql):
+            i_rows = rows.setdefault(f"PRAGMA index_info(\"{r['index_name']}\");", [])
+            if len(i_rows) == 0:
+                rows.setdefault(f"PRAGMA INDEX_LIST(\"{r['table_name']}\");", []).append({'name': r['index_name'], 'unique': r['is_unique']})
+            i_rows.append({'name': r['column_name']})
+        query = lambda tmp_sql: rows.get(tmp_sql, [])
+        snapshot = {'tables': tables, 'columns': {}, 'primary_keys': {}, 'foreign_keys': {}, 'indexes': {}}
+        for table_name in tables:
+            snapshot['columns'][table_name] = self.__table_columns(table_name, query)
+            snapshot['primary_keys'][table_name] = self.__table_primary_keys(table_name, query)
+            snapshot['foreign_keys'][table_name] = self.__table_foreign_keys(table_name, query)
+            snapshot['indexes'][table_name] = self.__table_indexes(table_name, query)
+        return snapshot
+
+    def _exec_query_or_export(self, sql: str):
+        """Выполнить в БД или сохранить SQL миграцию в файл
+
+        :param sql: SQL данные
+
+        NOTE: Pending table rebuilds are applied before any other statement to keep the order of changes.
+        """
+
+        if not self.__applying:
+            self.apply_pending_changes()
+        super()._exec_query_or_export(sql)
 
     def __prepare_default(self, default):
         """Получить значение секции default без кавычек
@@ -1233,3 +816,500 @@ class SQLiteMigrator(BaseMigrator):
             else:
                 default = ""
         return default
+
+    def __is_server_version(self, major: int, minor: int) -> bool:
+        """Проверить, что версия SQLite не ниже заданной
+
+        :param major: старший номер версии
+        :param minor: младший номер версии
+        :rtype: bool
+        """
+
+        if self.__server_version is None:
+            self.__server_version = ()
+            try:
+                self.__server_version = tuple(int(v) for v in self._db_adapter.server_version().split('.'))
+            except ValueError:
+                pass
+        return self.__server_version >= (major, minor)
+
+    def __is_native_drop_column(self, table_name: str, column_name: str) -> bool:
+        """Можно ли удалить колонку без пересоздания таблицы ('ALTER TABLE ... DROP COLUMN')
+
+        :param table_name: название таблицы
+        :param column_name: название колонки
+        :rtype: bool
+
+        NOTE: SQLite refuses to drop a column that is indexed (including index expressions and
+              partial index 'WHERE'), a part of a primary key, a foreign key or a UNIQUE / CHECK constraint,
+              or that is used by a generated column, a view or a trigger.
+        """
+
+        if table_name in self.__rebuilds:
+            return False  # the table is rebuilt anyway
+        if self._export_file:
+            return False  # the export reads the table from the database, where the column is not dropped
+        if not self.__is_server_version(3, 35):
+            return False
+        for index in self.__table_indexes(table_name).values():
+            if column_name in index['columns']:
+                return False
+        is_found = False
+        for r in self._db_adapter.query(f"PRAGMA table_xinfo(\"{table_name}\");"):
+            if r['name'] == column_name:
+                if bool(r['pk']) or r['hidden'] != 0:
+                    return False
+                is_found = True
+        if not is_found:
+            return False
+        for r in self._db_adapter.query(f"PRAGMA foreign_key_list(\"{table_name}\");"):
+            if r['from'] == column_name:
+                return False
+        table_sql = self.__table_sql(table_name, 'drop_column')
+        if re.search(r'\bCHECK\b', table_sql.render(), re.IGNORECASE):
+            return False
+        # generated columns and column constraints of other columns
+        for name in table_sql.columns():
+            tmp_sql = re.sub(r'^\s*("(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\]|\S+)', '', table_sql.column(name))
+            if name != column_name and self.__is_column_used(tmp_sql, column_name):
+                return False
+        # index expressions and partial indexes ('WHERE'), views and triggers
+        tmp_name = table_name.replace("'", "''")
+        res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE (type = 'index' AND tbl_name = '{tmp_name}' AND sql IS NOT NULL) "
+                                     f"OR type IN ('view', 'trigger');", True)
+        for r in res:
+            if self.__is_column_used(str(r[0]), column_name):
+                return False
+        return True
+
+    @staticmethod
+    def __is_column_used(sql: str, column_name: str) -> bool:
+        """Используется ли имя колонки в SQL (имя без кавычек или в кавычках "", ``, [], без учета регистра)
+
+        :param sql: SQL
+        :param column_name: название колонки
+        :rtype: bool
+
+        NOTE: The check is conservative: a word in a string literal is also found.
+        """
+
+        name = re.escape(column_name)
+        rx = r'(?<![\w$])(?:"' + name + r'"|`' + name + r'`|\[' + name + r'\]|' + name + r')(?![\w$])'
+        return re.search(rx, sql, re.IGNORECASE) is not None
+
+    def __table_sql(self, table_name: str, method: str) -> SQLiteTableSql:
+        """Получить модель SQL создания таблицы (с учетом отложенных изменений)
+
+        :param table_name: название таблицы
+        :param method: название вызывающего метода (для сообщений об ошибках)
+        :rtype: SQLiteTableSql
+        """
+
+        if table_name in self.__rebuilds:
+            return self.__rebuilds[table_name]['model'].copy()
+        res = self._db_adapter.query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
+        if len(res) == 0:
+            raise Exception(
+                f"[SQLiteMigrator][{method}] SQL data in sqlite_master fot table \"{table_name}\" is Empty!")
+        return SQLiteTableSql.parse(str(res[0]['sql']))
+
+    def __table_model(self, table_name: str, column_name: str, method: str) -> SQLiteTableSql:
+        """Получить модель SQL создания таблицы (с учетом отложенных изменений) и проверить наличие колонки
+
+        :param table_name: название таблицы
+        :param column_name: название колонки
+        :param method: название вызывающего метода (для сообщений об ошибках)
+        :rtype: SQLiteTableSql
+        """
+
+        table_sql = self.__table_sql(table_name, method)
+        if not table_sql.has_column(column_name):
+            raise Exception(
+                f"[SQLiteMigrator][{method}] Column \"{column_name}\" not found in table \"{table_name}\"!")
+        return table_sql
+
+    def __table_column_names(self, table_name: str, method: str) -> list:
+        """Получить список имен колонок таблицы (с учетом отложенных изменений)
+
+        :param table_name: название таблицы
+        :param method: название вызывающего метода (для сообщений об ошибках)
+        :rtype: list
+        """
+
+        if table_name in self.__rebuilds:
+            return list(self.__rebuilds[table_name]['columns'])
+        res = self._db_adapter.query(f"PRAGMA table_info(\"{table_name}\");")
+        if len(res) == 0:
+            raise Exception(f"[SQLiteMigrator][{method}] SQLite table_info(\"{table_name}\") return empty result!")
+        return [r['name'] for r in res]
+
+    def __table_column_info(self, table_name: str, column_name: str, method: str) -> dict:
+        """Получить информацию о колонке таблицы (с учетом отложенных изменений)
+
+        :param table_name: название таблицы
+        :param column_name: название колонки
+        :param method: название вызывающего метода (для сообщений об ошибках)
+        :rtype: dict
+
+        NOTE: The info of a column not changed by the pending rebuild is taken from the old table.
+        """
+
+        rebuild = self.__rebuilds.get(table_name, None)
+        if rebuild and not column_name in rebuild['changed_columns']:
+            res = rebuild['table_info']
+        else:
+            res = self.__table_query(table_name, f"PRAGMA table_info(\"{table_name}\");")
+        for r in res:
+            if r['name'] != column_name:
+                continue
+            return {
+                'type': r['type'],
+                'is_not_null': bool(r['notnull']),
+                'default': r['dflt_value']
+            }
+        raise Exception(
+            f"[SQLiteMigrator][{method}] Column \"{column_name}\" not found in table columns list!")
+
+    def __pending_primary_keys(self, table_name: str) -> dict:
+        """Запросить список первичных ключей таблицы (с учетом отложенных изменений)
+
+        :param table_name: название таблицы
+        :rtype: dict
+        """
+
+        return self.__table_primary_keys(table_name, lambda sql: self.__table_query(table_name, sql))
+
+    def __pending_foreign_keys(self, table_name: str) -> dict:
+        """Запросить список вторичных ключей таблицы (с учетом отложенных изменений)
+
+        :param table_name: название таблицы
+        :rtype: dict
+        """
+
+        return self.__table_foreign_keys(table_name, lambda sql: self.__table_query(table_name, sql))
+
+    def __table_query(self, table_name: str, sql: str) -> list:
+        """Выполнить запрос информации о таблице (с учетом отложенных изменений)
+
+        :param table_name: название таблицы
+        :param sql: SQL запрос
+        :rtype: list
+
+        NOTE: For a table with a pending rebuild the query is executed in a scratch
+              in-memory database with the pending table SQL (the real table is not changed yet).
+        """
+
+        if not table_name in self.__rebuilds:
+            return self._db_adapter.query(sql)
+        return self.__scratch_query(self.__rebuilds[table_name]['sql'], sql)
+
+    def __scratch_query(self, create_sql: str, sql: str) -> list:
+        """Выполнить запрос в пустой базе данных в памяти с одной таблицей
+
+        :param create_sql: SQL создания таблицы
+        :param sql: SQL запрос
+        :rtype: list
+        """
+
+        connection = sqlite3.connect(':memory:')
+        connection.row_factory = sqlite3.Row
+        try:
+            connection.execute(create_sql)
+            return [dict(r) for r in connection.execute(sql).fetchall()]
+        finally:
+            connection.close()
+
+    def __drop_primary_key(self, table_name: str, p_key_name: str, method: str):
+        """Удалить секцию первичного ключа из SQL создания таблицы (пересоздание таблицы откладывается)
+
+        :param table_name: название таблицы
+        :param p_key_name: название первичного ключа
+        :param method: название вызывающего метода (для сообщений об ошибках)
+        """
+
+        # select table information
+        table_sql = self.__table_sql(table_name, method)
+        if not table_sql.drop_constraint(p_key_name):
+            raise Exception(
+                f"[SQLiteMigrator][{method}] Not found primary key section in SQL data fot table \"{table_name}\"!")
+        tmp_columns = self.__table_column_names(table_name, method)
+        self.__defer_rebuild(table_name, table_sql, tmp_columns, True)
+
+    def __defer_rebuild(self, table_name: str, table_sql: SQLiteTableSql, columns: list,
+                        foreign_keys: bool = False, changed_column: str = ""):
+        """Отложить пересоздание таблицы
+
+        :param table_name: название таблицы
+        :param table_sql: модель нового SQL создания таблицы
+        :param columns: список колонок, копируемых из старой таблицы
+        :param foreign_keys: требуется ли отключение 'PRAGMA foreign_keys'
+        :param changed_column: название измененной колонки
+        """
+
+        rebuild = self.__rebuilds.get(table_name, None)
+        if not rebuild:
+            rebuild = {
+                'table': table_name,
+                'indexes': self.__table_indexes(table_name),
+                'table_info': self._db_adapter.query(f"PRAGMA table_info(\"{table_name}\");"),
+                'changed_columns': set(),
+                'foreign_keys': False
+            }
+            self.__rebuilds[table_name] = rebuild
+        if changed_column != "":
+            rebuild['changed_columns'].add(changed_column)
+        rebuild['model'] = table_sql
+        rebuild['sql'] = table_sql.render()
+        rebuild['columns'] = list(columns)
+        rebuild['foreign_keys'] = rebuild['foreign_keys'] or foreign_keys
+
+    def __rebuild_table(self, rebuild: dict):
+        """Пересоздать таблицу
+
+        :param rebuild: отложенное пересоздание таблицы
+        """
+
+        table_name = rebuild['table']
+        tmp_columns_names = str(', ').join(rebuild['columns'])
+        tmp_columns_upd = [r['name'] for r in self.__scratch_query(rebuild['sql'], f"PRAGMA table_info(\"{table_name}\");")]
+        # rename old table
+        new_t_name = f"{table_name}_old"
+        self._exec_query_or_export(f"ALTER TABLE \"{table_name}\" RENAME TO \"{new_t_name}\";")
+        # create new table
+        self._exec_query_or_export(f"{rebuild['sql']};")
+        # insert new data
+        if tmp_columns_names != "":
+            chunk_size = self.__copy_chunk_size()
+            if chunk_size > 0 and not self._export_file and not rebuild['model'].is_without_rowid():
+                self.__copy_table_chunked(table_name, new_t_name, tmp_columns_names, chunk_size)
+            else:
+                self._exec_query_or_export(f"INSERT INTO \"{table_name}\" SELECT {tmp_columns_names} FROM \"{new_t_name}\";")
+        # drop old table
+        self._exec_query_or_export(f"DROP TABLE \"{new_t_name}\";")
+        # append indexes
+        tmp_indexes_upd = {}
+        if not self._export_file:
+            tmp_indexes_upd = self.__table_indexes(table_name)
+        for index in rebuild['indexes'].values():
+            if index['index_name'] in tmp_indexes_upd or index['index_name'].startswith('sqlite_autoindex_'):
+                continue  # skip - already added
+            if not set(index['columns']).issubset(tmp_columns_upd):
+                continue  # skip - column dropped
+            self.add_index(table_name, index['columns'], {'name': index['index_name'], 'unique': index['unique']})
+
+    def __copy_chunk_size(self) -> int:
+        """Размер блока копирования строк при пересоздании таблицы (ключ 'rebuild_chunk_size'; 0 - одним запросом)
+
+        :rtype: int
+        """
+
+        try:
+            chunk_size = int(self._db_adapter.settings_value('rebuild_chunk_size', 0))
+        except (TypeError, ValueError):
+            raise Exception("[SQLiteMigrator][apply_pending_changes] Invalid value of 'rebuild_chunk_size'!")
+        return max(chunk_size, 0)
+
+    def __copy_table_chunked(self, table_name: str, old_table_name: str, columns_names: str, chunk_size: int):
+        """Скопировать строки старой таблицы в новую блоками (постранично по rowid)
+
+        :param table_name: название новой таблицы
+        :param old_table_name: название старой таблицы
+        :param columns_names: список колонок (через запятую)
+        :param chunk_size: размер блока (количество строк)
+
+        NOTE: The chunks are selected by keyset pagination ('rowid > last rowid ORDER BY rowid LIMIT n'),
+              so the cost depends on the number of rows, not on the range of the rowid values.
+              The progress (rows, rows/sec, ETA) is shown about once a second;
+              after the copy the row counts of both tables are compared.
+              The copy is a part of the migration transaction (the SQLite adapter opens it by an explicit
+              'BEGIN', so the rename / create / drop of the rebuild are rolled back too): a failed rebuild
+              leaves the original table, the copy is not resumable and the write lock is held until the commit.
+        """
+
+        res = self._db_adapter.query(f"SELECT COUNT(*) FROM \"{old_table_name}\";", True)
+        count = int(res[0][0]) if len(res) > 0 else 0
+        if count == 0:
+            return
+        time_start = time.monotonic()
+        time_show = time_start
+        copied = 0
+        last_id = None
+        while True:
+            # the last rowid of the next chunk
+            where = "" if last_id is None else f" WHERE rowid > {last_id}"
+            res = self._db_adapter.query(f"SELECT MAX(rowid) FROM (SELECT rowid FROM \"{old_table_name}\"{where} ORDER BY rowid LIMIT {chunk_size});", True)
+            if len(res) == 0 or res[0][0] is None:
+                break
+            chunk_end = int(res[0][0])
+            where = f" WHERE rowid <= {chunk_end}" if last_id is None else f" WHERE rowid > {last_id} AND rowid <= {chunk_end}"
+            self._db_adapter.query(f"INSERT INTO \"{table_name}\" SELECT {columns_names} FROM \"{old_table_name}\"{where} ORDER BY rowid;")
+            copied = min(count, copied + int(self._db_adapter.query("SELECT changes();", True)[0][0]))
+            last_id = chunk_end
+            time_now = time.monotonic()
+            if time_now - time_show < 1.0 and copied < count:
+                continue
+            time_show = time_now
+            speed = copied / max(time_now - time_start, 0.001)
+            eta = int((count - copied) / speed) if speed > 0 else 0
+            print(f"[SQLiteMigrator] Copy table \"{table_name}\": {copied}/{count} rows ({int(copied * 100 / count)}%), "
+                  f"{int(speed)} rows/sec, ETA {eta // 3600:02d}:{eta % 3600 // 60:02d}:{eta % 60:02d}")
+        res = self._db_adapter.query(f"SELECT COUNT(*) FROM \"{table_name}\";", True)
+        new_count = int(res[0][0]) if len(res) > 0 else 0
+        if new_count != count:
+            raise Exception(
+                f"[SQLiteMigrator][apply_pending_changes] Row count check failed for table \"{table_name}\" (old: {count}, new: {new_count})!")
+
+    def __table_indexes(self, table_name: str, query=None) -> dict:
+        """Запросить список индексов для таблицы (без применения отложенных изменений)
+
+        :param table_name: название таблицы
+        :param query: функция выполнения запроса (если None - запрос к базе данных)
+        :rtype: dict
+        """
+
+        if not self._db_adapter:
+            return {}
+        if not query:
+            query = self._db_adapter.query
+        # select table information
+        res = query(f"PRAGMA INDEX_LIST(\"{table_name}\");")
+        if len(res) == 0:
+            return {}
+        tmp_indexes = {}
+        for r in res:
+            i_name = r['name']
+            i_res = query(f"PRAGMA index_info(\"{i_name}\");")
+            if len(i_res) == 0:
+                continue
+            i_columns = []
+            for info in i_res:
+                i_columns.append(info['name'])
+
+            tmp_indexes[i_name] = {
+                'index_name': i_name,
+                'unique': bool(r['unique']),  # TODO check is correct bool!
+                'table': table_name,
+                'columns': i_columns
+            }
+        return tmp_indexes
+
+    def __table_columns(self, table_name: str, query=None) -> dict:
+        """Запросить список колонок таблицы и их типов (без применения отложенных изменений)
+
+        :param table_name: название таблицы
+        :param query: функция выполнения запроса (если None - запрос к базе данных)
+        :rtype: dict
+        """
+
+        if not self._db_adapter:
+            return {}
+        if not query:
+            query = self._db_adapter.query
+        # select table information
+        res = query(f"PRAGMA table_info(\"{table_name}\");")
+        if len(res) == 0:
+            return {}
+        tmp_columns = {}
+        for r in res:
+            tmp_columns[r['name']] = {
+                'table': table_name,
+                'column': r['name'],
+                'type': r['type'],
+                'is_pk': bool(r['pk']),
+                'is_not_null': bool(r['notnull']),
+                'default': r['dflt_value']
+            }
+        return tmp_columns
+
+    def __table_primary_keys(self, table_name: str, query=None) -> dict:
+        """Запросить список первичных ключей таблицы (без применения отложенных изменений)
+
+        :param table_name: название таблицы
+        :param query: функция выполнения запроса (если None - запрос к базе данных)
+        :rtype: dict
+        """
+
+        if not self._db_adapter:
+            return {}
+        if not query:
+            query = self._db_adapter.query
+        # select table sql
+        res = query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
+        if len(res) == 0:
+            return {}
+        t_sql = res[0]['sql']
+        # select table information
+        res = query(f"PRAGMA table_info(\"{table_name}\");")
+        if len(res) == 0:
+            return {}
+        tmp_columns = {}
+        for r in res:
+            if not bool(r['pk']):
+                continue
+            tmp_name = ""
+            column_name = r['name']
+            reg = r'\bCONSTRAINT \"?([A-Za-z0-9_]+\_pkey)\"? PRIMARY KEY \(' + column_name + r'\)'
+            result = re.search(reg, t_sql)
+            if result:
+                tmp_name = result.group(1).strip()
+            if tmp_name == "":
+                tmp_name = f"{table_name}_pkey"
+
+            tmp_columns[tmp_name] = {
+                'name': tmp_name,
+                'table': table_name,
+                'column': column_name,
+                'type': r['type']
+            }
+        return tmp_columns
+
+    def __table_foreign_keys(self, table_name, query=None) -> dict:
+        """Запросить список вторичных ключей для таблицы (без применения отложенных изменений)
+
+        :param table_name: название таблицы
+        :param query: функция выполнения запроса (если None - запрос к базе данных)
+        :rtype: dict
+        """
+
+        if not self._db_adapter:
+            return {}
+        if not query:
+            query = self._db_adapter.query
+        # select table sql
+        res = query(f"SELECT sql FROM sqlite_master WHERE name = \"{table_name}\";")
+        if len(res) == 0:
+            return {}
+        t_sql = res[0]['sql']
+        # select table information
+        res = query(f"PRAGMA foreign_key_list(\"{table_name}\");")
+        if len(res) == 0:
+            return {}
+        tmp_list = {}
+        for r in res:
+            tmp_columns_list = str(r['from']).split(',')
+            tmp_columns = []
+            for i in tmp_columns_list:
+                tmp_columns.append(i.strip())
+
+            tmp_name = ""
+            columns_names = r['from']
+            ref_table_name = r['table']
+            ref_columns_names = r['to']
+            reg = r'\bCONSTRAINT \"?([A-Za-z0-9_]+)\"? FOREIGN KEY \(' + columns_names + r'\) REFERENCES \"' + ref_table_name + r'\"\(' + ref_columns_names + r'\)'
+            result = re.search(reg, t_sql)
+            if result:
+                tmp_name = result.group(1).strip()
+            if tmp_name == "":
+                tmp_columns_names = str("_").join(tmp_columns)
+                tmp_name = f"fk_{table_name}_{tmp_columns_names}"
+
+            tmp_list[tmp_name] = {
+                'name': tmp_name,
+                'table': table_name,
+                'column': columns_names,
+                'ref_table': ref_table_name,
+                'ref_column': ref_columns_names,
+                'on_update': r['on_update'],
+                'on_delete': r['on_delete']
+            }
+        return tmp_list
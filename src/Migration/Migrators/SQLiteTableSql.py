@@ -0,0 +1,444 @@
+import re
+
+
+class SQLiteTableSql:
+    """Модель SQL создания таблицы SQLite (sqlite_master.sql): колонки и ограничения
+
+    The CREATE TABLE statement is split by a tokenizer into the head ('CREATE TABLE "name" ('),
+    the list of table items (column definitions and table constraints) and the tail
+    (e.g. 'WITHOUT ROWID'). Quoted identifiers, string literals, comments and nested brackets
+    are skipped, so commas inside DEFAULT / CHECK expressions do not split the items.
+
+    Parsed statements are cached by SQL text; 'parse' returns a new model for every call,
+    so the model may be changed and rendered back with 'render'.
+    """
+
+    __constraint_keywords = ('CONSTRAINT', 'PRIMARY', 'UNIQUE', 'CHECK', 'FOREIGN')
+    __column_constraint_keywords = ('CONSTRAINT', 'PRIMARY', 'NOT', 'NULL', 'UNIQUE', 'CHECK', 'DEFAULT',
+                                    'COLLATE', 'REFERENCES', 'GENERATED', 'AS')
+    __identifier_quotes = {'"': '"', '`': '`', '[': ']'}
+    __word_rx = re.compile(r'[A-Za-z0-9_$\u0080-\uffff]+')
+    __token_rx = re.compile(r'"(?:[^"]|"")*"|\'(?:[^\']|\'\')*\'|`(?:[^`]|``)*`|\[[^\]]*\]|--[^\n]*|/\*.*?(?:\*/|$)|[(),]', re.DOTALL)
+    __cache = {}
+    __cache_size = 64
+    __head = ""
+    __items = []
+    __tail = ""
+
+    def __init__(self, head: str, items: list, tail: str = ""):
+        self.__head = head
+        self.__items = list(items)
+        self.__tail = tail
+
+    @staticmethod
+    def parse(sql: str) -> 'SQLiteTableSql':
+        """Разобрать SQL создания таблицы
+
+        :param sql: SQL создания таблицы
+        :type sql: str
+        :rtype: SQLiteTableSql
+        :raise: Exception
+        """
+
+        parsed = SQLiteTableSql.__cache.get(sql, None)
+        if not parsed:
+            parsed = SQLiteTableSql.__parse(sql)
+            if len(SQLiteTableSql.__cache) >= SQLiteTableSql.__cache_size:
+                SQLiteTableSql.__cache.clear()
+            SQLiteTableSql.__cache[sql] = parsed
+        head, items, tail = parsed
+        return SQLiteTableSql(head, items, tail)
+
+    def copy(self) -> 'SQLiteTableSql':
+        """Получить копию модели
+
+        :rtype: SQLiteTableSql
+        """
+
+        return SQLiteTableSql(self.__head, self.__items, self.__tail)
+
+    def render(self) -> str:
+        """Собрать SQL создания таблицы
+
+        :rtype: str
+        """
+
+        items = []
+        for item in self.__items:
+            items.append(item['sql'])
+        return f"{self.__head}\n" + ",\n".join(items) + f"\n){self.__tail}"
+
+    def is_without_rowid(self) -> bool:
+        """Создается ли таблица без rowid ('WITHOUT ROWID')
+
+        :rtype: bool
+        """
+
+        return re.search(r'\bWITHOUT\s+ROWID\b', self.__tail, re.IGNORECASE) is not None
+
+    def columns(self) -> list:
+        """Список имен колонок
+
+        :rtype: list
+        """
+
+        names = []
+        for item in self.__items:
+            if item['kind'] == 'column':
+                names.append(item['name'])
+        return names
+
+    def has_column(self, name: str) -> bool:
+        """Есть ли колонка в таблице
+
+        :param name: название колонки
+        :rtype: bool
+        """
+
+        return self.__find('column', name) != -1
+
+    def column(self, name: str) -> str:
+        """SQL описания колонки (или пустая строка, если колонка не найдена)
+
+        :param name: название колонки
+        :rtype: str
+        """
+
+        pos = self.__find('column', name)
+        if pos == -1:
+            return ""
+        return self.__items[pos]['sql']
+
+    def set_column(self, name: str, sql: str) -> bool:
+        """Заменить описание колонки
+
+        :param name: название колонки
+        :param sql: новый SQL описания колонки
+        :return: найдена ли колонка
+        :rtype: bool
+        """
+
+        pos = self.__find('column', name)
+        if pos == -1:
+            return False
+        self.__items[pos] = self.__make_item(sql.strip())
+        return True
+
+    def drop_column(self, name: str) -> bool:
+        """Удалить описание колонки
+
+        :param name: название колонки
+        :return: найдена ли колонка
+        :rtype: bool
+        """
+
+        pos = self.__find('column', name)
+        if pos == -1:
+            return False
+        del self.__items[pos]
+        return True
+
+    def rename_column(self, name: str, new_name: str) -> bool:
+        """Переименовать колонку (в описании колонки, в ограничениях колонок и таблицы)
+
+        :param name: название колонки
+        :param new_name: новое название колонки
+        :return: найдена ли колонка
+        :rtype: bool
+
+        NOTE: Column names after 'REFERENCES' belong to the referenced table and are not renamed.
+        NOTE: The type names of the columns are kept (e.g. 'date DATE'): the constraints of a column
+              are rewritten from its first constraint keyword (see __column_constraints_pos).
+        """
+
+        pos = self.__find('column', name)
+        if pos == -1:
+            return False
+        item = self.__items[pos]
+        begin = SQLiteTableSql.__skip_space(item['sql'], 0)
+        tmp_name, end = SQLiteTableSql.__read_identifier(item['sql'], begin)
+        self.__items[pos] = self.__make_item(f"{item['sql'][0:begin]}\"{new_name}\"{item['sql'][end:]}")
+        for i in range(len(self.__items)):
+            item = self.__items[i]
+            start = 0
+            if item['kind'] == 'column':
+                start = SQLiteTableSql.__column_constraints_pos(item['sql'])
+            tmp_sql = SQLiteTableSql.__replace_identifier(item['sql'][start:], name, new_name)
+            self.__items[i] = self.__make_item(f"{item['sql'][0:start]}{tmp_sql}")
+        return True
+
+    def has_constraint(self, name: str) -> bool:
+        """Есть ли именованное ограничение таблицы ('CONSTRAINT "name" ...')
+
+        :param name: название ограничения
+        :rtype: bool
+        """
+
+        return self.__find('constraint', name) != -1
+
+    def constraint(self, name: str) -> str:
+        """SQL именованного ограничения таблицы (или пустая строка, если ограничение не найдено)
+
+        :param name: название ограничения
+        :rtype: str
+        """
+
+        pos = self.__find('constraint', name)
+        if pos == -1:
+            return ""
+        return self.__items[pos]['sql']
+
+    def constraints(self) -> list:
+        """Список SQL ограничений таблицы
+
+        :rtype: list
+        """
+
+        lst = []
+        for item in self.__items:
+            if item['kind'] == 'constraint':
+                lst.append(item['sql'])
+        return lst
+
+    def add_constraint(self, sql: str):
+        """Добавить ограничение таблицы
+
+        :param sql: SQL ограничения
+        """
+
+        self.__items.append(self.__make_item(sql.strip()))
+
+    def drop_constraint(self, name: str) -> bool:
+        """Удалить именованное ограничение таблицы
+
+        :param name: название ограничения
+        :return: найдено ли ограничение
+        :rtype: bool
+        """
+
+        pos = self.__find('constraint', name)
+        if pos == -1:
+            return False
+        del self.__items[pos]
+        return True
+
+    def __find(self, kind: str, name: str) -> int:
+        """Найти позицию элемента таблицы по типу и имени
+
+        :param kind: тип элемента (column / constraint)
+        :param name: имя элемента
+        :rtype: int
+        """
+
+        name = name.lower()
+        for i in range(len(self.__items)):
+            item = self.__items[i]
+            if item['kind'] == kind and item['name'].lower() == name:
+                return i
+        return -1
+
+    @staticmethod
+    def __parse(sql: str) -> tuple:
+        """Разобрать SQL создания таблицы на заголовок, элементы таблицы и окончание
+
+        :param sql: SQL создания таблицы
+        :rtype: tuple
+        """
+
+        sql = str(sql).strip()
+        if sql.endswith(';'):
+            sql = sql[0:len(sql) - 1].rstrip()
+        items = []
+        depth = 0
+        start = -1
+        head = ""
+        tail = ""
+        for result in SQLiteTableSql.__token_rx.finditer(sql):
+            tmp_char = result.group(0)
+            if tmp_char == '(':
+                depth += 1
+                if depth == 1:
+                    head = sql[0:result.start() + 1].rstrip()
+                    start = result.end()
+            elif tmp_char == ')':
+                depth -= 1
+                if depth == 0:
+                    items.append(sql[start:result.start()])
+                    tail = sql[result.end():]
+                    break
+            elif tmp_char == ',' and depth == 1:
+                items.append(sql[start:result.start()])
+                start = result.end()
+        if head == "" or depth != 0:
+            raise Exception("[SQLiteTableSql][parse] Invalid CREATE TABLE SQL!")
+        tmp_items = []
+        for item in items:
+            item = item.strip()
+            if item != "":
+                tmp_items.append(SQLiteTableSql.__make_item(item))
+        return head, tuple(tmp_items), tail
+
+    @staticmethod
+    def __make_item(sql: str) -> dict:
+        """Создать элемент таблицы (колонку или ограничение) по его SQL
+
+        :param sql: SQL элемента
+        :rtype: dict
+        """
+
+        pos = SQLiteTableSql.__skip_space(sql, 0)
+        name, end = SQLiteTableSql.__read_identifier(sql, pos)
+        if sql[pos:pos + 1] in SQLiteTableSql.__identifier_quotes or not name.upper() in SQLiteTableSql.__constraint_keywords:
+            return {'kind': 'column', 'name': name, 'sql': sql}
+        c_name = ""
+        if name.upper() == 'CONSTRAINT':
+            c_name, end = SQLiteTableSql.__read_identifier(sql, end)
+        return {'kind': 'constraint', 'name': c_name, 'sql': sql}
+
+    @staticmethod
+    def __read_identifier(sql: str, pos: int) -> tuple:
+        """Прочитать идентификатор (в кавычках или без) начиная с позиции
+
+        :param sql: SQL
+        :param pos: позиция
+        :return: (идентификатор, позиция после идентификатора)
+        :rtype: tuple
+        """
+
+        length = len(sql)
+        pos = SQLiteTableSql.__skip_space(sql, pos)
+        if pos >= length:
+            return "", pos
+        tmp_char = sql[pos]
+        if tmp_char in SQLiteTableSql.__identifier_quotes or tmp_char == "'":
+            end = SQLiteTableSql.__skip_quoted(sql, pos)
+            value = sql[pos + 1:end - 1]
+            if tmp_char != '[':
+                value = value.replace(tmp_char * 2, tmp_char)
+            return value, end
+        result = SQLiteTableSql.__word_rx.match(sql, pos)
+        if not result:
+            return "", pos
+        return result.group(0), result.end()
+
+    @staticmethod
+    def __skip_space(sql: str, pos: int) -> int:
+        """Пропустить пробелы и комментарии
+
+        :param sql: SQL
+        :param pos: позиция
+        :return: позиция первого значимого символа
+        :rtype: int
+        """
+
+        length = len(sql)
+        while pos < length:
+            if sql[pos].isspace():
+                pos += 1
+            elif sql.startswith('--', pos):
+                end = sql.find('\n', pos)
+                pos = length if end == -1 else end
+            elif sql.startswith('/*', pos):
+                end = sql.find('*/', pos + 2)
+                pos = length if end == -1 else end + 2
+            else:
+                break
+        return pos
+
+    @staticmethod
+    def __skip_quoted(sql: str, pos: int) -> int:
+        """Пропустить строку или идентификатор в кавычках
+
+        :param sql: SQL
+        :param pos: позиция открывающей кавычки
+        :return: позиция после закрывающей кавычки
+        :rtype: int
+        """
+
+        quote = sql[pos]
+        close = SQLiteTableSql.__identifier_quotes.get(quote, quote)
+        i = pos + 1
+        while True:
+            end = sql.find(close, i)
+            if end == -1:
+                return len(sql)
+            if close != ']' and sql.startswith(close * 2, end):
+                i = end + 2
+                continue
+            return end + 1
+
+    @staticmethod
+    def __column_constraints_pos(sql: str) -> int:
+        """Найти начало ограничений в SQL описания колонки (после имени и типа колонки)
+
+        :param sql: SQL описания колонки
+        :return: позиция первого ключевого слова ограничения (длина SQL, если ограничений нет)
+        :rtype: int
+        """
+
+        pos = SQLiteTableSql.__skip_space(sql, 0)
+        tmp_name, i = SQLiteTableSql.__read_identifier(sql, pos)
+        length = len(sql)
+        while i < length:
+            tmp_char = sql[i]
+            if tmp_char in SQLiteTableSql.__identifier_quotes or tmp_char == "'":
+                i = SQLiteTableSql.__skip_quoted(sql, i)
+                continue
+            if tmp_char == '(':
+                # type size (e.g. 'DECIMAL(10, 2)')
+                end = sql.find(')', i)
+                i = length if end == -1 else end + 1
+                continue
+            word = SQLiteTableSql.__word_rx.match(sql, i)
+            if word:
+                if word.group(0).upper() in SQLiteTableSql.__column_constraint_keywords:
+                    return i
+                i = word.end()
+                continue
+            i += 1
+        return length
+
+    @staticmethod
+    def __replace_identifier(sql: str, name: str, new_name: str) -> str:
+        """Заменить идентификатор в SQL ограничения (до секции 'REFERENCES')
+
+        :param sql: SQL ограничения
+        :param name: идентификатор
+        :param new_name: новый идентификатор
+        :rtype: str
+        """
+
+        parts = []
+        name = name.lower()
+        start = 0
+        i = 0
+        length = len(sql)
+        while i < length:
+            tmp_char = sql[i]
+            if tmp_char in SQLiteTableSql.__identifier_quotes:
+                value, end = SQLiteTableSql.__read_identifier(sql, i)
+                if value.lower() == name:
+                    parts.append(sql[start:i])
+                    parts.append(f"\"{new_name}\"")
+                    start = end
+                i = end
+                continue
+            if tmp_char == "'":
+                i = SQLiteTableSql.__skip_quoted(sql, i)
+                continue
+            word = SQLiteTableSql.__word_rx.match(sql, i)
+            if word:
+                value = word.group(0)
+                if value.upper() == 'REFERENCES':
+                    break
+                # function names (e.g. 'date(...)') are not identifiers
+                next_pos = SQLiteTableSql.__skip_space(sql, word.end())
+                if value.lower() == name and sql[next_pos:next_pos + 1] != '(':
+                    parts.append(sql[start:i])
+                    parts.append(f"\"{new_name}\"")
+                    start = word.end()
+                i = word.end()
+                continue
+            i += 1
+        parts.append(sql[start:])
+        return "".join(parts)
@@ -0,0 +1,489 @@
+import os
+import copy
+import json
+import sqlite3
+from src.Database.DatabaseFactory import DatabaseFactory
+
+
+class OfflineCatalog:
+    """Схема базы данных в памяти для экспорта миграций без подключения к базе данных
+
+    The schema is seeded empty or from a schema dump and is changed by replaying the operations
+    of the exported migrations:
+      - SQLite: the statements are executed on an in-memory SQLite database
+        (seed: SQL script of the schema or a copy of the database file);
+      - PostgreSQL / MySQL: the migrator operations are applied to a catalog of tables, columns,
+        primary keys, foreign keys and indexes (seed: JSON file in the 'catalog_snapshot' format,
+        see '--db-catalog-dump').
+
+    NOTE: The statements of 'execute' (raw SQL) are not replayed to the PostgreSQL / MySQL catalog.
+    """
+
+    __sqlite_adapters = ('sqlite', 'sqlite3')
+    __kinds = ('columns', 'primary_keys', 'foreign_keys', 'indexes')
+    __database = ""
+    __adapter = None
+    __is_sql_replay = False
+    __tables = {}
+
+    def __init__(self, database: str, settings: dict, schema_file: str = ""):
+        self.__database = database
+        self.__tables = {}
+        self.__is_sql_replay = str(settings.get('adapter', '')).strip() in OfflineCatalog.__sqlite_adapters
+        self.__adapter = DatabaseFactory.instance().create_database_adapter({'auto-connect': False, 'database': database})
+        if not self.__adapter:
+            raise Exception(f"[OfflineCatalog] Create database adapter failed! Database: {database if database else 'primary'}")
+        if self.__is_sql_replay:
+            tmp_settings = dict(settings)
+            tmp_settings['database'] = ':memory:'
+            self.__adapter.set_settings(tmp_settings)
+            self.__adapter.connect()
+        if schema_file:
+            self.__load(schema_file)
+
+    @staticmethod
+    def schema_file(dir_path: str, database: str) -> str:
+        """Найти файл схемы базы данных в каталоге ('<database>.json' или '<database>.sql')
+
+        :param dir_path: каталог файлов схем
+        :param database: название базы данных (пустое - основная база данных)
+        :return: путь до файла или пустая строка (схема не задана)
+        :rtype: str
+        """
+
+        if not dir_path:
+            return ""
+        title = database if database else 'primary'
+        for ext in ('json', 'sql'):
+            path = f"{dir_path.rstrip('/')}/{title}.{ext}"
+            if os.path.isfile(path):
+                return path
+        return ""
+
+    @staticmethod
+    def save_schema(path: str, db_adapter, migrator) -> str:
+        """Сохранить схему базы данных в файл (SQLite - SQL скрипт, иначе - JSON каталог)
+
+        :param path: путь до файла схемы (без расширения)
+        :param db_adapter: подключенный адаптер базы данных
+        :param migrator: мигратор базы данных
+        :return: путь до сохраненного файла
+        :rtype: str
+        :raise: Exception
+        """
+
+        if db_adapter.name() == 'SQLite':
+            res = db_adapter.query("SELECT type, sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 ELSE 2 END, name;", True)
+            with open(f"{path}.sql", 'w') as f:
+                for row in res:
+                    f.write(f"{row[1]};\n")
+            return f"{path}.sql"
+        snapshot = migrator.catalog_snapshot()
+        if snapshot is None:
+            raise Exception(f"[OfflineCatalog][save_schema] Catalog snapshot is not supported! Adapter: {db_adapter.name()}")
+        with open(f"{path}.json", 'w') as f:
+            json.dump(snapshot, f, indent=2, sort_keys=True, default=str)
+        return f"{path}.json"
+
+    def database(self) -> str:
+        """Название базы данных (ключ в '*_secondary'; пустое - основная база данных)
+
+        :rtype: str
+        """
+
+        return self.__database
+
+    def database_adapter(self):
+        """Адаптер базы данных (SQLite - подключен к базе данных в памяти, иначе - не подключен)
+
+        :rtype: BaseDatabaseAdapter
+        """
+
+        return self.__adapter
+
+    def is_sql_replay(self) -> bool:
+        """Выполняются ли SQL запросы миграций в базе данных в памяти (SQLite)
+
+        :rtype: bool
+        """
+
+        return self.__is_sql_replay
+
+    def close(self):
+        """Закрыть базу данных в памяти"""
+
+        if self.__is_sql_replay and self.__adapter:
+            self.__adapter.disconnect()
+
+    def snapshot(self) -> dict:
+        """Каталог базы данных (формат см. в 'BaseMigrator.catalog_snapshot')
+
+        :rtype: dict
+        """
+
+        snapshot = {'tables': sorted(self.__tables.keys())}
+        for kind in OfflineCatalog.__kinds:
+            snapshot[kind] = {}
+            for name, table in self.__tables.items():
+                snapshot[kind][name] = copy.deepcopy(table[kind])
+        return snapshot
+
+    def value(self, kind: str, table_name: str) -> dict:
+        """Значение каталога таблицы
+
+        :param kind: тип значения (indexes / columns / primary_keys / foreign_keys)
+        :param table_name: название таблицы
+        :rtype: dict
+        """
+
+        table = self.__table(table_name)
+        if not table:
+            return {}
+        return copy.deepcopy(table[kind])
+
+    #
+    # replay methods (PostgreSQL / MySQL):
+    #
+
+    def create_table(self, name: str, columns: dict, p_key: str = "", p_key_name: str = ""):
+        """Создать таблицу
+
+        :param name: название таблицы
+        :param columns: колонки таблицы ({ 'name': { 'type': ..., 'is_not_null': ..., 'default': ... } })
+        :param p_key: колонка первичного ключа
+        :param p_key_name: название первичного ключа
+        """
+
+        if self.__table(name):
+            return  # 'IF NOT EXISTS'
+        self.__tables[name] = {'columns': {}, 'primary_keys': {}, 'foreign_keys': {}, 'indexes': {}}
+        for column_name, info in columns.items():
+            self.add_column(name, column_name, info)
+        if p_key:
+            self.set_primary_key(name, p_key_name, p_key)
+
+    def rename_table(self, name: str, new_name: str):
+        """Переименовать таблицу
+
+        :param name: название таблицы
+        :param new_name: новое название таблицы
+        """
+
+        key = self.__table_key(name)
+        if key is None:
+            return
+        table = self.__tables.pop(key)
+        self.__tables[new_name] = table
+        for kind in OfflineCatalog.__kinds:
+            for info in table[kind].values():
+                info['table'] = new_name
+        for other in self.__tables.values():
+            for info in other['foreign_keys'].values():
+                if self.__is_same_name(info['ref_table'], name):
+                    info['ref_table'] = new_name
+
+    def drop_table(self, name: str):
+        """Удалить таблицу
+
+        :param name: название таблицы
+        """
+
+        key = self.__table_key(name)
+        if key is not None:
+            del self.__tables[key]
+
+    def add_column(self, table_name: str, column_name: str, info: dict):
+        """Добавить колонку
+
+        :param table_name: название таблицы
+        :param column_name: название колонки
+        :param info: описание колонки ({ 'type': ..., 'is_not_null': ..., 'default': ... })
+        """
+
+        table = self.__table(table_name)
+        if not table or column_name in table['columns']:
+            return
+        table['columns'][column_name] = {
+            'table': table_name,
+            'column': column_name,
+            'type': info.get('type', ''),
+            'is_pk': False,
+            'is_not_null': bool(info.get('is_not_null', False)),
+            'default': info.get('default', None)
+        }
+
+    def rename_column(self, table_name: str, column_name: str, column_new_name: str):
+        """Переименовать колонку (в колонках, ключах и индексах)
+
+        :param table_name: название таблицы
+        :param column_name: название колонки
+        :param column_new_name: новое название колонки
+        """
+
+        table = self.__table(table_name)
+        if not table or not column_name in table['columns']:
+            return
+        columns = {}
+        for name, info in table['columns'].items():
+            if name == column_name:
+                info['column'] = column_new_name
+                name = column_new_name
+            columns[name] = info
+        table['columns'] = columns
+        for info in table['primary_keys'].values():
+            if info['column'] == column_name:
+                info['column'] = column_new_name
+        for info in table['foreign_keys'].values():
+            info['column'] = self.__replace_list_item(info['column'], column_name, column_new_name)
+        for info in table['indexes'].values():
+            info['columns'] = [column_new_name if c == column_name else c for c in info['columns']]
+        for other in self.__tables.values():
+            for info in other['foreign_keys'].values():
+                if self.__is_same_name(info['ref_table'], table_name):
+                    info['ref_column'] = self.__replace_list_item(info['ref_column'], column_name, column_new_name)
+
+    def change_column(self, table_name: str, column_name: str, info: dict):
+        """Изменить описание колонки
+
+        :param table_name: название таблицы
+        :param column_name: название колонки
+        :param info: измененные значения описания колонки ({ 'type': ..., 'is_not_null': ..., 'default': ... })
+        """
+
+        table = self.__table(table_name)
+        if not table or not column_name in table['columns']:
+            return
+        table['columns'][column_name].update(info)
+
+    def drop_column(self, table_name: str, column_name: str):
+        """Удалить колонку (и ключи и индексы, в которые она входит)
+
+        :param table_name: название таблицы
+        :param column_name: название колонки
+        """
+
+        table = self.__table(table_name)
+        if not table or not column_name in table['columns']:
+            return
+        del table['columns'][column_name]
+        for kind in ('primary_keys', 'foreign_keys', 'indexes'):
+            for name in list(table[kind].keys()):
+                info = table[kind][name]
+                columns = info['columns'] if kind == 'indexes' else [c.strip() for c in str(info['column']).split(',')]
+                if column_name in columns:
+                    del table[kind][name]
+
+    def add_index(self, table_name: str, name: str, columns: list, unique: bool = False):
+        """Добавить индекс
+
+        :param table_name: название таблицы
+        :param name: название индекса
+        :param columns: колонки индекса
+        :param unique: является ли уникальным
+        """
+
+        table = self.__table(table_name)
+        if not table:
+            return
+        table['indexes'][name] = {
+            'index_name': name,
+            'unique': bool(unique),
+            'table': table_name,
+            'columns': list(columns)
+        }
+
+    def rename_index(self, table_name: str, old_name: str, new_name: str):
+        """Переименовать индекс
+
+        :param table_name: название таблицы
+        :param old_name: название индекса
+        :param new_name: новое название индекса
+        """
+
+        table = self.__table(table_name)
+        if not table or not old_name in table['indexes']:
+            return
+        info = table['indexes'].pop(old_name)
+        info['index_name'] = new_name
+        table['indexes'][new_name] = info
+
+    def drop_index(self, table_name: str, name: str):
+        """Удалить индекс
+
+        :param table_name: название таблицы
+        :param name: название индекса
+        """
+
+        table = self.__table(table_name)
+        if table and name in table['indexes']:
+            del table['indexes'][name]
+
+    def set_primary_key(self, table_name: str, name: str, column_name: str):
+        """Установить первичный ключ
+
+        :param table_name: название таблицы
+        :param name: название первичного ключа
+        :param column_name: название колонки
+        """
+
+        table = self.__table(table_name)
+        if not table:
+            return
+        column = table['columns'].get(column_name, None)
+        if column:
+            column['is_pk'] = True
+            column['is_not_null'] = True
+        table['primary_keys'][name] = {
+            'name': name,
+            'table': table_name,
+            'column': column_name,
+            'type': column['type'] if column else ''
+        }
+
+    def drop_primary_key(self, table_name: str, name: str):
+        """Удалить первичный ключ
+
+        :param table_name: название таблицы
+        :param name: название первичного ключа
+        """
+
+        table = self.__table(table_name)
+        if not table or not name in table['primary_keys']:
+            return
+        info = table['primary_keys'].pop(name)
+        column = table['columns'].get(info['column'], None)
+        if column:
+            column['is_pk'] = False
+
+    def add_foreign_key(self, table_name: str, name: str, columns: list, ref_table_name: str, ref_columns: list, action: str = 'NO ACTION'):
+        """Добавить вторичный ключ
+
+        :param table_name: название таблицы
+        :param name: название вторичного ключа
+        :param columns: колонки
+        :param ref_table_name: название таблицы, на которую ссылается ключ
+        :param ref_columns: колонки таблицы, на которую ссылается ключ
+        :param action: поведение ключа
+        """
+
+        table = self.__table(table_name)
+        if not table:
+            return
+        table['foreign_keys'][name] = {
+            'name': name,
+            'table': table_name,
+            'column': ", ".join(columns),
+            'ref_table': ref_table_name,
+            'ref_column': ", ".join(ref_columns),
+            'on_update': action,
+            'on_delete': action
+        }
+
+    def drop_foreign_key(self, table_name: str, name: str):
+        """Удалить вторичный ключ
+
+        :param table_name: название таблицы
+        :param name: название вторичного ключа
+        """
+
+        table = self.__table(table_name)
+        if table and name in table['foreign_keys']:
+            del table['foreign_keys'][name]
+
+    #
+    # private methods:
+    #
+
+    def __load(self, path: str):
+        """Загрузить схему базы данных из файла
+
+        :param path: путь до файла схемы
+        :raise: Exception
+        """
+
+        if path.endswith('.json'):
+            if self.__is_sql_replay:
+                raise Exception(f"[OfflineCatalog] JSON schema is not supported for SQLite (use SQL script)! File: {path}")
+            with open(path, 'r') as f:
+                snapshot = json.load(f)
+            tables = snapshot.get('tables', [])
+            for name in tables:
+                if '.' in name and name.split('.')[-1] in tables:
+                    continue  # the table is saved with and without the schema name (PostgreSQL)
+                self.__tables[name] = {}
+                for kind in OfflineCatalog.__kinds:
+                    self.__tables[name][kind] = snapshot.get(kind, {}).get(name, {})
+            return
+        if not self.__is_sql_replay:
+            raise Exception(f"[OfflineCatalog] SQL schema is supported only for SQLite (use JSON catalog)! File: {path}")
+        with open(path, 'rb') as f:
+            is_database_file = f.read(16) == b'SQLite format 3\x00'
+        if is_database_file:
+            connection = sqlite3.connect(path)
+            try:
+                statements = [r[0] for r in connection.execute("SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 ELSE 2 END, rowid;")]
+            finally:
+                connection.close()
+        else:
+            statements = []
+            statement = ""
+            with open(path, 'r') as f:
+                for line in f:
+                    statement += line
+                    if sqlite3.complete_statement(statement):
+                        statements.append(statement.strip())
+                        statement = ""
+            if statement.strip():
+                statements.append(statement.strip())
+        for sql in statements:
+            self.__adapter.query(sql)
+
+    def __table_key(self, name: str):
+        """Ключ таблицы в каталоге (поиск по полному имени или имени без схемы)
+
+        :param name: название таблицы
+        :rtype: str|None
+        """
+
+        if name in self.__tables:
+            return name
+        short_name = name.split('.')[-1]
+        for key in self.__tables.keys():
+            if key.split('.')[-1] == short_name:
+                return key
+        return None
+
+    def __table(self, name: str):
+        """Таблица каталога
+
+        :param name: название таблицы
+        :rtype: dict|None
+        """
+
+        key = self.__table_key(name)
+        if key is None:
+            return None
+        return self.__tables[key]
+
+    @staticmethod
+    def __is_same_name(name: str, other: str) -> bool:
+        """Совпадают ли имена таблиц (без учета схемы)
+
+        :param name: имя
+        :param other: имя
+        :rtype: bool
+        """
+
+        return str(name).split('.')[-1] == str(other).split('.')[-1]
+
+    @staticmethod
+    def __replace_list_item(value: str, name: str, new_name: str) -> str:
+        """Заменить имя в списке имен через запятую
+
+        :param value: список имен через запятую
+        :param name: имя
+        :param new_name: новое имя
+        :rtype: str
+        """
+
+        return ", ".join([new_name if v.strip() == name else v.strip() for v in str(value).split(',')])
@@ -0,0 +1,86 @@
+import io
+import os
+import sys
+import tempfile
+import contextlib
+
+from src.Config.Config import Config
+from src.Database.DatabaseFactory import DatabaseFactory
+from src.PostScripts.PostScripts import PostScripts
+from src.Migration.MigrationCore import MigrationCore
+
+
+class MigrationProject:
+    """Временный проект миграций SQLite для тестов (каталоги config, db/migrate и post)"""
+
+    def __init__(self, databases: tuple = ('',), settings: dict = None):
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.__tmp_dir.name
+        self.config_dir = f"{self.root}/config"
+        self.migrations_dir = f"{self.root}/db/migrate"
+        for path in (self.config_dir, self.migrations_dir, f"{self.root}/post"):
+            os.makedirs(path)
+        self.databases = databases
+        primary_settings = "".join(f"  {key}: {value}\n" for key, value in (settings or {}).items())
+        secondary = "".join(f"  {name}:\n    adapter: sqlite\n    database: {self.database_path(name)}\n"
+                            for name in databases if name != '')
+        self.__write(f"{self.config_dir}/database.yml",
+                     "production:\n"
+                     "development:\n"
+                     "  adapter: sqlite\n"
+                     f"  database: {self.database_path('')}\n"
+                     f"{primary_settings}"
+                     "production_secondary:\n"
+                     f"development_secondary:\n{secondary}")
+        self.__write(f"{self.config_dir}/fly-cube-migration.yml",
+                     f"FLY_CUBE_MIGRATION_CONFIG_DIR: \"{self.config_dir}/\"\n"
+                     f"FLY_CUBE_MIGRATION_DB_MIGRATIONS_DIR: \"{self.migrations_dir}/\"\n")
+        self.__write(f"{self.config_dir}/post-scripts.yml",
+                     f"production:\ndevelopment:\n  directory: {self.root}/post\n")
+
+    def database_path(self, database: str) -> str:
+        return f"{self.root}/db/{database or 'primary'}.sqlite3"
+
+    def add_migration(self, version: int, class_name: str, body: str):
+        self.__write(f"{self.migrations_dir}/{version}_{class_name}.py",
+                     "from src.Migration.BaseMigration import BaseMigration\n\n\n"
+                     f"class {class_name}(BaseMigration):\n{body}")
+
+    def load(self):
+        Config.instance().reset_config()
+        DatabaseFactory.instance().reset_config()
+        PostScripts.instance().reset_config()
+        MigrationCore.instance().reset_migrations()
+        MigrationCore.instance().reset_migration_versions()
+        Config.instance().load_config(self.config_dir)
+        DatabaseFactory.instance().load_config(self.config_dir)
+        PostScripts.instance().load_config(self.config_dir)
+        MigrationCore.instance().load_migrations(self.migrations_dir)
+
+    @staticmethod
+    def call(func, *args) -> tuple:
+        """Вызвать метод с перехватом вывода
+
+        :return: (результат, вывод)
+        """
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            result = func(*args)
+        return result, out.getvalue()
+
+    def cleanup(self):
+        DatabaseFactory.instance().reset_config()
+        MigrationCore.instance().reset_migrations()
+        MigrationCore.instance().reset_migration_versions()
+        # migration modules are imported by file name (see 'MigrationCore.__migration')
+        for name in os.listdir(self.migrations_dir):
+            sys.modules.pop(name[:-3], None)
+        while self.migrations_dir in sys.path:
+            sys.path.remove(self.migrations_dir)
+        self.__tmp_dir.cleanup()
+
+    @staticmethod
+    def __write(path: str, text: str):
+        with open(path, 'w') as f:
+            f.write(text)
@@ -0,0 +1,93 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from src.Database.Adapters.SQLiteAdapter import SQLiteAdapter
+from src.Migration.Migrators.BaseMigrator import BaseMigrator
+from src.Migration.Migrators.SQLiteMigrator import SQLiteMigrator
+
+
+class TestCatalogCache(unittest.TestCase):
+    def setUp(self):
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        BaseMigrator.clear_catalog_cache()
+        self.migrator = self.make_migrator('test')
+        self.migrator.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT);")
+        self.migrator.execute("CREATE TABLE groups (id INTEGER PRIMARY KEY, title TEXT);")
+        self.migrator.execute("CREATE INDEX users_name_index ON users (name);")
+
+    def tearDown(self):
+        BaseMigrator.clear_catalog_cache()
+        self.__tmp_dir.cleanup()
+
+    def make_migrator(self, name: str) -> SQLiteMigrator:
+        db_adapter = SQLiteAdapter({'database': f"{self.__tmp_dir.name}/{name}.sqlite3"})
+        db_adapter.connect()
+        self.addCleanup(db_adapter.disconnect)
+        return SQLiteMigrator(db_adapter)
+
+    @staticmethod
+    def columns(migrator: SQLiteMigrator, table_name: str) -> list:
+        return sorted(migrator.table_columns(table_name).keys())
+
+    def test_cache_is_used(self):
+        self.assertEqual(self.columns(self.migrator, 'users'), ['id', 'name'])
+        # a change not made by the migrator is not seen
+        self.migrator._db_adapter.query("ALTER TABLE users ADD COLUMN email TEXT;")
+        self.assertEqual(self.columns(self.migrator, 'users'), ['id', 'name'])
+
+    def test_execute_ddl_invalidates_table(self):
+        statements = [
+            ("ALTER TABLE users ADD COLUMN c1 TEXT;", 'c1'),
+            ("alter table users add column c2 text;", 'c2'),
+            ("ALTER TABLE \"users\" ADD COLUMN c3 TEXT;", 'c3'),
+            ("ALTER TABLE main.users ADD COLUMN c4 TEXT;", 'c4'),
+            ("ALTER TABLE \"main\".\"users\" ADD COLUMN c5 TEXT;", 'c5'),
+            ("  -- comment\n/* comment */ ALTER TABLE [Users] ADD COLUMN c6 TEXT", 'c6')
+        ]
+        for sql, column in statements:
+            with self.subTest(sql=sql):
+                self.assertNotIn(column, self.columns(self.migrator, 'users'))
+                self.migrator.execute(sql)
+                self.assertIn(column, self.columns(self.migrator, 'users'))
+
+    def test_execute_ddl_keeps_other_tables(self):
+        self.assertEqual(self.columns(self.migrator, 'groups'), ['id', 'title'])
+        self.migrator._db_adapter.query("ALTER TABLE groups ADD COLUMN code TEXT;")
+        self.migrator.execute("ALTER TABLE users ADD COLUMN email TEXT;")
+        self.assertEqual(self.columns(self.migrator, 'groups'), ['id', 'title'])
+
+    def test_drop_index_invalidates_table(self):
+        self.assertIn('users_name_index', self.migrator.table_indexes('users'))
+        self.migrator.execute("DROP INDEX \"main\".\"USERS_NAME_INDEX\";")
+        self.assertNotIn('users_name_index', self.migrator.table_indexes('users'))
+
+    def test_unknown_statement_clears_cache(self):
+        self.assertEqual(self.columns(self.migrator, 'groups'), ['id', 'title'])
+        self.migrator._db_adapter.query("ALTER TABLE groups ADD COLUMN code TEXT;")
+        self.migrator.execute("CREATE VIEW users_view AS SELECT * FROM users;")
+        self.assertEqual(self.columns(self.migrator, 'groups'), ['code', 'id', 'title'])
+
+    def test_databases_do_not_share_cache(self):
+        other = self.make_migrator('other')
+        other.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT);")
+        self.assertEqual(self.columns(self.migrator, 'users'), ['id', 'name'])
+        self.assertEqual(self.columns(other, 'users'), ['email', 'id'])
+        # the DDL of the other database does not clear the cache of the first one
+        self.migrator._db_adapter.query("ALTER TABLE users ADD COLUMN code TEXT;")
+        other.execute("ALTER TABLE users ADD COLUMN phone TEXT;")
+        self.assertEqual(self.columns(self.migrator, 'users'), ['id', 'name'])
+        self.assertEqual(self.columns(other, 'users'), ['email', 'id', 'phone'])
+
+    def test_schemas_do_not_share_cache(self):
+        tenant = self.make_migrator('test')
+        self.assertEqual(self.columns(self.migrator, 'users'), ['id', 'name'])
+        with mock.patch.object(tenant._db_adapter, 'schema', return_value='tenant_1'):
+            tenant.execute("ALTER TABLE users ADD COLUMN email TEXT;")
+            self.assertEqual(self.columns(tenant, 'users'), ['email', 'id', 'name'])
+        # the cache of the default schema is not changed by the DDL of the tenant schema
+        self.assertEqual(self.columns(self.migrator, 'users'), ['id', 'name'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import threading
+import unittest
+
+from src.Database.DatabaseFactory import DatabaseFactory
+from tests.migration_project import MigrationProject
+
+
+class TestDatabasePool(unittest.TestCase):
+    def setUp(self):
+        self.project = MigrationProject(('', 'sec'))
+        self.project.load()
+        self.factory = DatabaseFactory.instance()
+        self.factory.set_max_connections(1)
+
+    def tearDown(self):
+        if 'create_database_adapter' in vars(self.factory):
+            del self.factory.create_database_adapter
+        self.factory.set_max_connections(0)
+        self.project.cleanup()
+
+    def test_failed_connect_releases_reserved_place(self):
+        self.factory.create_database_adapter = lambda args: None
+        self.assertIsNone(self.factory.acquire_database_adapter(''))
+        del self.factory.create_database_adapter
+        # the limit is 1: a leaked place would block this call forever
+        adapter = self.project.call(self.factory.acquire_database_adapter, 'sec')[0]
+        self.assertIsNotNone(adapter)
+        self.factory.release_database_adapter(adapter)
+
+    def test_connect_is_outside_of_pool_lock(self):
+        self.factory.set_max_connections(2)
+        created = self.factory.pool_statistics()['created']
+        adapter = self.factory.acquire_database_adapter('')
+        self.factory.release_database_adapter(adapter)
+        connecting = threading.Event()
+        connected = threading.Event()
+        create_database_adapter = self.factory.create_database_adapter
+
+        def slow_create_database_adapter(args):
+            connecting.set()
+            connected.wait(5)
+            return create_database_adapter(args)
+
+        self.factory.create_database_adapter = slow_create_database_adapter
+        thread = threading.Thread(target=lambda: self.factory.release_database_adapter(
+            self.factory.acquire_database_adapter('sec')))
+        thread.start()
+        self.assertTrue(connecting.wait(5))
+        # the idle adapter is reused while the other thread connects
+        reused = []
+        reuse_thread = threading.Thread(target=lambda: reused.append(self.factory.acquire_database_adapter('')))
+        reuse_thread.start()
+        reuse_thread.join(2)
+        reused_while_connecting = list(reused)
+        connected.set()
+        reuse_thread.join(5)
+        self.assertEqual(reused_while_connecting, [adapter])
+        self.factory.release_database_adapter(adapter)
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(self.factory.pool_statistics()['created'] - created, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
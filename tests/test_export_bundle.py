@@ -0,0 +1,91 @@
+import shutil
+import sqlite3
+import subprocess
+import unittest
+from unittest import mock
+
+from src.Migration.ExportBundle import ExportBundle
+from src.Migration.MigrationCore import MigrationCore
+from tests.migration_project import MigrationProject
+
+
+class TestExportBundle(unittest.TestCase):
+    def setUp(self):
+        self.project = MigrationProject()
+        self.project.add_migration(20240101000001, 'BundleCreateUsers',
+                                   "    def up(self):\n"
+                                   "        self.create_table('users', {'id': True, 'name': {'type': 'string'}})\n"
+                                   "        self.add_index('users', ['name'])\n"
+                                   "        self.execute(\"INSERT INTO users (id, name) VALUES (1, 'a; b')\")\n\n"
+                                   "    def down(self):\n"
+                                   "        self.drop_table('users')\n")
+        self.project.add_migration(20240101000002, 'BundleRenameName',
+                                   "    def up(self):\n"
+                                   "        self.rename_column('users', 'name', 'full_name')\n\n"
+                                   "    def down(self):\n"
+                                   "        self.rename_column('users', 'full_name', 'name')\n")
+        self.project.load()
+        self.database = self.project.database_path('')
+
+    def tearDown(self):
+        self.project.cleanup()
+
+    def export_bundle(self, version: int, command: str) -> str:
+        export_dir = f"{self.project.root}/export_{command}"
+        result, _ = self.project.call(MigrationCore.instance().migrate_export,
+                                      [''], version, export_dir, True, True, '', 1, 0, True)
+        self.assertEqual(result, 0)
+        return f"{export_dir}/primary_{command}.sql"
+
+    def apply_bundle(self, path: str) -> subprocess.CompletedProcess:
+        with open(path, 'r') as f:
+            return subprocess.run([shutil.which('sqlite3'), self.database], stdin=f, capture_output=True, text=True)
+
+    def database_state(self) -> tuple:
+        connection = sqlite3.connect(self.database)
+        try:
+            tables = [r[0] for r in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name;")]
+            versions = [r[0] for r in connection.execute("SELECT version FROM schema_migrations ORDER BY version;")]
+            users = []
+            if 'users' in tables:
+                users = connection.execute("SELECT * FROM users ORDER BY id;").fetchall()
+            return tables, versions, users
+        finally:
+            connection.close()
+
+    def test_sections_are_terminated(self):
+        bundle = ExportBundle('sqlite', 'up', '')
+        bundle.append(1, 'Unterminated', "INSERT INTO users (name) VALUES ('a')  \n")
+        bundle.append(2, 'LineComment', "INSERT INTO users (name) VALUES ('b') -- no ';'")
+        sql = bundle.make_sql()
+        self.assertIn("VALUES ('a');\nINSERT INTO schema_migrations (version) VALUES ('1');", sql)
+        self.assertIn("VALUES ('b') -- no ';'\n;\nINSERT INTO schema_migrations (version) VALUES ('2');", sql)
+        self.assertTrue(sqlite3.complete_statement(sql))
+
+    @unittest.skipIf(shutil.which('sqlite3') is None, "sqlite3 console utility is not installed")
+    def test_apply_bundle_with_sqlite3(self):
+        up_bundle = self.export_bundle(-1, 'up')
+        down_bundle = self.export_bundle(0, 'down')
+        process = self.apply_bundle(up_bundle)
+        self.assertEqual(process.returncode, 0, process.stderr)
+        expected = (['schema_migrations', 'users'], ['20240101000001', '20240101000002'], [(1, 'a; b')])
+        self.assertEqual(self.database_state(), expected)
+        # the installed versions abort the bundle and roll it back
+        process = self.apply_bundle(up_bundle)
+        self.assertNotEqual(process.returncode, 0)
+        self.assertIn("migration is already installed", process.stderr)
+        self.assertEqual(self.database_state(), expected)
+        process = self.apply_bundle(down_bundle)
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertEqual(self.database_state(), (['schema_migrations'], [], []))
+
+    def test_files_are_synced_once_per_export(self):
+        with mock.patch('os.fsync') as fsync, mock.patch('os.sync', create=True) as sync:
+            self.export_bundle(-1, 'up')
+        self.assertEqual(fsync.call_count, 0)
+        self.assertEqual(sync.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import sqlite3
+import unittest
+from unittest import mock
+
+from src.Migration.MigrationCore import MigrationCore
+from tests.migration_project import MigrationProject
+
+
+class TestMigrationLoading(unittest.TestCase):
+    def setUp(self):
+        self.project = MigrationProject()
+        self.project.add_migration(20240101000001, 'LoadingCreateUsers',
+                                   "    def up(self):\n"
+                                   "        self.create_table('users', {'id': True})\n\n"
+                                   "    def down(self):\n"
+                                   "        self.drop_table('users')\n")
+        self.project.add_migration(20240101000002, 'LoadingBroken',
+                                   "    def up(self):\n"
+                                   "        self.create_table('groups', {'id': True})\n"
+                                   "\n"
+                                   "import missing_module_of_migration\n")
+        self.project.load()
+
+    def tearDown(self):
+        self.project.cleanup()
+
+    def test_migrate_fails_on_broken_migration(self):
+        result, out = self.project.call(MigrationCore.instance().migrate, [''], -1)
+        self.assertEqual(result, 1)
+        self.assertIn("missing_module_of_migration", out)
+        self.assertIn("Load migration failed! Migration: (20240101000002 - 'LoadingBroken')", out)
+        # the plan is not executed
+        connection = sqlite3.connect(self.project.database_path(''))
+        try:
+            tables = [r[0] for r in connection.execute("SELECT name FROM sqlite_master WHERE name = 'users';")]
+        finally:
+            connection.close()
+        self.assertEqual(tables, [])
+
+    def test_status_reports_broken_migration(self):
+        result, _ = self.project.call(MigrationCore.instance().migrate, [''], 20240101000001)
+        self.assertEqual(result, 0)
+        result, out = self.project.call(MigrationCore.instance().migrate_status, [''])
+        self.assertEqual(result, 1)
+        self.assertIn("Load - FAILED", out)
+        self.assertIn("(20240101000002 - 'LoadingBroken')", out)
+
+
+
+class TestExportMigrationLoading(unittest.TestCase):
+    def setUp(self):
+        self.project = MigrationProject()
+        self.project.add_migration(20240101000001, 'ExportLoadingCreateUsers',
+                                   "    def up(self):\n"
+                                   "        self.create_table('users', {'id': True})\n\n"
+                                   "    def down(self):\n"
+                                   "        self.drop_table('users')\n")
+        self.project.add_migration(20240101000002, 'ExportLoadingCreateGroups',
+                                   "    def up(self):\n"
+                                   "        self.create_table('groups', {'id': True})\n\n"
+                                   "    def down(self):\n"
+                                   "        self.drop_table('groups')\n")
+        self.project.load()
+        self.export_dir = f"{self.project.root}/export"
+
+    def tearDown(self):
+        self.project.cleanup()
+
+    def export(self) -> tuple:
+        migration = MigrationCore._MigrationCore__migration
+        with mock.patch.object(MigrationCore, '_MigrationCore__migration', autospec=True,
+                               side_effect=migration) as loader:
+            result, out = self.project.call(MigrationCore.instance().migrate_export, [''], -1, self.export_dir)
+        self.assertEqual(result, 0)
+        return sorted(c.args[1] for c in loader.call_args_list), out
+
+    def test_exported_migrations_are_loaded(self):
+        loaded, _ = self.export()
+        self.assertEqual(set(loaded), {20240101000001, 20240101000002})
+
+    def test_skipped_migrations_are_not_loaded(self):
+        self.export()
+        self.project.load()
+        loaded, out = self.export()
+        self.assertEqual(loaded, [])
+        self.assertIn("(20240101000002 - 'ExportLoadingCreateGroups')", out)
+        self.assertNotIn("Load migration failed!", out)
+
+
+if __name__ == '__main__':
+    unittest.main()
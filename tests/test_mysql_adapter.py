@@ -0,0 +1,24 @@
+import importlib.util
+import unittest
+from unittest import mock
+
+
+@unittest.skipIf(importlib.util.find_spec('mysql') is None, "mysql-connector-python is not installed")
+class TestMySQLAdapterQuoting(unittest.TestCase):
+    def setUp(self):
+        from src.Database.Adapters.MySQLAdapter import MySQLAdapter
+        self.adapter = MySQLAdapter({'adapter': 'mysql', 'database': "db'name"})
+
+    def test_tables_escapes_database_name(self):
+        with mock.patch.object(self.adapter, 'query', return_value=[]) as query:
+            self.adapter.tables()
+        self.assertIn("table_schema = 'db''name'", query.call_args.args[0])
+
+    def test_table_exists_escapes_database_name(self):
+        with mock.patch.object(self.adapter, 'query', return_value=[]) as query:
+            self.assertFalse(self.adapter._table_exists("it's"))
+        self.assertIn("table_schema = 'db''name' AND table_name = 'it''s'", query.call_args.args[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
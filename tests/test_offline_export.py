@@ -0,0 +1,51 @@
+import glob
+import sqlite3
+import unittest
+
+from src.Migration.MigrationCore import MigrationCore
+from tests.migration_project import MigrationProject
+
+
+class TestOfflineExport(unittest.TestCase):
+    def setUp(self):
+        self.project = MigrationProject()
+        self.project.add_migration(20240101000001, 'OfflineCreateUsers',
+                                   "    def up(self):\n"
+                                   "        self.create_table('users', {'id': True, 'name': {'type': 'string'}})\n"
+                                   "        self.add_index('users', ['name'])\n\n"
+                                   "    def down(self):\n"
+                                   "        self.drop_table('users')\n")
+        self.project.add_migration(20240101000002, 'OfflineRenameName',
+                                   "    def up(self):\n"
+                                   "        self.rename_column('users', 'name', 'full_name')\n\n"
+                                   "    def down(self):\n"
+                                   "        self.rename_column('users', 'full_name', 'name')\n")
+        self.project.load()
+        self.export_dir = f"{self.project.root}/export"
+
+    def tearDown(self):
+        self.project.cleanup()
+
+    def test_exported_statements_are_terminated(self):
+        self.project.call(MigrationCore.instance().migrate_export, [''], -1, self.export_dir, True, True, '')
+        files = sorted(glob.glob(f"{self.export_dir}/primary/*.sql"))
+        self.assertEqual(len(files), 2)
+        connection = sqlite3.connect(self.project.database_path(''))
+        try:
+            for path in files:
+                with open(path, 'r') as f:
+                    sql = f.read()
+                self.assertTrue(sqlite3.complete_statement(sql), path)
+                connection.executescript(sql)
+            indexes = [r[0] for r in connection.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'users' AND sql IS NOT NULL;")]
+            columns = [r[1] for r in connection.execute("PRAGMA table_info(users);")]
+        finally:
+            connection.close()
+        self.assertEqual(columns, ['id', 'full_name'])
+        self.assertEqual(len(indexes), 1)
+        self.assertIn('full_name', indexes[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import multiprocessing
+import os
+import unittest
+
+from src.Migration.MigrationCore import MigrationCore
+from tests.migration_project import MigrationProject
+
+
+@unittest.skipIf('fork' not in multiprocessing.get_all_start_methods(), "fork start method is not supported")
+class TestParallelExport(unittest.TestCase):
+    def setUp(self):
+        self.project = MigrationProject(('', 'sec'))
+        migrations = [(20240101000001, 'ExportUsers', ''), (20240101000002, 'ExportGroups', 'sec'),
+                      (20240101000003, 'ExportPosts', ''), (20240101000004, 'ExportMembers', 'sec')]
+        for version, class_name, database in migrations:
+            table = class_name[len('Export'):].lower()
+            configuration = f"    def configuration(self):\n        self.set_database('{database}')\n\n" if database else ""
+            self.project.add_migration(version, class_name,
+                                       f"{configuration}"
+                                       "    def up(self):\n"
+                                       f"        self.create_table('{table}', {{'id': True, 'title': {{'type': 'string'}}}})\n"
+                                       f"        self.add_index('{table}', ['title'])\n"
+                                       f"        self.rename_column('{table}', 'title', 'name')\n\n"
+                                       "    def down(self):\n"
+                                       f"        self.drop_table('{table}')\n")
+        self.project.load()
+
+    def tearDown(self):
+        self.project.cleanup()
+
+    def export(self, version: int, jobs: int, offline: bool) -> tuple:
+        export_dir = f"{self.project.root}/export_{version}_{jobs}_{int(offline)}"
+        result, out = self.project.call(MigrationCore.instance().migrate_export,
+                                        ['', 'sec'], version, export_dir, True, offline, '', jobs)
+        self.assertEqual(result, 0, out)
+        files = {}
+        for root, _, names in os.walk(export_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                if name.startswith('.flycube-export-manifest'):
+                    continue
+                with open(path, 'r') as f:
+                    files[os.path.relpath(path, export_dir)] = f.read()
+        return files, out.replace(export_dir, '[export]')
+
+    def test_parallel_export_is_same_as_serial(self):
+        for offline in (True, False):
+            for version in (-1, 0):
+                with self.subTest(offline=offline, version=version):
+                    serial = self.export(version, 1, offline)
+                    parallel = self.export(version, 2, offline)
+                    self.assertEqual(len(serial[0]), 4)
+                    self.assertEqual(parallel, serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
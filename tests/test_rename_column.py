@@ -0,0 +1,62 @@
+import glob
+import sqlite3
+import unittest
+
+from src.Migration.MigrationCore import MigrationCore
+from tests.migration_project import MigrationProject
+
+
+class TestRenameColumn(unittest.TestCase):
+    def setUp(self):
+        self.project = MigrationProject()
+        self.project.add_migration(20240101000001, 'RenameCreateUsers',
+                                   "    def up(self):\n"
+                                   "        self.create_table('users', {'id': True, 'name': {'type': 'string'}, 'email': {'type': 'string'}})\n"
+                                   "        self.add_index('users', ['name'])\n"
+                                   "        self.add_index('users', ['name', 'email'], {'name': 'users_name_email'})\n"
+                                   "        self.add_index('users', ['name'], {'name': 'users_custom'})\n\n"
+                                   "    def down(self):\n"
+                                   "        self.drop_table('users')\n")
+        self.project.add_migration(20240101000002, 'RenameName',
+                                   "    def up(self):\n"
+                                   "        self.rename_column('users', 'name', 'full_name')\n\n"
+                                   "    def down(self):\n"
+                                   "        self.rename_column('users', 'full_name', 'name')\n")
+        self.project.load()
+
+    def tearDown(self):
+        self.project.cleanup()
+
+    def indexes(self) -> dict:
+        connection = sqlite3.connect(self.project.database_path(''))
+        try:
+            res = connection.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL ORDER BY name;")
+            return {r[0]: sorted(c[2] for c in connection.execute(f"PRAGMA index_info(\"{r[0]}\");")) for r in res.fetchall()}
+        finally:
+            connection.close()
+
+    def test_only_default_index_is_renamed(self):
+        self.assertEqual(self.project.call(MigrationCore.instance().migrate, [''], -1)[0], 0)
+        self.assertEqual(self.indexes(), {
+            'users_custom': ['full_name'],
+            'users_full_name_index': ['full_name'],
+            'users_name_email': ['email', 'full_name']
+        })
+        self.assertEqual(self.project.call(MigrationCore.instance().rollback, [''], 1)[0], 0)
+        self.assertEqual(self.indexes(), {
+            'users_custom': ['name'],
+            'users_name_email': ['email', 'name'],
+            'users_name_index': ['name']
+        })
+
+    def test_export_renames_only_default_index(self):
+        export_dir = f"{self.project.root}/export"
+        self.project.call(MigrationCore.instance().migrate_export, [''], -1, export_dir, True, True, '')
+        with open(glob.glob(f"{export_dir}/primary/20240101000002_*.sql")[0], 'r') as f:
+            sql = f.read()
+        self.assertEqual(sql.count("DROP INDEX"), 1)
+        self.assertIn("DROP INDEX \"users_name_index\";", sql)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import sqlite3
+import unittest
+
+from src.Migration.MigrationCore import MigrationCore
+from tests.migration_project import MigrationProject
+
+
+class TestRollback(unittest.TestCase):
+    def setUp(self):
+        self.project = MigrationProject(('', 'sec'))
+        migrations = [(20240101000001, 'RollbackA', ''), (20240101000002, 'RollbackB', 'sec'),
+                      (20240101000003, 'RollbackC', ''), (20240101000004, 'RollbackD', 'sec')]
+        for version, class_name, database in migrations:
+            configuration = f"    def configuration(self):\n        self.set_database('{database}')\n\n" if database else ""
+            self.project.add_migration(version, class_name,
+                                       f"{configuration}"
+                                       "    def up(self):\n"
+                                       f"        self.create_table('{class_name.lower()}', {{'id': True}})\n\n"
+                                       "    def down(self):\n"
+                                       f"        self.drop_table('{class_name.lower()}')\n")
+
+    def tearDown(self):
+        self.project.cleanup()
+
+    def database_versions(self, database: str) -> list:
+        connection = sqlite3.connect(self.project.database_path(database))
+        try:
+            return [r[0] for r in connection.execute("SELECT version FROM schema_migrations ORDER BY version;")]
+        finally:
+            connection.close()
+
+    def check_rollback_of_all_versions(self, jobs: int):
+        self.project.load()
+        core = MigrationCore.instance()
+        self.assertEqual(self.project.call(core.migrate, ['', 'sec'], -1, jobs)[0], 0)
+        # the migration 20240101000001 is not installed (added later with an older version)
+        connection = sqlite3.connect(self.project.database_path(''))
+        connection.execute("DELETE FROM schema_migrations WHERE version = '20240101000001';")
+        connection.commit()
+        connection.close()
+        core.reset_migration_versions()
+        self.assertEqual(self.project.call(core.rollback, ['sec'], 2, jobs)[0], 0)
+        self.assertEqual(self.database_versions('sec'), [])
+        # the version of the next migration is saved when the database has no versions left
+        self.assertEqual(self.database_versions(''), ['20240101000001', '20240101000003'])
+
+    def test_rollback_of_all_versions_saves_next_version(self):
+        self.check_rollback_of_all_versions(1)
+
+    def test_rollback_of_all_versions_saves_next_version_parallel(self):
+        self.check_rollback_of_all_versions(2)
+
+if __name__ == '__main__':
+    unittest.main()
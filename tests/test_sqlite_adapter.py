@@ -0,0 +1,58 @@
+import sqlite3
+import tempfile
+import unittest
+
+from src.Database.Adapters.SQLiteAdapter import SQLiteAdapter
+
+
+class TestSQLiteAdapter(unittest.TestCase):
+    def setUp(self):
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.path = f"{self.__tmp_dir.name}/test.sqlite3"
+
+    def tearDown(self):
+        self.__tmp_dir.cleanup()
+
+    def make_adapter(self, isolation_level: str) -> SQLiteAdapter:
+        db_adapter = SQLiteAdapter({'database': self.path, 'isolation_level': isolation_level, 'busy_timeout': 0})
+        db_adapter.connect()
+        self.addCleanup(db_adapter.disconnect)
+        return db_adapter
+
+    def test_ddl_is_rolled_back(self):
+        db_adapter = self.make_adapter('DEFERRED')
+        db_adapter.query("CREATE TABLE items (id INTEGER PRIMARY KEY);")
+        db_adapter.begin_transaction()
+        db_adapter.query("ALTER TABLE items RENAME TO items_old;")
+        db_adapter.query("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT);")
+        db_adapter.rollback_transaction()
+        self.assertEqual(db_adapter.tables(), ['items'])
+        self.assertEqual([r['name'] for r in db_adapter.query("PRAGMA table_info(items);")], ['id'])
+
+    def test_immediate_transaction_takes_write_lock(self):
+        db_adapter = self.make_adapter('IMMEDIATE')
+        db_adapter.query("CREATE TABLE items (id INTEGER PRIMARY KEY);")
+        db_adapter.begin_transaction()
+        connection = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                connection.execute("BEGIN IMMEDIATE;")
+        finally:
+            connection.close()
+            db_adapter.rollback_transaction()
+
+    def test_begin_failure_closes_transaction(self):
+        db_adapter = self.make_adapter('IMMEDIATE')
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        connection.execute("BEGIN IMMEDIATE;")
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                db_adapter.begin_transaction()
+            self.assertFalse(db_adapter.in_transaction())
+        finally:
+            connection.execute("ROLLBACK;")
+            connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
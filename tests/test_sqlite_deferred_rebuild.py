@@ -0,0 +1,84 @@
+import glob
+import sqlite3
+import unittest
+from unittest import mock
+
+from src.Migration.MigrationCore import MigrationCore
+from src.Migration.Migrators.SQLiteMigrator import SQLiteMigrator
+from tests.migration_project import MigrationProject
+
+
+class TestSQLiteDeferredRebuild(unittest.TestCase):
+    def setUp(self):
+        self.project = MigrationProject()
+        self.project.add_migration(20240101000001, 'DeferredCreateItems',
+                                   "    def up(self):\n"
+                                   "        self.create_table('items', {'id': True, 'name': {'type': 'string'}, 'value': {'type': 'integer'}})\n"
+                                   "        self.add_index('items', ['name'])\n"
+                                   "        self.execute(\"INSERT INTO items (id, name, value) VALUES (1, 'a', 10)\")\n\n"
+                                   "    def down(self):\n"
+                                   "        self.drop_table('items')\n")
+        self.project.add_migration(20240101000002, 'DeferredChangeItems',
+                                   "    def up(self):\n"
+                                   "        self.create_table('groups', {'id': True})\n"
+                                   "        self.change_column_default('items', 'name', 'x')\n"
+                                   "        self.change_column('items', 'value', 'bigint')\n"
+                                   "        self.change_column_null('items', 'value', True)\n\n"
+                                   "    def down(self):\n"
+                                   "        self.drop_table('groups')\n")
+        self.project.load()
+
+    def tearDown(self):
+        self.project.cleanup()
+
+    def query(self, sql: str) -> list:
+        connection = sqlite3.connect(self.project.database_path(''))
+        try:
+            return connection.execute(sql).fetchall()
+        finally:
+            connection.close()
+
+    def test_changes_are_applied_by_one_rebuild(self):
+        result, _ = self.project.call(MigrationCore.instance().migrate, [''], 20240101000001)
+        self.assertEqual(result, 0)
+        rebuild_table = SQLiteMigrator._SQLiteMigrator__rebuild_table
+        with mock.patch.object(SQLiteMigrator, '_SQLiteMigrator__rebuild_table', autospec=True,
+                               side_effect=rebuild_table) as rebuild:
+            result, _ = self.project.call(MigrationCore.instance().migrate, [''], -1)
+        self.assertEqual(result, 0)
+        self.assertEqual(rebuild.call_count, 1)
+        columns = {r[1]: (r[2].lower(), r[3], r[4]) for r in self.query("PRAGMA table_info(items);")}
+        self.assertEqual(columns['name'][2].strip("'"), 'x')
+        self.assertEqual(columns['value'][0:2], ('bigint', 1))
+        self.assertEqual(self.query("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'items' AND sql IS NOT NULL;"),
+                         [('items_name_index',)])
+        self.assertEqual(self.query("SELECT id, name, value FROM items;"), [(1, 'a', 10)])
+
+    def test_export_has_one_rebuild(self):
+        export_dir = f"{self.project.root}/export"
+        result, _ = self.project.call(MigrationCore.instance().migrate_export, [''], -1, export_dir, True, True, '')
+        self.assertEqual(result, 0)
+        with open(glob.glob(f"{export_dir}/primary/20240101000002_*.sql")[0], 'r') as f:
+            sql = f.read()
+        self.assertEqual(sql.count("RENAME TO \"items_old\""), 1)
+        self.assertEqual(sql.count("DROP TABLE \"items_old\""), 1)
+
+    def test_failed_rebuild_rolls_back_migration(self):
+        result, _ = self.project.call(MigrationCore.instance().migrate, [''], 20240101000001)
+        self.assertEqual(result, 0)
+        connection = sqlite3.connect(self.project.database_path(''))
+        connection.execute("INSERT INTO items (id, name, value) VALUES (2, 'b', NULL);")
+        connection.commit()
+        connection.close()
+        result, out = self.project.call(MigrationCore.instance().migrate, [''], -1)
+        self.assertEqual(result, 1)
+        self.assertIn("NOT NULL constraint failed", out)
+        # the table created by the migration before the rebuild is rolled back too
+        self.assertEqual(self.query("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name;"),
+                         [('items',), ('schema_migrations',)])
+        self.assertEqual(self.query("SELECT version FROM schema_migrations;"), [('20240101000001',)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM items;"), [(2,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
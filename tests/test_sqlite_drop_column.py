@@ -0,0 +1,108 @@
+import io
+import contextlib
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from src.Database.Adapters.SQLiteAdapter import SQLiteAdapter
+from src.Logger.ConsoleLogger import ConsoleLogger
+from src.Migration.Migrators.SQLiteMigrator import SQLiteMigrator
+
+
+@unittest.skipIf(sqlite3.sqlite_version_info < (3, 35), "SQLite 3.35+ is required for 'DROP COLUMN'")
+class TestSQLiteDropColumn(unittest.TestCase):
+    def setUp(self):
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.path = f"{self.__tmp_dir.name}/test.sqlite3"
+        ConsoleLogger.instance().push_show_out(False)
+
+    def tearDown(self):
+        ConsoleLogger.instance().pop_show_out()
+        self.__tmp_dir.cleanup()
+
+    def drop_column(self, schema: list, column_name: str) -> str:
+        connection = sqlite3.connect(self.path)
+        for sql in schema:
+            connection.execute(sql)
+        connection.execute("INSERT INTO items (a, b, c) VALUES (1, 2, 3), (4, 5, 6);")
+        connection.commit()
+        connection.close()
+        db_adapter = SQLiteAdapter({'database': self.path})
+        db_adapter.connect()
+        try:
+            migrator = SQLiteMigrator(db_adapter)
+            with contextlib.redirect_stdout(io.StringIO()):
+                db_adapter.begin_transaction()
+                try:
+                    migrator.drop_column('items', column_name)
+                    migrator.apply_pending_changes()
+                except Exception:
+                    db_adapter.rollback_transaction()
+                    raise
+                db_adapter.commit_transaction()
+        finally:
+            db_adapter.disconnect()
+        connection = sqlite3.connect(self.path)
+        try:
+            self.assertEqual(connection.execute("PRAGMA integrity_check;").fetchall(), [('ok',)])
+            self.assertNotIn(column_name, [r[1] for r in connection.execute("PRAGMA table_xinfo(items);")])
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM items;").fetchone()[0], 2)
+            return connection.execute("SELECT sql FROM sqlite_master WHERE name = 'items';").fetchone()[0]
+        finally:
+            connection.close()
+
+    def assert_rebuilt(self, schema: list, column_name: str = 'a'):
+        sql = self.drop_column(schema, column_name)
+        self.assertNotEqual(sql, "CREATE TABLE items (b INT, c INT)")
+
+    def test_native_drop_column(self):
+        sql = self.drop_column(["CREATE TABLE items (a INT, b INT, c INT)",
+                                "CREATE INDEX items_b_index ON items (b)"], 'a')
+        self.assertEqual(sql, "CREATE TABLE items (b INT, c INT)")
+
+    def test_partial_index_where(self):
+        self.assert_rebuilt(["CREATE TABLE items (a INT, b INT, c INT)",
+                             "CREATE INDEX items_b_index ON items (b) WHERE A > 0"])
+
+    def test_refused_native_drop_falls_back_to_rebuild(self):
+        with mock.patch.object(SQLiteMigrator, '_SQLiteMigrator__is_native_drop_column', return_value=True):
+            self.assert_rebuilt(["CREATE TABLE items (a INT, b INT, c INT)",
+                                 "CREATE INDEX items_b_index ON items (b) WHERE a > 0"])
+
+    def test_index_expression(self):
+        self.assert_rebuilt(["CREATE TABLE items (a INT, b INT, c INT)",
+                             "CREATE INDEX items_expr_index ON items (b, abs(\"a\"))"])
+
+    def assert_not_dropped(self, schema: list, column_name: str = 'a'):
+        # the column can not be dropped at all: the table rebuild reports the error and the table is kept
+        with self.assertRaisesRegex(sqlite3.OperationalError, "no such column"):
+            self.drop_column(schema, column_name)
+        connection = sqlite3.connect(self.path)
+        try:
+            self.assertEqual(connection.execute("SELECT sql FROM sqlite_master WHERE name = 'items';").fetchone()[0], schema[0])
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM items;").fetchone()[0], 2)
+        finally:
+            connection.close()
+
+    def test_generated_column(self):
+        self.assert_not_dropped(["CREATE TABLE items (a INT, b INT, c INT, g INT GENERATED ALWAYS AS (a + 1) VIRTUAL)"])
+
+    def test_column_check_of_other_column(self):
+        self.assert_not_dropped(["CREATE TABLE items (a INT, b INT, c INT CHECK (c > [a]))"])
+
+    def test_generated_column_is_dropped_by_rebuild(self):
+        self.assert_rebuilt(["CREATE TABLE items (a INT, b INT, c INT, g INT GENERATED ALWAYS AS (b + 1) VIRTUAL)"], 'g')
+
+    def test_view(self):
+        self.assert_rebuilt(["CREATE TABLE items (a INT, b INT, c INT)",
+                             "CREATE VIEW items_view AS SELECT `a` FROM items"])
+
+    def test_trigger(self):
+        self.assert_rebuilt(["CREATE TABLE items (a INT, b INT, c INT)",
+                             "CREATE TABLE log (v INT)",
+                             "CREATE TRIGGER items_trigger AFTER INSERT ON items BEGIN INSERT INTO log VALUES (NEW.a); END"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import io
+import contextlib
+import sqlite3
+import tempfile
+import unittest
+
+from src.Database.Adapters.SQLiteAdapter import SQLiteAdapter
+from src.Logger.ConsoleLogger import ConsoleLogger
+from src.Migration.MigrationCore import MigrationCore
+from src.Migration.Migrators.SQLiteMigrator import SQLiteMigrator
+from tests.migration_project import MigrationProject
+
+
+class TestSQLiteRebuildChunked(unittest.TestCase):
+    def setUp(self):
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        ConsoleLogger.instance().push_show_out(False)
+
+    def tearDown(self):
+        ConsoleLogger.instance().pop_show_out()
+        self.__tmp_dir.cleanup()
+
+    def rebuild(self, rows: list, chunk_size: int) -> list:
+        path = f"{self.__tmp_dir.name}/test_{chunk_size}.sqlite3"
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE items (name TEXT DEFAULT 'a', value INT);")
+        connection.executemany("INSERT INTO items (rowid, name, value) VALUES (?, ?, ?);", rows)
+        connection.commit()
+        connection.close()
+        db_adapter = SQLiteAdapter({'database': path, 'rebuild_chunk_size': chunk_size})
+        db_adapter.connect()
+        try:
+            migrator = SQLiteMigrator(db_adapter)
+            with contextlib.redirect_stdout(io.StringIO()):
+                migrator.change_column_default('items', 'name', 'b')
+                migrator.apply_pending_changes()
+        finally:
+            db_adapter.disconnect()
+        connection = sqlite3.connect(path)
+        try:
+            return connection.execute("SELECT name, value FROM items ORDER BY value;").fetchall()
+        finally:
+            connection.close()
+
+    def test_sparse_rowids(self):
+        # rowids near the limits: a copy by rowid ranges would never finish
+        ids = [-(2 ** 62), -5, 1, 2, 3, 1000, 2 ** 40, 2 ** 62, 2 ** 63 - 1]
+        rows = [(rowid, f"n{i}", i) for i, rowid in enumerate(ids)]
+        result = self.rebuild(rows, 2)
+        self.assertEqual(result, [(f"n{i}", i) for i in range(len(ids))])
+
+    def test_chunk_sizes(self):
+        rows = [(rowid * 7, f"n{rowid}", rowid) for rowid in range(1, 101)]
+        for chunk_size in (1, 3, 100, 1000):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.rebuild(rows, chunk_size), [(f"n{i}", i) for i in range(1, 101)])
+
+
+class TestSQLiteRebuildChunkedRollback(unittest.TestCase):
+    def setUp(self):
+        self.project = MigrationProject(settings={'rebuild_chunk_size': 2})
+        self.project.add_migration(20240101000001, 'ChunkedNotNull',
+                                   "    def up(self):\n"
+                                   "        self.change_column_null('items', 'value', True)\n\n"
+                                   "    def down(self):\n"
+                                   "        self.change_column_null('items', 'value', False)\n")
+        connection = sqlite3.connect(self.project.database_path(''))
+        connection.execute("CREATE TABLE items (name TEXT, value INT);")
+        connection.executemany("INSERT INTO items (name, value) VALUES (?, ?);",
+                               [(f"n{i}", None if i == 7 else i) for i in range(10)])
+        connection.commit()
+        connection.close()
+        self.project.load()
+
+    def tearDown(self):
+        self.project.cleanup()
+
+    def test_failed_rebuild_keeps_original_table(self):
+        result, out = self.project.call(MigrationCore.instance().migrate, [''], -1)
+        self.assertEqual(result, 1)
+        self.assertIn("NOT NULL constraint failed", out)
+        connection = sqlite3.connect(self.project.database_path(''))
+        try:
+            tables = [r[0] for r in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name;")]
+            sql = connection.execute("SELECT sql FROM sqlite_master WHERE name = 'items';").fetchone()[0]
+            rows = connection.execute("SELECT COUNT(*) FROM items;").fetchone()[0]
+        finally:
+            connection.close()
+        self.assertEqual(tables, ['items', 'schema_migrations'])
+        self.assertEqual(sql, "CREATE TABLE items (name TEXT, value INT)")
+        self.assertEqual(rows, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from src.Database.SQLiteShadowCopy import SQLiteShadowCopy
+
+
+class TestSQLiteShadowCopy(unittest.TestCase):
+    def setUp(self):
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.path = f"{self.__tmp_dir.name}/test.sqlite3"
+
+    def tearDown(self):
+        self.__tmp_dir.cleanup()
+
+    def make_database(self, journal_mode: str):
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        connection.execute(f"PRAGMA journal_mode = {journal_mode};")
+        connection.execute("CREATE TABLE schema_migrations (version VARCHAR(128) NOT NULL PRIMARY KEY);")
+        connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT);")
+        connection.executemany("INSERT INTO users (name) VALUES (?);", [(f"u{i}",) for i in range(100)])
+        connection.close()
+
+    def migrate_shadow(self, shadow_copy: SQLiteShadowCopy):
+        connection = sqlite3.connect(shadow_copy.shadow_path(), isolation_level=None)
+        connection.execute("CREATE TABLE groups (id INTEGER PRIMARY KEY, title TEXT);")
+        connection.execute("INSERT INTO schema_migrations (version) VALUES ('1');")
+        connection.close()
+
+    def open_connection(self):
+        connection = sqlite3.connect(self.path, isolation_level=None, timeout=0.1)
+        connection.execute("SELECT COUNT(*) FROM users;").fetchall()
+        return connection
+
+    def check_database(self) -> tuple:
+        connection = sqlite3.connect(self.path)
+        try:
+            integrity = connection.execute("PRAGMA integrity_check;").fetchall()
+            tables = [r[0] for r in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name;")]
+            users = connection.execute("SELECT COUNT(*) FROM users;").fetchone()[0]
+            return integrity, tables, users
+        finally:
+            connection.close()
+
+    def test_swap_keeps_open_connections_valid(self):
+        self.make_database('delete')
+        connection = self.open_connection()
+        settings = {'adapter': 'sqlite', 'database': self.path, 'busy_timeout': 100}
+        shadow_copy = SQLiteShadowCopy('', settings)
+        shadow_copy.begin()
+        self.migrate_shadow(shadow_copy)
+        shadow_copy.swap([1])
+        self.assertEqual(settings['database'], self.path)
+        self.assertFalse(os.path.exists(shadow_copy.shadow_path()))
+        # the connection opened before the swap writes after it
+        connection.executemany("INSERT INTO users (name) VALUES (?);", [(f"n{i}",) for i in range(200)])
+        connection.close()
+        self.assertEqual(self.check_database(), ([('ok',)], ['groups', 'schema_migrations', 'users'], 300))
+
+    def test_swap_wal(self):
+        self.make_database('wal')
+        shadow_copy = SQLiteShadowCopy('', {'adapter': 'sqlite', 'database': self.path, 'busy_timeout': 100})
+        shadow_copy.begin()
+        self.migrate_shadow(shadow_copy)
+        shadow_copy.swap([1])
+        connection = self.open_connection()
+        connection.executemany("INSERT INTO users (name) VALUES (?);", [(f"n{i}",) for i in range(200)])
+        connection.close()
+        self.assertEqual(self.check_database(), ([('ok',)], ['groups', 'schema_migrations', 'users'], 300))
+
+    def test_swap_wal_refused_with_open_connections(self):
+        self.make_database('wal')
+        connection = self.open_connection()
+        settings = {'adapter': 'sqlite', 'database': self.path, 'busy_timeout': 100}
+        shadow_copy = SQLiteShadowCopy('', settings)
+        shadow_copy.begin()
+        self.migrate_shadow(shadow_copy)
+        with self.assertRaisesRegex(Exception, 'in use by other connections! The shadow copy is kept'):
+            shadow_copy.swap([1])
+        self.assertEqual(settings['database'], self.path)
+        # the migrated copy is kept
+        shadow = sqlite3.connect(shadow_copy.shadow_path())
+        try:
+            self.assertEqual(shadow.execute("SELECT version FROM schema_migrations;").fetchall(), [('1',)])
+        finally:
+            shadow.close()
+        connection.executemany("INSERT INTO users (name) VALUES (?);", [(f"n{i}",) for i in range(200)])
+        connection.close()
+        self.assertEqual(self.check_database(), ([('ok',)], ['schema_migrations', 'users'], 300))
+
+    def test_swap_cancelled_if_original_changed(self):
+        self.make_database('delete')
+        shadow_copy = SQLiteShadowCopy('', {'adapter': 'sqlite', 'database': self.path, 'busy_timeout': 100})
+        shadow_copy.begin()
+        self.migrate_shadow(shadow_copy)
+        connection = self.open_connection()
+        connection.execute("INSERT INTO users (name) VALUES ('late');")
+        connection.close()
+        with self.assertRaisesRegex(Exception, 'was changed after the shadow copy'):
+            shadow_copy.swap([1])
+        self.assertFalse(os.path.exists(shadow_copy.shadow_path()))
+        self.assertEqual(self.check_database(), ([('ok',)], ['schema_migrations', 'users'], 101))
+
+
+if __name__ == '__main__':
+    unittest.main()
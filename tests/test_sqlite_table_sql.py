@@ -0,0 +1,48 @@
+import sqlite3
+import unittest
+
+from src.Migration.Migrators.SQLiteTableSql import SQLiteTableSql
+
+
+class TestSQLiteTableSqlRenameColumn(unittest.TestCase):
+    def rename(self, sql: str, name: str, new_name: str) -> str:
+        table_sql = SQLiteTableSql.parse(sql)
+        self.assertTrue(table_sql.rename_column(name, new_name))
+        return table_sql.render()
+
+    def test_unquoted_identifier_is_quoted(self):
+        sql = self.rename("CREATE TABLE t (a INT, b INT, CHECK (a > b))", 'a', 'new name')
+        self.assertIn("CHECK (\"new name\" > b)", sql)
+        connection = sqlite3.connect(':memory:')
+        try:
+            connection.execute(sql)
+            columns = [r[1] for r in connection.execute("PRAGMA table_info(t);")]
+        finally:
+            connection.close()
+        self.assertEqual(columns, ['new name', 'b'])
+
+    def test_column_constraints_are_renamed(self):
+        sql = self.rename("CREATE TABLE t (a INT, b INT CHECK (b > a), c INT CHECK (\"a\" < 10))", 'a', 'x')
+        self.assertIn("b INT CHECK (b > \"x\")", sql)
+        self.assertIn("c INT CHECK (\"x\" < 10)", sql)
+
+    def test_types_references_and_functions_are_kept(self):
+        sql = self.rename("CREATE TABLE t (date DATE DEFAULT (date('now')) CHECK (date > '2000'), "
+                          "p INT REFERENCES o(date))", 'date', 'day')
+        self.assertIn("\"day\" DATE DEFAULT (date('now')) CHECK (\"day\" > '2000')", sql)
+        self.assertIn("p INT REFERENCES o(date)", sql)
+
+    def test_renamed_table_is_valid(self):
+        sql = self.rename("CREATE TABLE t (a DECIMAL(10, 2) NOT NULL, b INT CHECK (b > a), CHECK (a > 0))", 'a', 'x')
+        connection = sqlite3.connect(':memory:')
+        try:
+            connection.execute(sql)
+            connection.execute("INSERT INTO t (x, b) VALUES (1, 2);")
+            with self.assertRaises(sqlite3.IntegrityError):
+                connection.execute("INSERT INTO t (x, b) VALUES (3, 2);")
+        finally:
+            connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
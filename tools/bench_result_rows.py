@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+#
+# URL:      https://github.com/AnthonySnow887/FlyCubeMigration
+# AUTHOR:   AnthonySnow887
+# LICENSE:  GPL-3.0
+#
+# NOTE: This file is part of the FlyCubeMigration (database migration system) helper tools.
+#       Micro-benchmark of the query result rows: dict per row (previous implementation),
+#       ResultRow (shared column map) and raw tuples (query(sql, raw=True)).
+#
+# Usage:
+#   $> python3 tools/bench_result_rows.py [rows] [columns]
+#
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.Database.Adapters.ResultRow import ResultRow
+from src.Database.Adapters.SQLiteAdapter import SQLiteAdapter
+from src.Logger.ConsoleLogger import ConsoleLogger
+
+
+def legacy_rows(names: list, result) -> list:
+    # dict per row (previous implementation of prepare_result_data)
+    rows = []
+    for row in result:
+        tmp_row = {}
+        for i in range(len(names)):
+            tmp_row[names[i]] = row[i]
+        rows.append(tmp_row)
+    return rows
+
+
+def measure(func) -> tuple:
+    start = time.perf_counter()
+    func()
+    elapsed = (time.perf_counter() - start) * 1000.0
+    tracemalloc.start()
+    rows = func()
+    size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del rows
+    return elapsed, size / 1024.0
+
+
+if __name__ == '__main__':
+    rows_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_adapter = SQLiteAdapter({'database': f"{tmp_dir}/bench.sqlite3"})
+        db_adapter.connect()
+        ConsoleLogger.instance().push_show_out(False)
+        try:
+            names = [f"c_{i}" for i in range(columns)]
+            db_adapter.query(f"CREATE TABLE bench ({', '.join(names)});")
+            db_adapter.query(f"WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < {rows_count}) "
+                             f"INSERT INTO bench SELECT {', '.join(['x'] * columns)} FROM n;")
+            sql = "SELECT * FROM bench;"
+            result = db_adapter.query(sql, True)
+            print(f"{'rows':>8} {'columns':>8} {'variant':>10} {'build ms':>10} {'peak KiB':>10} {'query ms':>10}")
+            variants = [
+                ('dict', lambda: legacy_rows(names, result), lambda: legacy_rows(names, db_adapter.query(sql, True))),
+                ('ResultRow', lambda: ResultRow.make_rows(names, result), lambda: db_adapter.query(sql)),
+                ('raw', lambda: list(result), lambda: db_adapter.query(sql, True)),
+            ]
+            for name, build, query in variants:
+                build_ms, peak = measure(build)
+                query_ms, tmp_peak = measure(query)
+                print(f"{rows_count:>8} {columns:>8} {name:>10} {build_ms:>10.2f} {peak:>10.0f} {query_ms:>10.2f}")
+        finally:
+            ConsoleLogger.instance().pop_show_out()
+            db_adapter.disconnect()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+#
+# URL:      https://github.com/AnthonySnow887/FlyCubeMigration
+# AUTHOR:   AnthonySnow887
+# LICENSE:  GPL-3.0
+#
+# NOTE: This file is part of the FlyCubeMigration (database migration system) helper tools.
+#       Micro-benchmark of the SQLite CREATE TABLE parser (SQLiteTableSql) on wide tables.
+#
+# Usage:
+#   $> python3 tools/bench_sqlite_table_sql.py [columns ...]
+#
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.Database.Adapters.SQLiteAdapter import SQLiteAdapter
+from src.Logger.ConsoleLogger import ConsoleLogger
+from src.Migration.Migrators.SQLiteMigrator import SQLiteMigrator
+from src.Migration.Migrators.SQLiteTableSql import SQLiteTableSql
+
+
+def make_table_sql(columns: int) -> str:
+    items = ["id integer not NULL"]
+    for i in range(columns):
+        items.append(f"\"c_{i}\" numeric(10, 2) DEFAULT 0 CHECK (\"c_{i}\" IN (0, 1, 2))")
+    items.append("CONSTRAINT \"wide_pkey\" PRIMARY KEY (id)")
+    return "CREATE TABLE \"wide\" (\n" + ",\n".join(items) + "\n)"
+
+
+def legacy_drop_column(sql: str, column_name: str) -> str:
+    # char-by-char comma split (previous implementation of the rebuild methods)
+    pos = sql.find(f"\"{column_name}\"")
+    new_sql = ""
+    new_sql_part = ""
+    use_skip = False
+    for i in range(len(sql)):
+        tmp_char = sql[i]
+        if tmp_char == ',':
+            if not use_skip:
+                new_sql_part = new_sql_part.strip()
+                if len(new_sql) == 0 and len(new_sql_part) > 0:
+                    new_sql = str(new_sql_part)
+                elif len(new_sql) > 0 and len(new_sql_part) > 0:
+                    new_sql += f",\n{str(new_sql_part)}"
+            else:
+                use_skip = False
+            new_sql_part = ""
+            continue
+        new_sql_part += str(tmp_char)
+        if i == pos:
+            use_skip = True
+    return new_sql
+
+
+def parser_drop_column(sql: str, column_name: str) -> str:
+    table_sql = SQLiteTableSql.parse(sql)
+    table_sql.drop_column(column_name)
+    return table_sql.render()
+
+
+def bench(func, repeat: int = 20) -> float:
+    start = time.perf_counter()
+    for i in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000.0
+
+
+def bench_migrator(columns: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_adapter = SQLiteAdapter({'database': f"{tmp_dir}/bench.sqlite3"})
+        db_adapter.connect()
+        ConsoleLogger.instance().push_show_out(False)
+        try:
+            db_adapter.query(make_table_sql(columns))
+            migrator = SQLiteMigrator(db_adapter)
+            start = time.perf_counter()
+            for i in range(10):
+                migrator.change_column_default('wide', f"c_{i}", '1')
+            migrator.apply_pending_changes()
+            return (time.perf_counter() - start) * 1000.0
+        finally:
+            ConsoleLogger.instance().pop_show_out()
+            db_adapter.disconnect()
+
+
+if __name__ == '__main__':
+    sizes = [int(v) for v in sys.argv[1:]] or [500, 1000, 1500]
+    print(f"{'columns':>8} {'sql bytes':>10} {'legacy ms':>10} {'parse ms':>10} {'cached ms':>10} {'10 changes ms':>14}")
+    for size in sizes:
+        sql = make_table_sql(size)
+        column = f"c_{size // 2}"
+        legacy = bench(lambda: legacy_drop_column(sql, column), 3)
+        parse = bench(lambda: SQLiteTableSql._SQLiteTableSql__parse(sql))
+        cached = bench(lambda: parser_drop_column(sql, column))
+        print(f"{size:>8} {len(sql):>10} {legacy:>10.2f} {parse:>10.2f} {cached:>10.2f} {bench_migrator(size):>14.2f}")